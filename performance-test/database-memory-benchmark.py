@@ -0,0 +1,115 @@
+"""
+Compares the memory used by the schema databases for a synthetic registry.
+
+The stored versions are created as the schema reader does, from decoded records,
+so each version has its own subject string, `Version` object and references list.
+
+Usage::
+  python performance-test/database-memory-benchmark.py --subjects 10000 --versions 10
+
+Copyright (c) 2025 Aiven Ltd
+See LICENSE for details
+"""
+
+from __future__ import annotations
+
+from karapace.core.in_memory_database import CompactInMemoryDatabase, InMemoryDatabase
+from karapace.core.schema_models import TypedSchema
+from karapace.core.schema_references import Reference
+from karapace.core.schema_type import SchemaType
+from karapace.core.typing import SchemaId, Subject, Version
+
+import argparse
+import gc
+import json
+import time
+import tracemalloc
+
+
+def _records(subjects: int, versions: int, distinct_schemas: int) -> list[tuple[bytes, int, bytes | None]]:
+    records = []
+    for subject_index in range(subjects):
+        for version in range(1, versions + 1):
+            key = json.dumps({"keytype": "SCHEMA", "subject": f"subject-{subject_index}", "version": version}).encode()
+            references = None
+            if version % 10 == 0:
+                references = json.dumps([{"name": "base", "subject": "subject-0", "version": 1}]).encode()
+            schema_index = (subject_index * versions + version) % distinct_schemas
+            records.append((key, schema_index, references))
+    return records
+
+
+def _schemas(distinct_schemas: int) -> list[TypedSchema]:
+    return [
+        TypedSchema(
+            schema_type=SchemaType.AVRO,
+            schema_str=json.dumps({"type": "record", "name": f"Record{index}", "fields": [{"name": "f", "type": "int"}]}),
+        )
+        for index in range(distinct_schemas)
+    ]
+
+
+def measure(
+    database_class: type[InMemoryDatabase],
+    records: list[tuple[bytes, int, bytes | None]],
+    schemas: list[TypedSchema],
+) -> tuple[int, float]:
+    gc.collect()
+    tracemalloc.start()
+    start = time.monotonic()
+    database = database_class()
+    for key, schema_index, references_data in records:
+        key_data = json.loads(key)
+        references = None
+        if references_data is not None:
+            references = [
+                Reference(
+                    name=reference["name"], subject=Subject(reference["subject"]), version=Version(reference["version"])
+                )
+                for reference in json.loads(references_data)
+            ]
+        database.insert_schema_version(
+            subject=Subject(key_data["subject"]),
+            schema_id=SchemaId(schema_index + 1),
+            version=Version(key_data["version"]),
+            deleted=False,
+            schema=schemas[schema_index],
+            references=references,
+        )
+    elapsed = time.monotonic() - start
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del database
+    return size, elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subjects", type=int, default=10000)
+    parser.add_argument("--versions", type=int, default=10, help="Versions per subject")
+    parser.add_argument(
+        "--distinct-schemas", type=int, default=1000, help="Number of distinct schemas shared by the versions"
+    )
+    args = parser.parse_args()
+
+    records = _records(args.subjects, args.versions, args.distinct_schemas)
+    schemas = _schemas(args.distinct_schemas)
+    for schema in schemas:
+        schema.fingerprint()
+
+    total_versions = len(records)
+    print(f"{args.subjects} subjects, {total_versions} versions, {args.distinct_schemas} distinct schemas")
+    results = {}
+    for database_class in (InMemoryDatabase, CompactInMemoryDatabase):
+        size, elapsed = measure(database_class, records, schemas)
+        results[database_class] = size
+        print(
+            f"{database_class.__name__:>24}: {size / 1024 / 1024:8.1f} MiB, "
+            f"{size / total_versions:6.0f} bytes per version, inserted in {elapsed:.2f} s"
+        )
+    print(f"Compact / current: {results[CompactInMemoryDatabase] / results[InMemoryDatabase]:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Offline benchmark of the schema reader replaying a synthetic schemas topic.
+
+The records are generated in memory and fed to `KafkaSchemaReader.consume_messages`
+without Kafka, the stored schemas end up in the schema reader database. The stream
+contains Avro, JSON Schema and Protobuf schemas, Protobuf schemas with references,
+soft and hard deletes and subject compatibility configuration records.
+
+Reported are the replay throughput, the peak RSS of the process, the cost of each
+record type and the cost of database lookups after the replay. Use `--output` to
+store the results as JSON for comparing runs.
+
+Usage::
+  python performance-test/schema-reader-replay-benchmark.py --subjects 3000 --versions 5
+
+Copyright (c) 2025 Aiven Ltd
+See LICENSE for details
+"""
+
+from __future__ import annotations
+
+from collections import defaultdict
+from collections.abc import Iterator
+from dataclasses import dataclass
+from karapace.core.config import Config
+from karapace.core.in_memory_database import CompactInMemoryDatabase, InMemoryDatabase
+from karapace.core.key_format import KeyFormatter
+from karapace.core.offset_watcher import OffsetWatcher
+from karapace.core.schema_models import TypedSchema
+from karapace.core.schema_reader import KafkaSchemaReader
+from karapace.core.stats import StatsClient
+from karapace.core.typing import Subject
+from unittest.mock import Mock
+
+import argparse
+import json
+import random
+import resource
+import time
+
+BATCH_SIZE = 1000
+PROTOBUF_BASE_SUBJECT = "proto-base"
+PROTOBUF_BASE_SCHEMA = 'syntax = "proto3";\npackage base;\nmessage Base {\n  string x = 1;\n}\n'
+
+
+@dataclass(frozen=True)
+class SyntheticMessage:
+    """The parts of a Kafka message used by the schema reader."""
+
+    record_type: str
+    _key: bytes
+    _value: bytes | None
+    _offset: int
+
+    def key(self) -> bytes:
+        return self._key
+
+    def value(self) -> bytes | None:
+        return self._value
+
+    def offset(self) -> int:
+        return self._offset
+
+    def error(self) -> None:
+        return None
+
+
+def _avro_schema(subject_index: int, version: int) -> str:
+    fields = [{"name": f"f{field}", "type": "int", "default": 0} for field in range(version)]
+    return json.dumps({"type": "record", "name": f"Record{subject_index}", "fields": fields})
+
+
+def _json_schema(subject_index: int, version: int) -> str:
+    properties = {f"f{field}": {"type": "integer"} for field in range(version)}
+    return json.dumps({"title": f"Record{subject_index}", "type": "object", "properties": properties})
+
+
+def _protobuf_schema(subject_index: int, version: int, with_reference: bool) -> str:
+    lines = ['syntax = "proto3";', f"package p{subject_index};"]
+    fields = [f"  int32 f{field} = {field + 1};" for field in range(version)]
+    if with_reference:
+        lines.append('import "base.proto";')
+        fields.append(f"  base.Base base = {version + 1};")
+    return "\n".join([*lines, "message Record {", *fields, "}", ""])
+
+
+class RecordGenerator:
+    """Generates the records of a synthetic schemas topic.
+
+    The subjects cycle through Avro, JSON Schema, Protobuf and Protobuf with a reference
+    to a common base schema, each subject gets `versions` versions with a new schema each.
+    """
+
+    def __init__(
+        self,
+        *,
+        subjects: int,
+        versions: int,
+        soft_delete_ratio: float,
+        hard_delete_ratio: float,
+        config_ratio: float,
+        seed: int,
+    ) -> None:
+        self.subjects = subjects
+        self.versions = versions
+        self.soft_delete_ratio = soft_delete_ratio
+        self.hard_delete_ratio = hard_delete_ratio
+        self.config_ratio = config_ratio
+        self._random = random.Random(seed)
+        self._offset = 0
+        self._schema_id = 0
+
+    def _message(self, record_type: str, key: dict, value: dict | None) -> SyntheticMessage:
+        message = SyntheticMessage(
+            record_type=record_type,
+            _key=json.dumps(key).encode(),
+            _value=None if value is None else json.dumps(value).encode(),
+            _offset=self._offset,
+        )
+        self._offset += 1
+        return message
+
+    def _schema_message(self, record_type: str, subject: str, version: int, value: dict) -> SyntheticMessage:
+        key = {"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}
+        return self._message(record_type, key, {"subject": subject, "version": version, **value})
+
+    def _new_schema_message(self, record_type: str, subject: str, version: int, value: dict) -> SyntheticMessage:
+        self._schema_id += 1
+        return self._schema_message(record_type, subject, version, {"id": self._schema_id, "deleted": False, **value})
+
+    def records(self) -> Iterator[SyntheticMessage]:
+        yield self._new_schema_message(
+            "protobuf", PROTOBUF_BASE_SUBJECT, 1, {"schemaType": "PROTOBUF", "schema": PROTOBUF_BASE_SCHEMA}
+        )
+        deleted_versions: list[tuple[str, int, dict]] = []
+        for subject_index in range(self.subjects):
+            subject = f"subject-{subject_index}"
+            for version in range(1, self.versions + 1):
+                record_type, value = self._schema_value(subject_index, version)
+                message = self._new_schema_message(record_type, subject, version, value)
+                yield message
+                if self._random.random() < self.soft_delete_ratio:
+                    deleted_versions.append((subject, version, json.loads(message.value() or b"")))
+            if self._random.random() < self.config_ratio:
+                key = {"keytype": "CONFIG", "subject": subject, "magic": 0}
+                yield self._message("config", key, {"compatibilityLevel": self._random.choice(["FULL", "NONE"])})
+
+        for subject, version, value in deleted_versions:
+            yield self._schema_message("soft_delete", subject, version, {**value, "deleted": True})
+        for subject, version, _ in deleted_versions:
+            if self._random.random() < self.hard_delete_ratio:
+                key = {"keytype": "SCHEMA", "subject": subject, "version": version, "magic": 1}
+                yield self._message("hard_delete", key, None)
+
+    def _schema_value(self, subject_index: int, version: int) -> tuple[str, dict]:
+        match subject_index % 4:
+            case 0:
+                return "avro", {"schema": _avro_schema(subject_index, version)}
+            case 1:
+                return "json", {"schemaType": "JSON", "schema": _json_schema(subject_index, version)}
+            case 2:
+                return "protobuf", {"schemaType": "PROTOBUF", "schema": _protobuf_schema(subject_index, version, False)}
+            case _:
+                return "protobuf_ref", {
+                    "schemaType": "PROTOBUF",
+                    "schema": _protobuf_schema(subject_index, version, True),
+                    "references": [{"name": "base.proto", "subject": PROTOBUF_BASE_SUBJECT, "version": 1}],
+                }
+
+
+def _schema_reader(config: Config, compact_database: bool) -> KafkaSchemaReader:
+    return KafkaSchemaReader(
+        config=config,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        database=CompactInMemoryDatabase() if compact_database else InMemoryDatabase(),
+        stats=Mock(spec=StatsClient),
+    )
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def benchmark_replay(config: Config, messages: list[SyntheticMessage], compact_database: bool) -> dict:
+    """Replay the messages in batches as consumed from Kafka."""
+    schema_reader = _schema_reader(config, compact_database)
+    rss_before = _peak_rss_mib()
+    start = time.perf_counter()
+    for batch_start in range(0, len(messages), BATCH_SIZE):
+        schema_reader.consume_messages(messages[batch_start : batch_start + BATCH_SIZE], watch_offsets=False)
+    elapsed = time.perf_counter() - start
+    live_versions, soft_deleted_versions = schema_reader.database.num_schema_versions()
+    return {
+        "records": len(messages),
+        "seconds": elapsed,
+        "records_per_second": len(messages) / elapsed,
+        "peak_rss_mib": _peak_rss_mib(),
+        "peak_rss_growth_mib": _peak_rss_mib() - rss_before,
+        "schemas": schema_reader.database.num_schemas(),
+        "subjects": schema_reader.database.num_subjects(),
+        "live_versions": live_versions,
+        "soft_deleted_versions": soft_deleted_versions,
+        "lookups": benchmark_lookups(schema_reader),
+    }
+
+
+def benchmark_record_types(config: Config, messages: list[SyntheticMessage], compact_database: bool) -> dict:
+    """Replay the messages one at a time and account the time to the record type.
+
+    The per call overhead of `consume_messages` is included in every record type.
+    """
+    schema_reader = _schema_reader(config, compact_database)
+    total_ns: dict[str, int] = defaultdict(int)
+    counts: dict[str, int] = defaultdict(int)
+    for message in messages:
+        start = time.perf_counter_ns()
+        schema_reader.consume_messages([message], watch_offsets=False)
+        total_ns[message.record_type] += time.perf_counter_ns() - start
+        counts[message.record_type] += 1
+    return {
+        record_type: {
+            "records": counts[record_type],
+            "microseconds_per_record": total_ns[record_type] / counts[record_type] / 1000,
+        }
+        for record_type in sorted(counts)
+    }
+
+
+def benchmark_lookups(schema_reader: KafkaSchemaReader) -> dict:
+    database = schema_reader.database
+    subjects = database.find_subjects(include_deleted=False)
+    start = time.perf_counter()
+    schemas: list[tuple[Subject, TypedSchema]] = []
+    for subject in subjects:
+        schema_versions = database.find_subject_schemas(subject=Subject(subject), include_deleted=False)
+        schemas.extend((Subject(subject), schema_version.schema) for schema_version in schema_versions.values())
+    subject_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for subject, schema in schemas:
+        database.get_schema_id_if_exists(subject=subject, schema=schema, include_deleted=False)
+    schema_id_seconds = time.perf_counter() - start
+
+    return {
+        "find_subject_schemas_microseconds": subject_seconds / max(1, len(subjects)) * 1_000_000,
+        "get_schema_id_if_exists_microseconds": schema_id_seconds / max(1, len(schemas)) * 1_000_000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--subjects", type=int, default=3000)
+    parser.add_argument("--versions", type=int, default=5, help="Versions per subject")
+    parser.add_argument("--soft-delete-ratio", type=float, default=0.1, help="Ratio of soft deleted versions")
+    parser.add_argument("--hard-delete-ratio", type=float, default=0.5, help="Ratio of soft deleted versions hard deleted")
+    parser.add_argument("--config-ratio", type=float, default=0.2, help="Ratio of subjects with a compatibility config")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--compact-database", action="store_true", help="Use the compact in-memory database")
+    parser.add_argument("--skip-record-types", action="store_true", help="Skip the per record type replay")
+    parser.add_argument("--output", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    generator = RecordGenerator(
+        subjects=args.subjects,
+        versions=args.versions,
+        soft_delete_ratio=args.soft_delete_ratio,
+        hard_delete_ratio=args.hard_delete_ratio,
+        config_ratio=args.config_ratio,
+        seed=args.seed,
+    )
+    messages = list(generator.records())
+    config = Config(compatibility="NONE", compact_schema_database=args.compact_database)
+
+    results = {"arguments": vars(args), "replay": benchmark_replay(config, messages, args.compact_database)}
+    replay = results["replay"]
+    print(
+        f"Replayed {replay['records']} records in {replay['seconds']:.2f} s, {replay['records_per_second']:.0f} records/s, "
+        f"peak RSS {replay['peak_rss_mib']:.0f} MiB (+{replay['peak_rss_growth_mib']:.0f} MiB)"
+    )
+    print(
+        f"Stored {replay['schemas']} schemas, {replay['subjects']} subjects, {replay['live_versions']} live and "
+        f"{replay['soft_deleted_versions']} soft deleted versions"
+    )
+    lookups = replay["lookups"]
+    print(
+        f"find_subject_schemas {lookups['find_subject_schemas_microseconds']:.1f} us, "
+        f"get_schema_id_if_exists {lookups['get_schema_id_if_exists_microseconds']:.1f} us"
+    )
+
+    if not args.skip_record_types:
+        results["record_types"] = benchmark_record_types(config, messages, args.compact_database)
+        for record_type, cost in results["record_types"].items():
+            print(f"{record_type:>14}: {cost['records']:8} records, {cost['microseconds_per_record']:8.1f} us per record")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fp:
+            json.dump(results, fp, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,8 +6,10 @@ See LICENSE for details
 from __future__ import annotations
 
 from avro.errors import SchemaParseException
+from collections.abc import AsyncIterator
 from dependency_injector.wiring import inject, Provide
 from fastapi import Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
 from karapace.api.forward_client import ForwardClient
 from karapace.api.routers.errors import no_primary_url_error, SchemaErrorCodes, SchemaErrorMessages
 from karapace.api.routers.requests import (
@@ -24,11 +26,16 @@ from karapace.api.routers.requests import (
     SubjectSchemaVersionResponse,
     SubjectVersion,
 )
-from karapace.core.auth import AuthenticatorAndAuthorizer, Operation, User
+from karapace.core.auth import (
+    ALLOW_ALL_SUBJECTS,
+    AuthenticatorAndAuthorizer,
+    Operation,
+    SubjectAuthorizationPlan,
+    User,
+)
 from karapace.core.auth_container import AuthContainer
 from karapace.core.compatibility import CompatibilityModes
 from karapace.core.compatibility.jsonschema.checks import is_incompatible
-from karapace.core.compatibility.schema_compatibility import SchemaCompatibility
 from karapace.core.config import Config
 from karapace.core.errors import (
     IncompatibleSchema,
@@ -59,7 +66,7 @@ from karapace.core.schema_references import LatestVersionReference, Reference
 from karapace.core.schema_registry import KarapaceSchemaRegistry
 from karapace.core.stats import StatsClient
 from karapace.core.typing import JsonData, JsonObject, SchemaId, Subject, Version
-from karapace.core.utils import JSONDecodeError
+from karapace.core.utils import json_encode, JSONDecodeError
 from typing import Any, cast
 
 import json
@@ -68,6 +75,28 @@ import time
 
 LOG = logging.getLogger(__name__)
 
+# Number of entries read from the database at once by the listings
+LISTING_SCAN_PAGE_SIZE = 1000
+
+
+def _subject_read_plan(user: User | None, authorizer: AuthenticatorAndAuthorizer | None) -> SubjectAuthorizationPlan:
+    if authorizer is None:
+        return ALLOW_ALL_SUBJECTS
+    return authorizer.subject_authorization_plan(user, Operation.Read)
+
+
+def _json_array_response(elements: AsyncIterator[str]) -> StreamingResponse:
+    """Stream a JSON array from the JSON encoded elements, the response is sent while the elements are produced."""
+
+    async def chunks() -> AsyncIterator[str]:
+        separator = "["
+        async for element in elements:
+            yield separator + element
+            separator = ","
+        yield "[]" if separator == "[" else "]"
+
+    return StreamingResponse(chunks(), media_type="application/json")
+
 
 class KarapaceSchemaRegistryController:
     def __init__(self, config: Config, schema_registry: KarapaceSchemaRegistry, stats: StatsClient) -> None:
@@ -119,8 +148,12 @@ class KarapaceSchemaRegistryController:
         subject: Subject,
         schema_request: SchemaRequest,
         version: str,
+        verbose: bool = False,
     ) -> CompatibilityCheckResponse:
-        """Check for schema compatibility"""
+        """Check for schema compatibility
+
+        With `verbose` the transitive modes report the incompatibilities of all the versions.
+        """
         try:
             compatibility_mode = self.schema_registry.get_compatibility_mode(subject=subject)
         except ValueError as exc:
@@ -139,45 +172,105 @@ class KarapaceSchemaRegistryController:
         if compatibility_mode.is_transitive():
             # Ignore the schema version provided in the rest api call (`version`)
             # Instead check against all previous versions (including `version` if existing)
-            result = self.schema_registry.check_schema_compatibility(new_schema, subject)
+            result = await self.schema_registry.check_schema_compatibility(new_schema, subject, all_versions=verbose)
         else:
             # Check against the schema version provided in the rest api call (`version`)
-            result = SchemaCompatibility.check_compatibility(old_schema, new_schema, compatibility_mode)
+            result = self.schema_registry.compatibility_verdicts.check_compatibility(
+                old_schema, new_schema, compatibility_mode
+            )
 
         if is_incompatible(result):
             return CompatibilityCheckResponse(is_compatible=False, messages=list(result.messages))
         return CompatibilityCheckResponse(is_compatible=True)
 
+    async def _scan_schema_versions(
+        self, *, deleted: bool, latest_only: bool, scan_prefixes: list[str]
+    ) -> AsyncIterator[SchemaVersion]:
+        # The database is scanned in pages, continuing after the last version of the previous page
+        for scan_prefix in scan_prefixes:
+            start_after: tuple[Subject, Version] | None = None
+            while True:
+                schema_versions = await self.schema_registry.schemas_list(
+                    include_deleted=deleted,
+                    latest_only=latest_only,
+                    subject_prefix=scan_prefix,
+                    start_after=start_after,
+                    limit=LISTING_SCAN_PAGE_SIZE,
+                )
+                for schema_version in schema_versions:
+                    yield schema_version
+                if len(schema_versions) < LISTING_SCAN_PAGE_SIZE:
+                    break
+                start_after = (schema_versions[-1].subject, schema_versions[-1].version)
+
+    async def _schema_listing_items(
+        self,
+        *,
+        deleted: bool,
+        latest_only: bool,
+        offset: int,
+        limit: int,
+        subject_prefix: str,
+        user: User | None,
+        authorizer: AuthenticatorAndAuthorizer | None,
+    ) -> AsyncIterator[SchemaListingItem]:
+        # Only the subjects the authorization plan can allow are scanned. The offset and limit apply to the
+        # versions the user can read, a negative limit returns all the versions after the offset.
+        plan = _subject_read_plan(user, authorizer)
+        to_skip = max(0, offset)
+        returned = 0
+        authorized_subject: tuple[Subject, bool] | None = None
+        if limit == 0:
+            return
+        async for schema_version in self._scan_schema_versions(
+            deleted=deleted, latest_only=latest_only, scan_prefixes=plan.scan_prefixes(subject_prefix)
+        ):
+            if authorized_subject is None or authorized_subject[0] != schema_version.subject:
+                authorized_subject = (schema_version.subject, plan.allows(schema_version.subject))
+            if not authorized_subject[1]:
+                continue
+            if to_skip > 0:
+                to_skip -= 1
+                continue
+            references: list[Any] | None = None
+            if schema_version.references:
+                references = [r.to_dict() for r in schema_version.references]
+            yield SchemaListingItem(
+                subject=schema_version.subject,
+                schema=schema_version.schema.schema_str,
+                version=schema_version.version.value,
+                id=schema_version.schema_id,
+                schemaType=schema_version.schema.schema_type,
+                references=references,
+            )
+            returned += 1
+            if 0 <= limit <= returned:
+                break
+
     @inject
     async def schemas_list(
         self,
         *,
         deleted: bool,
         latest_only: bool,
+        offset: int = 0,
+        limit: int = -1,
+        subject_prefix: str = "",
         user: User | None,
         authorizer: AuthenticatorAndAuthorizer = Depends(Provide[AuthContainer.authorizer]),
-    ) -> list[SchemaListingItem]:
-        schemas = await self.schema_registry.schemas_list(include_deleted=deleted, latest_only=latest_only)
-        response_schemas: list[SchemaListingItem] = []
-        for subject, schema_versions in schemas.items():
-            if authorizer and not authorizer.check_authorization(user, Operation.Read, f"Subject:{subject}"):
-                continue
-            for schema_version in schema_versions:
-                references: list[Any] | None = None
-                if schema_version.references:
-                    references = [r.to_dict() for r in schema_version.references]
-                response_schemas.append(
-                    SchemaListingItem(
-                        subject=schema_version.subject,
-                        schema=schema_version.schema.schema_str,
-                        version=schema_version.version.value,
-                        id=schema_version.schema_id,
-                        schemaType=schema_version.schema.schema_type,
-                        references=references,
-                    )
-                )
-
-        return response_schemas
+    ) -> list[SchemaListingItem] | StreamingResponse:
+        items = self._schema_listing_items(
+            deleted=deleted,
+            latest_only=latest_only,
+            offset=offset,
+            limit=limit,
+            subject_prefix=subject_prefix,
+            user=user,
+            authorizer=authorizer,
+        )
+        if self.config.streaming_listings:
+            return _json_array_response(item.model_dump_json(by_alias=True) async for item in items)
+        return [item async for item in items]
 
     @inject
     async def schemas_get(
@@ -278,10 +371,11 @@ class KarapaceSchemaRegistryController:
                 },
             ) from exc
 
+        # Not streamed, the versions of a schema are few and are sorted before the response
+        plan = _subject_read_plan(user, authorizer)
         subject_versions = []
         for subject_version in self.schema_registry.get_subject_versions_for_schema(schema_id_int, include_deleted=deleted):
-            subject = subject_version["subject"]
-            if authorizer and not authorizer.check_authorization(user, Operation.Read, f"Subject:{subject}"):
+            if not plan.allows(subject_version["subject"]):
                 continue
             subject_versions.append(
                 # TODO correct typing
@@ -316,7 +410,7 @@ class KarapaceSchemaRegistryController:
                 },
             ) from exc
 
-        self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=None)
+        await self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=None)
         return CompatibilityResponse(compatibility=self.schema_registry.schema_reader.config.compatibility)
 
     async def config_subject_get(
@@ -369,7 +463,7 @@ class KarapaceSchemaRegistryController:
                 },
             ) from exc
 
-        self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=Subject(subject))
+        await self.schema_registry.send_config_message(compatibility_level=compatibility_level, subject=Subject(subject))
         return CompatibilityResponse(compatibility=compatibility_level.value)
 
     async def config_subject_delete(
@@ -377,25 +471,69 @@ class KarapaceSchemaRegistryController:
         *,
         subject: str,
     ) -> CompatibilityResponse:
-        self.schema_registry.send_config_subject_delete_message(subject=Subject(subject))
+        await self.schema_registry.send_config_subject_delete_message(subject=Subject(subject))
         return CompatibilityResponse(compatibility=self.schema_registry.schema_reader.config.compatibility)
 
+    async def _subject_listing_items(
+        self,
+        *,
+        deleted: bool,
+        offset: int,
+        limit: int,
+        subject_prefix: str,
+        user: User | None,
+        authorizer: AuthenticatorAndAuthorizer | None,
+    ) -> AsyncIterator[str]:
+        # Same scan and paging as in `_schema_listing_items`
+        plan = _subject_read_plan(user, authorizer)
+        to_skip = max(0, offset)
+        returned = 0
+        if limit == 0:
+            return
+        for scan_prefix in plan.scan_prefixes(subject_prefix):
+            start_after: Subject | None = None
+            while True:
+                page = self.schema_registry.database.scan_subjects(
+                    include_deleted=deleted,
+                    subject_prefix=scan_prefix,
+                    start_after=start_after,
+                    limit=LISTING_SCAN_PAGE_SIZE,
+                )
+                for subject in page:
+                    if not plan.allows(subject):
+                        continue
+                    if to_skip > 0:
+                        to_skip -= 1
+                        continue
+                    yield str(subject)
+                    returned += 1
+                    if 0 <= limit <= returned:
+                        return
+                if len(page) < LISTING_SCAN_PAGE_SIZE:
+                    break
+                start_after = page[-1]
+
     @inject
     async def subjects_list(
         self,
         deleted: bool,
         user: User | None,
+        offset: int = 0,
+        limit: int = -1,
+        subject_prefix: str = "",
         authorizer: AuthenticatorAndAuthorizer = Depends(Provide[AuthContainer.authorizer]),
-    ) -> list[str]:
-        subjects = [str(subject) for subject in self.schema_registry.database.find_subjects(include_deleted=deleted)]
-        if authorizer:
-            subjects = list(
-                filter(
-                    lambda subject: authorizer.check_authorization(user, Operation.Read, f"Subject:{subject}"),
-                    subjects,
-                )
-            )
-        return subjects
+    ) -> list[str] | StreamingResponse:
+        subjects = self._subject_listing_items(
+            deleted=deleted,
+            offset=offset,
+            limit=limit,
+            subject_prefix=subject_prefix,
+            user=user,
+            authorizer=authorizer,
+        )
+        if self.config.streaming_listings:
+            return _json_array_response(json_encode(subject) async for subject in subjects)
+        return [subject async for subject in subjects]
 
     async def subject_delete(
         self,
@@ -741,8 +879,30 @@ class KarapaceSchemaRegistryController:
                 },
             ) from exc
 
+        schema_type: SchemaType | None = None
+        if schema_request.schema_type is not SchemaType.AVRO:
+            schema_type = schema_request.schema_type
+        schema_versions = sorted(subject_data.values(), key=lambda item: item.version, reverse=True)
+
+        # A stored version with the same normalized schema and references matches without parsing it,
+        # only the newer versions are parsed and matched in case one of them is semantically equal.
+        exact_match = next(
+            (
+                schema_version
+                for schema_version in self.schema_registry.database.find_subject_schemas_by_fingerprint(
+                    subject=subject, fingerprint=new_schema.fingerprint(), include_deleted=deleted
+                )
+                if schema_version.schema.schema_type is new_schema.schema_type and schema_version.version in subject_data
+            ),
+            None,
+        )
+        if exact_match is not None:
+            schema_versions = [
+                schema_version for schema_version in schema_versions if schema_version.version > exact_match.version
+            ]
+
         # Match schemas based on version from latest to oldest
-        for schema_version in sorted(subject_data.values(), key=lambda item: item.version, reverse=True):
+        for schema_version in schema_versions:
             other_references, other_dependencies = self.schema_registry.resolve_references(schema_version.references)
             try:
                 parsed_typed_schema = ParsedTypedSchema.parse(
@@ -771,9 +931,6 @@ class KarapaceSchemaRegistryController:
             else:
                 schema_valid = new_schema.match(parsed_typed_schema)
             if parsed_typed_schema.schema_type == new_schema.schema_type and schema_valid:
-                schema_type: SchemaType | None = None
-                if schema_request.schema_type is not SchemaType.AVRO:
-                    schema_type = schema_request.schema_type
                 return SchemaResponse(
                     subject=subject,
                     version=schema_version.version.value,
@@ -783,6 +940,14 @@ class KarapaceSchemaRegistryController:
                 )
             LOG.debug("Schema %r did not match %r", schema_version, parsed_typed_schema)
 
+        if exact_match is not None:
+            return SchemaResponse(
+                subject=subject,
+                version=exact_match.version.value,
+                id=exact_match.schema_id,
+                schema=exact_match.schema.schema_str,
+                schemaType=schema_type,
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail={
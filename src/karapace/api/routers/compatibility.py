@@ -32,6 +32,7 @@ async def compatibility_post(
     version: str,  # TODO support actual Version object
     schema_request: SchemaRequest,
     user: Annotated[User, Depends(get_current_user)],
+    verbose: bool = False,
     authorizer: AuthenticatorAndAuthorizer = Depends(Provide[AuthContainer.authorizer]),
     controller: KarapaceSchemaRegistryController = Depends(Provide[SchemaRegistryContainer.schema_registry_controller]),
 ) -> CompatibilityCheckResponse:
@@ -39,4 +40,6 @@ async def compatibility_post(
     if authorizer and not authorizer.check_authorization(user, Operation.Read, f"Subject:{subject}"):
         raise unauthorized()
 
-    return await controller.compatibility_check(subject=subject, schema_request=schema_request, version=version)
+    return await controller.compatibility_check(
+        subject=subject, schema_request=schema_request, version=version, verbose=verbose
+    )
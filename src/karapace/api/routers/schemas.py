@@ -5,6 +5,7 @@ See LICENSE for details
 
 from dependency_injector.wiring import inject, Provide
 from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
 from karapace.api.container import SchemaRegistryContainer
 from karapace.api.controller import KarapaceSchemaRegistryController
 from karapace.api.routers.requests import SchemaListingItem, SchemasResponse, SubjectVersion
@@ -22,18 +23,24 @@ schemas_router = APIRouter(
 
 
 # TODO is this needed? Is this actually the ids/schema/id/schema??
-@schemas_router.get("")
+@schemas_router.get("", response_model=list[SchemaListingItem])
 @inject
 async def schemas_get_list(
     user: Annotated[User, Depends(get_current_user)],
     deleted: bool = False,
     latestOnly: bool = False,
+    offset: int = 0,
+    limit: int = -1,
+    subjectPrefix: str = "",
     authorizer: AuthenticatorAndAuthorizer = Depends(Provide[AuthContainer.authorizer]),
     controller: KarapaceSchemaRegistryController = Depends(Provide[SchemaRegistryContainer.schema_registry_controller]),
-) -> list[SchemaListingItem]:
+) -> list[SchemaListingItem] | StreamingResponse:
     return await controller.schemas_list(
         deleted=deleted,
         latest_only=latestOnly,
+        offset=offset,
+        limit=limit,
+        subject_prefix=subjectPrefix,
         user=user,
         authorizer=authorizer,
     )
@@ -68,7 +75,7 @@ async def schemas_get(
 #    return await controller.schemas_get()
 
 
-@schemas_router.get("/ids/{schema_id}/versions")
+@schemas_router.get("/ids/{schema_id}/versions", response_model=list[SubjectVersion])
 @inject
 async def schemas_get_versions(
     user: Annotated[User, Depends(get_current_user)],
@@ -5,6 +5,7 @@ See LICENSE for details
 
 from dependency_injector.wiring import inject, Provide
 from fastapi import APIRouter, Depends, Request
+from fastapi.responses import StreamingResponse
 from karapace.api.container import SchemaRegistryContainer
 from karapace.api.controller import KarapaceSchemaRegistryController
 from karapace.api.forward_client import ForwardClient
@@ -32,16 +33,22 @@ subjects_router = APIRouter(
 )
 
 
-@subjects_router.get("")
+@subjects_router.get("", response_model=list[str])
 @inject
 async def subjects_get(
     user: Annotated[User, Depends(get_current_user)],
     deleted: bool = False,
+    offset: int = 0,
+    limit: int = -1,
+    subjectPrefix: str = "",
     authorizer: AuthenticatorAndAuthorizer = Depends(Provide[AuthContainer.authorizer]),
     controller: KarapaceSchemaRegistryController = Depends(Provide[SchemaRegistryContainer.schema_registry_controller]),
-) -> list[str]:
+) -> list[str] | StreamingResponse:
     return await controller.subjects_list(
         deleted=deleted,
+        offset=offset,
+        limit=limit,
+        subject_prefix=subjectPrefix,
         user=user,
         authorizer=authorizer,
     )
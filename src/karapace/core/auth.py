@@ -6,13 +6,16 @@ See LICENSE for details
 from __future__ import annotations
 
 from base64 import b64encode
+from collections import OrderedDict
+from collections.abc import Iterable
 from dataclasses import dataclass, field
 from enum import Enum, unique
 from hmac import compare_digest
 from karapace.core.config import Config, InvalidConfiguration
 from karapace.core.stats import StatsClient
 from karapace.core.utils import json_decode, json_encode
-from typing import Protocol
+from threading import Lock
+from typing import Final, Protocol
 from typing_extensions import override, TypedDict
 from watchfiles import awatch, Change
 
@@ -28,6 +31,12 @@ import sys
 
 log = logging.getLogger(__name__)
 
+SUBJECT_RESOURCE_PREFIX: Final = "Subject:"
+_REGEX_METACHARACTERS: Final = frozenset(".^$*+?{}[]\\|()")
+_REGEX_QUANTIFIERS: Final = frozenset("*+?{")
+# Remainders of a pattern after the literal prefix which match any resource starting with the prefix
+_ANY_SUFFIX_PATTERNS: Final = frozenset({"", ".*", ".*?"})
+
 
 class AuthenticationError(Exception):
     pass
@@ -80,6 +89,111 @@ class ACLEntry:
     resource: re.Pattern
 
 
+def _split_literal_prefix(pattern: re.Pattern) -> tuple[str, str]:
+    """Split the pattern into the literal prefix of all the matched resources and the rest of the pattern.
+
+    Patterns with flags or alternations are not analyzed, the literal prefix of those is empty.
+    """
+    source = pattern.pattern
+    if pattern.flags & ~re.UNICODE or "|" in source:
+        return "", source
+    literal: list[str] = []
+    index = 0
+    while index < len(source):
+        char = source[index]
+        if char == "\\" and index + 1 < len(source) and not source[index + 1].isalnum():
+            char = source[index + 1]
+            width = 2
+        elif char in _REGEX_METACHARACTERS:
+            break
+        else:
+            width = 1
+        # A quantified character is not part of the literal prefix
+        if index + width < len(source) and source[index + width] in _REGEX_QUANTIFIERS:
+            break
+        literal.append(char)
+        index += width
+    return "".join(literal), source[index:]
+
+
+@dataclass(frozen=True)
+class SubjectAuthorizationPlan:
+    """The subjects a user is authorized to for an operation, compiled from the ACL entries of the user.
+
+    `subject_prefixes` are the prefixes of all the subject names the entries can match, `None` if the entries
+    can match any subject name. The subjects starting with one of `allowed_prefixes` are authorized without
+    running a regular expression, the other subjects are checked with `patterns`.
+    """
+
+    allow_all: bool
+    subject_prefixes: tuple[str, ...] | None
+    allowed_prefixes: tuple[str, ...] = ()
+    patterns: tuple[re.Pattern, ...] = ()
+
+    def allows(self, subject: str) -> bool:
+        if self.allow_all or subject.startswith(self.allowed_prefixes):
+            return True
+        resource = f"{SUBJECT_RESOURCE_PREFIX}{subject}"
+        return any(pattern.match(resource) is not None for pattern in self.patterns)
+
+    def scan_prefixes(self, subject_prefix: str = "") -> list[str]:
+        """Disjoint subject prefixes in name order, covering the subjects starting with `subject_prefix` the plan allows.
+
+        The subjects can be enumerated by scanning a sorted subject index for each of the prefixes in order.
+        """
+        if self.subject_prefixes is None:
+            return [subject_prefix]
+        prefixes = set()
+        for prefix in self.subject_prefixes:
+            if prefix.startswith(subject_prefix):
+                prefixes.add(prefix)
+            elif subject_prefix.startswith(prefix):
+                prefixes.add(subject_prefix)
+        disjoint_prefixes: list[str] = []
+        for prefix in sorted(prefixes):
+            if not disjoint_prefixes or not prefix.startswith(disjoint_prefixes[-1]):
+                disjoint_prefixes.append(prefix)
+        return disjoint_prefixes
+
+
+ALLOW_ALL_SUBJECTS: Final = SubjectAuthorizationPlan(allow_all=True, subject_prefixes=None)
+DENY_ALL_SUBJECTS: Final = SubjectAuthorizationPlan(allow_all=False, subject_prefixes=())
+
+
+def compile_subject_authorization_plan(entries: Iterable[ACLEntry]) -> SubjectAuthorizationPlan:
+    """Compile the ACL entries of a user and an operation into a plan for authorizing subjects."""
+    subject_prefixes: list[str] | None = []
+    allowed_prefixes: list[str] = []
+    patterns: list[re.Pattern] = []
+    for entry in entries:
+        literal_prefix, remainder = _split_literal_prefix(entry.resource)
+        subject_prefix: str | None
+        if SUBJECT_RESOURCE_PREFIX.startswith(literal_prefix):
+            subject_prefix = None
+        elif literal_prefix.startswith(SUBJECT_RESOURCE_PREFIX):
+            subject_prefix = literal_prefix[len(SUBJECT_RESOURCE_PREFIX) :]
+        else:
+            # The entry is for other resources than subjects
+            continue
+        matches_any_suffix = remainder in _ANY_SUFFIX_PATTERNS
+        if subject_prefix is None:
+            if matches_any_suffix:
+                return ALLOW_ALL_SUBJECTS
+            subject_prefixes = None
+        elif subject_prefixes is not None:
+            subject_prefixes.append(subject_prefix)
+        if matches_any_suffix and subject_prefix is not None:
+            allowed_prefixes.append(subject_prefix)
+        else:
+            patterns.append(entry.resource)
+    return SubjectAuthorizationPlan(
+        allow_all=False,
+        subject_prefixes=None if subject_prefixes is None else tuple(subject_prefixes),
+        allowed_prefixes=tuple(allowed_prefixes),
+        patterns=tuple(patterns),
+    )
+
+
 class UserData(TypedDict):
     username: str
     algorithm: str
@@ -109,6 +223,8 @@ class AuthorizeProtocol(Protocol):
 
     def check_authorization_any(self, user: User | None, operation: Operation, resources: list[str]) -> bool: ...
 
+    def subject_authorization_plan(self, user: User | None, operation: Operation) -> SubjectAuthorizationPlan: ...
+
 
 class AuthenticatorAndAuthorizer(AuthenticateProtocol, AuthorizeProtocol):
     MUST_AUTHENTICATE: bool = True
@@ -137,6 +253,10 @@ class NoAuthAndAuthz(AuthenticatorAndAuthorizer):
     def check_authorization_any(self, user: User | None, operation: Operation, resources: list[str]) -> bool:
         return True
 
+    @override
+    def subject_authorization_plan(self, user: User | None, operation: Operation) -> SubjectAuthorizationPlan:
+        return ALLOW_ALL_SUBJECTS
+
     @override
     async def close(self) -> None:
         pass
@@ -150,6 +270,9 @@ class ACLAuthorizer(AuthorizeProtocol):
     def __init__(self, *, user_db: dict[str, User] | None = None, permissions: list[ACLEntry] | None = None) -> None:
         self.user_db = user_db or {}
         self.permissions = permissions or []
+        # Compiled plans by user and operation, valid for the permissions in `_plans_permissions`
+        self._plans: dict[tuple[str, Operation], SubjectAuthorizationPlan] = {}
+        self._plans_permissions: list[ACLEntry] | None = None
 
     def get_user(self, username: str) -> User | None:
         user = self.user_db.get(username)
@@ -169,20 +292,22 @@ class ACLAuthorizer(AuthorizeProtocol):
         An entry at minimum gives Read permission. Write permission implies Read."""
         return operation == Operation.Read or aclentry.operation == Operation.Write
 
-    @override
-    def check_authorization(self, user: User | None, operation: Operation, resource: str) -> bool:
-        if user is None:
-            return False
-
-        for aclentry in self.permissions:
+    def _is_authorized(self, permissions: list[ACLEntry], user: User, operation: Operation, resources: list[str]) -> bool:
+        for aclentry in permissions:
             if (
                 aclentry.username == user.username
                 and self._check_operation(operation, aclentry)
-                and self._check_resources([resource], aclentry)
+                and self._check_resources(resources, aclentry)
             ):
                 return True
         return False
 
+    @override
+    def check_authorization(self, user: User | None, operation: Operation, resource: str) -> bool:
+        if user is None:
+            return False
+        return self._is_authorized(self.permissions, user, operation, [resource])
+
     @override
     def check_authorization_any(self, user: User | None, operation: Operation, resources: list[str]) -> bool:
         """Checks that user is authorized to one of the resources in the list.
@@ -192,24 +317,72 @@ class ACLAuthorizer(AuthorizeProtocol):
         """
         if user is None:
             return False
+        return self._is_authorized(self.permissions, user, operation, resources)
 
-        for aclentry in self.permissions:
-            if (
-                aclentry.username == user.username
-                and self._check_operation(operation, aclentry)
-                and self._check_resources(resources, aclentry)
-            ):
-                return True
-        return False
+    @override
+    def subject_authorization_plan(self, user: User | None, operation: Operation) -> SubjectAuthorizationPlan:
+        if user is None:
+            return DENY_ALL_SUBJECTS
+        permissions = self.permissions
+        if self._plans_permissions is not permissions:
+            # The permissions are replaced on reload
+            self._plans = {}
+            self._plans_permissions = permissions
+        key = (user.username, operation)
+        plan = self._plans.get(key)
+        if plan is None:
+            plan = compile_subject_authorization_plan(
+                aclentry
+                for aclentry in permissions
+                if aclentry.username == user.username and self._check_operation(operation, aclentry)
+            )
+            self._plans[key] = plan
+        return plan
+
+
+class AuthorizationDecisionCache:
+    """Thread safe least recently used bound of the authorization decisions made with `permissions`.
+
+    A cache is never updated for other permissions, reloaded permissions get a new cache.
+    """
+
+    def __init__(self, permissions: list[ACLEntry], max_size: int) -> None:
+        self.permissions = permissions
+        self._max_size = max_size
+        self._lock = Lock()
+        self._decisions: OrderedDict[tuple[str, Operation, str], bool] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._decisions)
+
+    def get(self, key: tuple[str, Operation, str]) -> bool | None:
+        with self._lock:
+            decision = self._decisions.get(key)
+            if decision is not None:
+                self._decisions.move_to_end(key)
+            return decision
+
+    def put(self, key: tuple[str, Operation, str], decision: bool) -> None:
+        if self._max_size <= 0:
+            return
+        with self._lock:
+            self._decisions[key] = decision
+            self._decisions.move_to_end(key)
+            while len(self._decisions) > self._max_size:
+                self._decisions.popitem(last=False)
 
 
 class HTTPAuthorizer(ACLAuthorizer, AuthenticatorAndAuthorizer):
-    def __init__(self, auth_file: str) -> None:
+    def __init__(self, auth_file: str, decision_cache_size: int = 0) -> None:
         super().__init__()
         self._auth_filename: str = auth_file
         self._auth_mtime: float = -1
         self._refresh_auth_task: asyncio.Task | None = None
         self._refresh_auth_awatch_stop_event = asyncio.Event()
+        self._decision_cache_size = decision_cache_size
+        self._decision_cache = AuthorizationDecisionCache(self.permissions, decision_cache_size)
+        self._stats: StatsClient | None = None
 
     @property
     def authfile_last_modified(self) -> float:
@@ -218,6 +391,7 @@ class HTTPAuthorizer(ACLAuthorizer, AuthenticatorAndAuthorizer):
     @override
     async def start(self, stats: StatsClient) -> None:
         """Start authfile refresher task"""
+        self._stats = stats
         self._load_authfile()
 
         async def _refresh_authfile() -> None:
@@ -275,6 +449,8 @@ class HTTPAuthorizer(ACLAuthorizer, AuthenticatorAndAuthorizer):
                     users,
                 )
                 self.permissions = permissions
+                # The decisions of the previous permissions are dropped with the cache
+                self._decision_cache = AuthorizationDecisionCache(permissions, self._decision_cache_size)
                 log.info(
                     "Loaded schema registry access control rules: %s",
                     [(entry.username, entry.operation.value, entry.resource.pattern) for entry in permissions],
@@ -283,6 +459,35 @@ class HTTPAuthorizer(ACLAuthorizer, AuthenticatorAndAuthorizer):
         except Exception as ex:
             raise InvalidConfiguration("Failed to load auth file") from ex
 
+    def _current_decision_cache(self) -> AuthorizationDecisionCache:
+        cache = self._decision_cache
+        if cache.permissions is not self.permissions:
+            # The permissions were replaced without reloading the authfile
+            cache = AuthorizationDecisionCache(self.permissions, self._decision_cache_size)
+            self._decision_cache = cache
+        return cache
+
+    @override
+    def check_authorization(self, user: User | None, operation: Operation, resource: str) -> bool:
+        if user is None:
+            return False
+        if self._decision_cache_size <= 0:
+            return self._is_authorized(self.permissions, user, operation, [resource])
+        cache = self._current_decision_cache()
+        key = (user.username, operation, resource)
+        decision = cache.get(key)
+        if self._stats is not None:
+            self._stats.authorization_decision_cache_lookup(hit=decision is not None)
+        if decision is None:
+            # Decided with the permissions of the cache, also if the permissions are reloaded meanwhile
+            decision = self._is_authorized(cache.permissions, user, operation, [resource])
+            cache.put(key, decision)
+        return decision
+
+    @override
+    def check_authorization_any(self, user: User | None, operation: Operation, resources: list[str]) -> bool:
+        return any(self.check_authorization(user, operation, resource) for resource in resources)
+
     @override
     def authenticate(self, *, username: str, password: str) -> User | None:
         user = self.get_user(username)
@@ -15,7 +15,11 @@ from karapace.core.container import KarapaceContainer
 class AuthContainer(containers.DeclarativeContainer):
     karapace_container = providers.Container(KarapaceContainer)
     no_auth_authorizer = providers.Singleton(NoAuthAndAuthz)
-    http_authorizer = providers.Singleton(HTTPAuthorizer, auth_file=karapace_container.config().registry_authfile)
+    http_authorizer = providers.Singleton(
+        HTTPAuthorizer,
+        auth_file=karapace_container.config().registry_authfile,
+        decision_cache_size=karapace_container.config().registry_authorization_cache_size,
+    )
     # http_authorizer = providers.Singleton(HTTPAuthorizer, create_http_authorizer)
     authorizer = providers.Factory(
         get_authorizer,
@@ -11,17 +11,24 @@ from avro.compatibility import (
     SchemaIncompatibilityType,
 )
 from avro.schema import Schema as AvroSchema
+from collections import OrderedDict
+from collections.abc import Hashable
 from jsonschema import Draft7Validator
 from karapace.core.compatibility import CompatibilityModes
 from karapace.core.compatibility.jsonschema.checks import compatibility as jsonschema_compatibility, incompatible_schema
 from karapace.core.compatibility.protobuf.checks import check_protobuf_schema_compatibility
 from karapace.core.protobuf.schema import ProtobufSchema
-from karapace.core.schema_models import ParsedTypedSchema, ValidatedTypedSchema
+from karapace.core.schema_models import ParsedTypedSchema, TypedSchema, ValidatedTypedSchema
 from karapace.core.schema_type import SchemaType
 from karapace.core.utils import assert_never
+from threading import Lock
+from typing import TYPE_CHECKING
 
 import logging
 
+if TYPE_CHECKING:
+    from karapace.core.stats import StatsClient
+
 LOG = logging.getLogger(__name__)
 
 
@@ -137,3 +144,78 @@ class SchemaCompatibility:
     @staticmethod
     def check_protobuf_compatibility(reader: ProtobufSchema, writer: ProtobufSchema) -> SchemaCompatibilityResult:
         return check_protobuf_schema_compatibility(reader, writer)
+
+
+def _dependencies_key(schema: TypedSchema) -> tuple[Hashable, ...]:
+    """Identity of the resolved dependencies of the schema, including the transitive dependencies."""
+    if not schema.dependencies:
+        return ()
+    return tuple(
+        sorted(
+            (name, dependency.schema.fingerprint(), _dependencies_key(dependency.schema))
+            for name, dependency in schema.dependencies.items()
+        )
+    )
+
+
+class CompatibilityVerdictCache:
+    """Thread safe least recently used bound of compatibility check results.
+
+    The results are keyed by the fingerprints of both schemas, the fingerprints of their resolved
+    dependencies and the compatibility mode. The fingerprint of a schema covers its references but
+    not the referenced content, which can change when a referenced version is deleted and registered
+    again, hence the dependencies are part of the key.
+    """
+
+    def __init__(self, *, max_size: int, stats: "StatsClient | None" = None) -> None:
+        self._max_size = max_size
+        self._stats = stats
+        self._lock = Lock()
+        self._results: OrderedDict[Hashable, SchemaCompatibilityResult] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._results)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+
+    def check_compatibility(
+        self,
+        old_schema: ParsedTypedSchema,
+        new_schema: ValidatedTypedSchema,
+        compatibility_mode: CompatibilityModes,
+    ) -> SchemaCompatibilityResult:
+        """Same as `SchemaCompatibility.check_compatibility`, using the cached result when available."""
+        if self._max_size <= 0 or compatibility_mode is CompatibilityModes.NONE:
+            return SchemaCompatibility.check_compatibility(old_schema, new_schema, compatibility_mode)
+
+        key = (
+            old_schema.schema_type,
+            old_schema.fingerprint(),
+            _dependencies_key(old_schema),
+            new_schema.schema_type,
+            new_schema.fingerprint(),
+            _dependencies_key(new_schema),
+            compatibility_mode,
+        )
+        with self._lock:
+            result = self._results.get(key)
+            if result is not None:
+                self._results.move_to_end(key)
+        if self._stats is not None:
+            self._stats.compatibility_verdict_cache_lookup(hit=result is not None)
+        if result is None:
+            result = SchemaCompatibility.check_compatibility(old_schema, new_schema, compatibility_mode)
+            with self._lock:
+                self._results[key] = result
+                while len(self._results) > self._max_size:
+                    self._results.popitem(last=False)
+        # The result is copied, a caller modifying it does not change the cached result
+        return SchemaCompatibilityResult(
+            compatibility=result.compatibility,
+            incompatibilities=list(result.incompatibilities),
+            messages=set(result.messages),
+            locations=set(result.locations),
+        )
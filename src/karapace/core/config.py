@@ -86,8 +86,13 @@ class Config(BaseSettings):
     registry_password: str | None = None
     registry_ca: str | None = None
     registry_authfile: str | None = None
+    registry_authorization_cache_size: int = 10000
+    schema_registration_group_commit: bool = False
+    schema_registration_group_commit_max_size: int = 100
     rest_authorization: bool = False
     rest_base_uri: str | None = None
+    rest_serde_executor: str = "thread"
+    rest_serde_executor_max_workers: int = 4
     log_handler: str | None = "stdout"
     log_level: str = "DEBUG"
     log_format: str = "%(name)-20s\t%(threadName)s\t%(levelname)-8s\t%(message)s"
@@ -120,9 +125,18 @@ class Config(BaseSettings):
     name_strategy_validation: bool = True
     master_election_strategy: str = "lowest"
     protobuf_runtime_directory: str = "runtime"
+    protobuf_serde_max_workers: int = 16
     statsd_host: str | None = None
     statsd_port: int = 8125
     kafka_schema_reader_strict_mode: bool = False
+    schema_reader_snapshot_path: str | None = None
+    schema_reader_snapshot_interval_seconds: int = 300
+    schema_reader_replay_workers: int = 0
+    compact_schema_database: bool = False
+    streaming_listings: bool = False
+    compatibility_verdict_cache_size: int = 10000
+    compatibility_parsed_schemas_cache_size: int = 10000
+    compatibility_check_workers: int = 0
     kafka_retriable_errors_silenced: bool = True
     use_protobuf_formatter: bool = False
     waiting_time_before_acting_as_master_ms: int = 5000
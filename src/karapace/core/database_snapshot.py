@@ -0,0 +1,284 @@
+"""
+karapace - Snapshots of the schema reader database
+
+Copyright (c) 2025 Aiven Ltd
+See LICENSE for details
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from karapace.core.dependency import Dependency
+from karapace.core.errors import InvalidReferences, InvalidSchema, InvalidVersion
+from karapace.core.in_memory_database import InMemoryDatabase
+from karapace.core.protobuf.exception import ProtobufException
+from karapace.core.schema_models import parse_protobuf_schema_definition, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.core.schema_references import Reference, Referents
+from karapace.core.typing import JsonObject, SchemaId, Subject, Version
+from karapace.core.utils import json_decode, json_encode, JSONDecodeError
+from pathlib import Path
+from typing import Final
+
+import hashlib
+import logging
+import os
+import tempfile
+
+LOG = logging.getLogger(__name__)
+
+SNAPSHOT_FORMAT_VERSION: Final = 1
+# The first line of a snapshot file is `<magic> <format version> <sha256 of the payload>`,
+# the payload is the JSON encoded `DatabaseSnapshot`.
+SNAPSHOT_MAGIC: Final = "karapace-database-snapshot"
+
+
+class InvalidSnapshot(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class DatabaseSnapshot:
+    """State of the schema reader after consuming the schemas topic up to and including `offset`.
+
+    `record_digest` is the digest of the record at `offset`, it is compared with the record
+    in the topic to detect a snapshot that does not belong to the topic.
+    """
+
+    topic_name: str
+    offset: int
+    record_digest: str
+    compatibility: str
+    keymode: str
+    schemas: list[JsonObject]
+    subjects: list[JsonObject]
+    referenced_by: list[JsonObject]
+
+
+def record_digest(key: bytes | None, value: bytes | None) -> str:
+    digest = hashlib.sha256()
+    for data in (key, value):
+        if data is None:
+            digest.update(b"\x00")
+        else:
+            digest.update(b"\x01" + len(data).to_bytes(8, "big") + data)
+    return digest.hexdigest()
+
+
+def write_snapshot(path: Path, snapshot: DatabaseSnapshot) -> None:
+    """Write the snapshot atomically, a reader sees either the previous or the new snapshot."""
+    payload = json_encode(asdict(snapshot), binary=True, compact=True)
+    header = f"{SNAPSHOT_MAGIC} {SNAPSHOT_FORMAT_VERSION} {hashlib.sha256(payload).hexdigest()}\n".encode()
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fp:
+            fp.write(header)
+            fp.write(payload)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def read_snapshot(path: Path) -> DatabaseSnapshot:
+    """Read and verify a snapshot written by `write_snapshot`.
+
+    Raises:
+        InvalidSnapshot if the file is truncated, corrupted or of an unknown format.
+    """
+    with path.open("rb") as fp:
+        header = fp.readline()
+        payload = fp.read()
+    try:
+        magic, format_version, checksum = header.decode().split()
+    except (UnicodeDecodeError, ValueError) as exc:
+        raise InvalidSnapshot("Invalid snapshot header") from exc
+    if magic != SNAPSHOT_MAGIC or format_version != str(SNAPSHOT_FORMAT_VERSION):
+        raise InvalidSnapshot(f"Unsupported snapshot format {magic} {format_version}")
+    if hashlib.sha256(payload).hexdigest() != checksum:
+        raise InvalidSnapshot("Snapshot checksum mismatch")
+    try:
+        return DatabaseSnapshot(**json_decode(payload, dict))
+    except (JSONDecodeError, TypeError) as exc:
+        raise InvalidSnapshot("Invalid snapshot payload") from exc
+
+
+def _references_to_json(references: Sequence[Reference] | None) -> list[JsonObject] | None:
+    if references is None:
+        return None
+    return [{"name": ref.name, "subject": ref.subject, "version": ref.version.value} for ref in references]
+
+
+def _references_from_json(references: Sequence[JsonObject] | None) -> list[Reference] | None:
+    if references is None:
+        return None
+    return [
+        Reference(name=ref["name"], subject=Subject(ref["subject"]), version=Version(ref["version"])) for ref in references
+    ]
+
+
+def create_snapshot(
+    database: InMemoryDatabase,
+    *,
+    topic_name: str,
+    offset: int,
+    record_digest: str,
+    compatibility: str,
+    keymode: str,
+) -> DatabaseSnapshot:
+    with database.schema_lock_thread:
+        schemas: list[JsonObject] = [
+            {
+                "id": schema_id,
+                "schemaType": schema.schema_type.value,
+                "schema": schema.schema_str,
+                "references": _references_to_json(schema.references),
+            }
+            for schema_id, schema in database.schemas.items()
+        ]
+        subjects: list[JsonObject] = [
+            {
+                "subject": subject,
+                "compatibility": subject_data.compatibility,
+                "versions": [
+                    {
+                        "version": schema_version.version.value,
+                        "id": schema_version.schema_id,
+                        "deleted": schema_version.deleted,
+                        "references": _references_to_json(schema_version.references),
+                    }
+                    for schema_version in subject_data.schemas.values()
+                ],
+            }
+            for subject, subject_data in database.subjects.items()
+        ]
+        referenced_by: list[JsonObject] = [
+            {"subject": subject, "version": version.value, "ids": sorted(referents)}
+            for (subject, version), referents in database.referenced_by.items()
+        ]
+    return DatabaseSnapshot(
+        topic_name=topic_name,
+        offset=offset,
+        record_digest=record_digest,
+        compatibility=compatibility,
+        keymode=keymode,
+        schemas=schemas,
+        subjects=subjects,
+        referenced_by=referenced_by,
+    )
+
+
+class _SchemaBuilder:
+    """Builds the schemas of a snapshot, resolving the Protobuf dependencies from the snapshot itself."""
+
+    def __init__(self, snapshot: DatabaseSnapshot) -> None:
+        self._schema_data: dict[SchemaId, JsonObject] = {SchemaId(data["id"]): data for data in snapshot.schemas}
+        self._version_schema_ids: dict[tuple[Subject, Version], SchemaId] = {
+            (Subject(subject_data["subject"]), Version(version_data["version"])): SchemaId(version_data["id"])
+            for subject_data in snapshot.subjects
+            for version_data in subject_data["versions"]
+        }
+        self._schemas: dict[SchemaId, TypedSchema] = {}
+        self._validated_schemas: dict[SchemaId, ValidatedTypedSchema] = {}
+        self._resolving: set[SchemaId] = set()
+
+    def schema_ids(self) -> list[SchemaId]:
+        return list(self._schema_data)
+
+    def schema(self, schema_id: SchemaId) -> TypedSchema:
+        schema = self._schemas.get(schema_id)
+        if schema is None:
+            data = self._schema_data[schema_id]
+            schema_type = SchemaType(data["schemaType"])
+            references = _references_from_json(data["references"])
+            if schema_type is SchemaType.PROTOBUF and references:
+                dependencies = self._dependencies(references)
+                parsed_schema = parse_protobuf_schema_definition(
+                    data["schema"], references, dependencies, validate_references=False, normalize=False
+                )
+                schema = TypedSchema(
+                    schema_type=schema_type,
+                    schema_str=str(parsed_schema),
+                    references=references,
+                    dependencies=dependencies,
+                    schema=parsed_schema,
+                )
+            else:
+                schema = TypedSchema(schema_type=schema_type, schema_str=data["schema"], references=references)
+            self._schemas[schema_id] = schema
+        return schema
+
+    def _validated_schema(self, schema_id: SchemaId) -> ValidatedTypedSchema:
+        validated_schema = self._validated_schemas.get(schema_id)
+        if validated_schema is None:
+            if schema_id in self._resolving:
+                raise InvalidReferences(f"Circular reference to schema id {schema_id}")
+            self._resolving.add(schema_id)
+            data = self._schema_data[schema_id]
+            references = _references_from_json(data["references"])
+            validated_schema = ValidatedTypedSchema.parse(
+                schema_type=SchemaType(data["schemaType"]),
+                schema_str=data["schema"],
+                references=references,
+                dependencies=self._dependencies(references) if references else None,
+            )
+            self._resolving.discard(schema_id)
+            self._validated_schemas[schema_id] = validated_schema
+        return validated_schema
+
+    def _dependencies(self, references: Sequence[Reference]) -> dict[str, Dependency]:
+        dependencies = {}
+        for reference in references:
+            schema_id = self._version_schema_ids.get((reference.subject, reference.version))
+            if schema_id is None:
+                raise InvalidReferences(f"Subject {reference.subject} has no such schema version")
+            dependencies[reference.name] = Dependency.of(reference, self._validated_schema(schema_id))
+        return dependencies
+
+
+def restore_snapshot(database: InMemoryDatabase, snapshot: DatabaseSnapshot) -> None:
+    """Load the snapshot into an empty database.
+
+    Raises:
+        InvalidSnapshot if the snapshot content is not valid, the database may be partially loaded.
+    """
+    try:
+        builder = _SchemaBuilder(snapshot)
+        # The schemas are inserted in the original order first, this also restores the
+        # schemas of the hard deleted versions.
+        for schema_id in builder.schema_ids():
+            database.insert_schema(schema_id=schema_id, schema=builder.schema(schema_id))
+        for subject_data in snapshot.subjects:
+            subject = Subject(subject_data["subject"])
+            database.insert_subject(subject=subject)
+            for version_data in subject_data["versions"]:
+                schema_id = SchemaId(version_data["id"])
+                database.insert_schema_version(
+                    subject=subject,
+                    schema_id=schema_id,
+                    version=Version(version_data["version"]),
+                    deleted=version_data["deleted"],
+                    schema=builder.schema(schema_id),
+                    references=_references_from_json(version_data["references"]),
+                )
+            if subject_data["compatibility"] is not None:
+                database.set_subject_compatibility(subject=subject, compatibility=subject_data["compatibility"])
+        # The referents of the deleted versions are kept, same as when consuming the topic.
+        with database.schema_lock_thread:
+            database.referenced_by.clear()
+            for referents_data in snapshot.referenced_by:
+                key = (Subject(referents_data["subject"]), Version(referents_data["version"]))
+                database.referenced_by[key] = Referents(set(referents_data["ids"]))
+    except (
+        InvalidReferences,
+        InvalidSchema,
+        InvalidVersion,
+        JSONDecodeError,
+        KeyError,
+        ProtobufException,
+        TypeError,
+        ValueError,
+    ) as exc:
+        raise InvalidSnapshot(f"Invalid snapshot content: {exc}") from exc
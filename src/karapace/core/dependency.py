@@ -7,11 +7,13 @@ See LICENSE for details
 
 from __future__ import annotations
 
+from collections.abc import Iterable
 from karapace.core.errors import InvalidSchema
 from karapace.core.protobuf.protopace.protopace import Proto
 from karapace.core.schema_references import Reference
 from karapace.core.schema_type import SchemaType
-from karapace.core.typing import JsonData, Subject, Version
+from karapace.core.typing import JsonData, SchemaId, Subject, Version
+from threading import Lock
 from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -76,3 +78,58 @@ class Dependency:
             and self.version == other.version
             and self.schema == other.schema
         )
+
+
+class ResolvedSchemas:
+    """Validated schemas of the referenced subject versions, shared by the schemas referencing them.
+
+    Each referenced version of a reference graph is resolved and parsed once. The entries are keyed by
+    subject and version and are used only for the schema id they were resolved for. The owner discards
+    the entries of the changed versions and of the versions referencing them.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._schemas: dict[tuple[Subject, Version], tuple[SchemaId, ValidatedTypedSchema]] = {}
+        # Increased on discards, a schema resolved before a discard is not stored
+        self._generation = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._schemas)
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, *, subject: Subject, version: Version, schema_id: SchemaId) -> ValidatedTypedSchema | None:
+        with self._lock:
+            entry = self._schemas.get((subject, version))
+        if entry is None or entry[0] != schema_id:
+            return None
+        return entry[1]
+
+    def put(
+        self,
+        *,
+        subject: Subject,
+        version: Version,
+        schema_id: SchemaId,
+        schema: ValidatedTypedSchema,
+        generation: int,
+    ) -> None:
+        with self._lock:
+            if generation == self._generation:
+                self._schemas[(subject, version)] = (schema_id, schema)
+
+    def discard(self, keys: Iterable[tuple[Subject, Version]]) -> None:
+        with self._lock:
+            self._generation += 1
+            for key in keys:
+                self._schemas.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._schemas.clear()
@@ -8,19 +8,20 @@ See LICENSE for details
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from collections.abc import Iterable, Sequence
+from collections.abc import Iterable, Iterator, Sequence
 from dataclasses import dataclass, field
 from karapace.core.schema_models import SchemaVersion, TypedSchema, Versioner
 from karapace.core.schema_references import Reference, Referents
 from karapace.core.typing import SchemaId, Subject, Version
 from threading import Lock, RLock
 
+import bisect
 import logging
 
 LOG = logging.getLogger(__name__)
 
 
-@dataclass
+@dataclass(slots=True)
 class SubjectData:
     schemas: dict[Version, SchemaVersion] = field(default_factory=dict)
     compatibility: str | None = None
@@ -41,6 +42,13 @@ class KarapaceDatabase(ABC):
     ) -> SchemaId | None:
         pass
 
+    @abstractmethod
+    def find_subject_schemas_by_fingerprint(
+        self, *, subject: Subject, fingerprint: str, include_deleted: bool
+    ) -> list[SchemaVersion]:
+        """Versions of the subject with a schema of the given fingerprint, the latest version first."""
+        pass
+
     @abstractmethod
     def get_next_version(self, *, subject: Subject) -> Version:
         pass
@@ -102,6 +110,54 @@ class KarapaceDatabase(ABC):
     def find_subject_schemas(self, *, subject: Subject, include_deleted: bool) -> dict[Version, SchemaVersion]:
         pass
 
+    @abstractmethod
+    def scan_subjects(
+        self,
+        *,
+        include_deleted: bool,
+        subject_prefix: str = "",
+        start_after: Subject | None = None,
+        limit: int | None = None,
+    ) -> list[Subject]:
+        """Range scan of the subjects in name order.
+
+        Returns at most `limit` subjects starting with `subject_prefix` and ordered after `start_after`.
+        The last returned subject is the continuation token for the next page.
+        """
+        pass
+
+    @abstractmethod
+    def scan_schemas(
+        self,
+        *,
+        include_deleted: bool,
+        latest_only: bool,
+        subject_prefix: str = "",
+        start_after: tuple[Subject, Version] | None = None,
+        limit: int | None = None,
+    ) -> list[SchemaVersion]:
+        """Range scan of the schema versions in subject name and version order.
+
+        Returns at most `limit` versions of the subjects starting with `subject_prefix` and ordered after
+        `start_after`. The subject and version of the last returned version is the continuation token for
+        the next page. With `latest_only` only the latest selected version of each subject is returned.
+        """
+        pass
+
+    @abstractmethod
+    def revision(self) -> int:
+        """Revision of the database, increased when existing subject versions are changed or deleted."""
+        pass
+
+    @abstractmethod
+    def subject_revision(self, *, subject: Subject) -> int:
+        """Revision of the last change or delete of the existing versions of the subject.
+
+        Adding a version does not change the revision. The revisions of all subjects are taken from
+        `revision()`, an unchanged revision means the existing versions of the subject are unchanged.
+        """
+        pass
+
     @abstractmethod
     def delete_subject(self, *, subject: Subject, version: Version) -> None:
         pass
@@ -147,6 +203,47 @@ class InMemoryDatabase(KarapaceDatabase):
         # but the schema themselves don't match)
         self._hash_to_schema: dict[str, TypedSchema] = {}
         self._hash_to_schema_id_on_subject: dict[Subject, dict[str, SchemaId]] = {}
+        # Versions of the subjects by schema fingerprint, including the soft deleted versions.
+        self._hash_to_versions_on_subject: dict[Subject, dict[str, set[Version]]] = {}
+        # Index of the schema ids by schema content, used to reuse the id of an
+        # existing schema. Multiple ids are possible with corrupt data, the ids are
+        # kept in insertion order. Schemas are never removed from `self.schemas`, also
+        # not on deletes, so this only changes when an id is inserted or overwritten.
+        self._hash_to_schema_ids: dict[str, list[SchemaId]] = {}
+        # Reverse index of the subject versions using a schema id, including soft
+        # deleted versions. The dictionary is used as an insertion ordered set.
+        self._schema_id_to_subject_versions: dict[SchemaId, dict[tuple[Subject, Version], None]] = {}
+        # Running counts of the versions, updated by the mutating methods to make
+        # `num_schema_versions` constant time.
+        self._num_live_versions = 0
+        self._num_soft_deleted_versions = 0
+        # Subject names in sorted order for the range scans, built on the first scan and
+        # kept up to date after it.
+        self._sorted_subjects: list[Subject] | None = None
+        # Revisions of the subjects with changed or deleted versions, the other subjects
+        # are at the base revision, which is increased on clear.
+        self._revision = 0
+        self._base_revision = 0
+        self._subject_revisions: dict[Subject, int] = {}
+
+    def clear(self) -> None:
+        """Remove all the schemas and subjects, e.g. before replaying the schemas topic from the beginning."""
+        with self.id_lock_thread, self.schema_lock_thread:
+            self.global_schema_id = SchemaId(0)
+            self.subjects.clear()
+            self.schemas.clear()
+            self.referenced_by.clear()
+            self._hash_to_schema.clear()
+            self._hash_to_schema_id_on_subject.clear()
+            self._hash_to_versions_on_subject.clear()
+            self._hash_to_schema_ids.clear()
+            self._schema_id_to_subject_versions.clear()
+            self._num_live_versions = 0
+            self._num_soft_deleted_versions = 0
+            self._sorted_subjects = None
+            self._revision += 1
+            self._base_revision = self._revision
+            self._subject_revisions.clear()
 
     def log_state(self) -> None:
         if LOG.isEnabledFor(logging.DEBUG):
@@ -165,11 +262,26 @@ class InMemoryDatabase(KarapaceDatabase):
             LOG.debug(debug_str)
 
     def _get_schema_id_from_storage(self, *, new_schema: TypedSchema) -> SchemaId | None:
-        for schema_id, schema in self.schemas.items():
-            if schema == new_schema:
+        # The fingerprint does not cover the schema type, the candidates are compared in full.
+        for schema_id in tuple(self._hash_to_schema_ids.get(new_schema.fingerprint(), ())):
+            if self.schemas[schema_id] == new_schema:
                 return schema_id
         return None
 
+    def _set_schema(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        previous_schema = self.schemas.get(schema_id)
+        if previous_schema is schema:
+            return
+        if previous_schema is not None:
+            previous_fingerprint = previous_schema.fingerprint()
+            schema_ids = self._hash_to_schema_ids.get(previous_fingerprint)
+            if schema_ids is not None and schema_id in schema_ids:
+                schema_ids.remove(schema_id)
+                if not schema_ids:
+                    del self._hash_to_schema_ids[previous_fingerprint]
+        self.schemas[schema_id] = schema
+        self._hash_to_schema_ids.setdefault(schema.fingerprint(), []).append(schema_id)
+
     def get_schema_id(self, new_schema: TypedSchema) -> SchemaId:
         with self.id_lock_thread:
             maybe_schema_id = self._get_schema_id_from_storage(new_schema=new_schema)
@@ -203,6 +315,52 @@ class InMemoryDatabase(KarapaceDatabase):
 
     def _delete_subject_from_schema_id_on_subject(self, *, subject: Subject) -> None:
         self._hash_to_schema_id_on_subject.pop(subject, None)
+        self._hash_to_versions_on_subject.pop(subject, None)
+
+    def _set_version_on_subject(self, *, subject: Subject, schema: TypedSchema, version: Version) -> None:
+        self._hash_to_versions_on_subject.setdefault(subject, {}).setdefault(schema.fingerprint(), set()).add(version)
+
+    def _delete_version_from_subject(self, *, subject: Subject, schema: TypedSchema, version: Version) -> None:
+        fingerprint_to_versions = self._hash_to_versions_on_subject.get(subject, None)
+        if fingerprint_to_versions is None:
+            return
+        fingerprint = schema.fingerprint()
+        versions = fingerprint_to_versions.get(fingerprint)
+        if versions is not None:
+            versions.discard(version)
+            if not versions:
+                del fingerprint_to_versions[fingerprint]
+                if not fingerprint_to_versions:
+                    del self._hash_to_versions_on_subject[subject]
+
+    def find_subject_schemas_by_fingerprint(
+        self, *, subject: Subject, fingerprint: str, include_deleted: bool
+    ) -> list[SchemaVersion]:
+        with self.schema_lock_thread:
+            subject_data = self.subjects.get(subject)
+            if subject_data is None:
+                return []
+            versions = self._hash_to_versions_on_subject.get(subject, {}).get(fingerprint, ())
+            schema_versions = [subject_data.schemas[version] for version in sorted(versions, reverse=True)]
+        if include_deleted:
+            return schema_versions
+        return [schema_version for schema_version in schema_versions if not schema_version.deleted]
+
+    def _insert_subject_version_for_schema_id(self, *, schema_id: SchemaId, subject: Subject, version: Version) -> None:
+        self._schema_id_to_subject_versions.setdefault(schema_id, {})[(subject, version)] = None
+
+    def _remove_subject_version_for_schema_id(self, *, schema_id: SchemaId, subject: Subject, version: Version) -> None:
+        subject_versions = self._schema_id_to_subject_versions.get(schema_id)
+        if subject_versions is not None:
+            subject_versions.pop((subject, version), None)
+            if not subject_versions:
+                del self._schema_id_to_subject_versions[schema_id]
+
+    def _count_version(self, *, deleted: bool, amount: int) -> None:
+        if deleted:
+            self._num_soft_deleted_versions += amount
+        else:
+            self._num_live_versions += amount
 
     def _get_from_hash_cache(self, *, typed_schema: TypedSchema) -> TypedSchema:
         return self._hash_to_schema.setdefault(typed_schema.fingerprint(), typed_schema)
@@ -230,11 +388,19 @@ class InMemoryDatabase(KarapaceDatabase):
                 LOG.info("Adding first version of subject: %r with no schemas", subject)
                 self.insert_subject(subject=subject)
 
-            if version in self.subjects[subject].schemas:
+            previous_schema_version = self.subjects[subject].schemas.get(version)
+            if previous_schema_version is not None:
                 LOG.info("Updating entry subject: %r version: %r id: %r", subject, version, schema_id)
+                self._subject_changed(subject)
+                self._count_version(deleted=previous_schema_version.deleted, amount=-1)
+                self._delete_version_from_subject(subject=subject, schema=previous_schema_version.schema, version=version)
+                if previous_schema_version.schema_id != schema_id:
+                    self._remove_subject_version_for_schema_id(
+                        schema_id=previous_schema_version.schema_id, subject=subject, version=version
+                    )
             else:
                 LOG.info("Adding entry subject: %r version: %r id: %r", subject, version, schema_id)
-            self.schemas[schema_id] = schema
+            self._set_schema(schema_id=schema_id, schema=schema)
             self.subjects[subject].schemas[version] = SchemaVersion(
                 subject=subject,
                 version=version,
@@ -243,6 +409,9 @@ class InMemoryDatabase(KarapaceDatabase):
                 schema=schema,
                 references=references,
             )
+            self._insert_subject_version_for_schema_id(schema_id=schema_id, subject=subject, version=version)
+            self._count_version(deleted=deleted, amount=1)
+            self._set_version_on_subject(subject=subject, schema=schema, version=version)
 
             if not deleted:
                 self._set_schema_id_on_subject(
@@ -259,8 +428,18 @@ class InMemoryDatabase(KarapaceDatabase):
                     schema=schema,
                 )
 
+    def insert_schema(self, *, schema_id: SchemaId, schema: TypedSchema) -> None:
+        """Insert a schema without a subject version, as kept for the hard deleted versions."""
+        with self.schema_lock_thread:
+            self.global_schema_id = max(self.global_schema_id, schema_id)
+            self._set_schema(schema_id=schema_id, schema=self._get_from_hash_cache(typed_schema=schema))
+
     def insert_subject(self, *, subject: Subject) -> None:
-        self.subjects.setdefault(subject, SubjectData())
+        with self.schema_lock_thread:
+            if subject not in self.subjects:
+                self.subjects[subject] = SubjectData()
+                if self._sorted_subjects is not None:
+                    bisect.insort(self._sorted_subjects, subject)
 
     def get_subject_compatibility(self, *, subject: Subject) -> str | None:
         if subject in self.subjects:
@@ -294,27 +473,23 @@ class InMemoryDatabase(KarapaceDatabase):
                 res_schemas[subject] = selected_schemas
         return res_schemas
 
+    def _schema_versions_for_schema_id(self, *, schema_id: SchemaId, include_deleted: bool) -> list[SchemaVersion]:
+        schema_versions: list[SchemaVersion] = []
+        for subject, version in self._schema_id_to_subject_versions.get(schema_id, {}):
+            schema_version = self.subjects[subject].schemas[version]
+            if include_deleted or schema_version.deleted is False:
+                schema_versions.append(schema_version)
+        return schema_versions
+
     def subjects_for_schema(self, schema_id: SchemaId) -> list[Subject]:
-        subjects = []
         with self.schema_lock_thread:
-            for subject, subject_data in self.subjects.items():
-                for version in subject_data.schemas.values():
-                    if version.deleted is False and version.schema_id == schema_id:
-                        subjects.append(subject)
-                        break
-
-        return subjects
+            schema_versions = self._schema_versions_for_schema_id(schema_id=schema_id, include_deleted=False)
+        # Deduplicate while preserving order
+        return list(dict.fromkeys(schema_version.subject for schema_version in schema_versions))
 
     def find_schema_versions_by_schema_id(self, *, schema_id: SchemaId, include_deleted: bool) -> list[SchemaVersion]:
-        schema_versions: list[SchemaVersion] = []
         with self.schema_lock_thread:
-            for subject in self.subjects:
-                # find_subject_schemas will also acquire the schema_lock_thread, RLock
-                found_schema_versions = self.find_subject_schemas(subject=subject, include_deleted=include_deleted)
-                for schema_version in found_schema_versions.values():
-                    if schema_version.schema_id == schema_id:
-                        schema_versions.append(schema_version)
-        return schema_versions
+            return self._schema_versions_for_schema_id(schema_id=schema_id, include_deleted=include_deleted)
 
     def find_subject(self, *, subject: Subject) -> Subject | None:
         return subject if subject in self.subjects else None
@@ -339,28 +514,120 @@ class InMemoryDatabase(KarapaceDatabase):
                 if schema_version.deleted is False
             }
 
+    def _subjects_range(self, *, subject_prefix: str, start: Subject | None, include_start: bool) -> Iterator[Subject]:
+        if self._sorted_subjects is None:
+            self._sorted_subjects = sorted(self.subjects)
+        sorted_subjects = self._sorted_subjects
+        position = bisect.bisect_left(sorted_subjects, subject_prefix)
+        if start is not None:
+            start_position = (bisect.bisect_left if include_start else bisect.bisect_right)(sorted_subjects, start)
+            position = max(position, start_position)
+        for index in range(position, len(sorted_subjects)):
+            subject = sorted_subjects[index]
+            if not subject.startswith(subject_prefix):
+                break
+            yield subject
+
+    def scan_subjects(
+        self,
+        *,
+        include_deleted: bool,
+        subject_prefix: str = "",
+        start_after: Subject | None = None,
+        limit: int | None = None,
+    ) -> list[Subject]:
+        subjects: list[Subject] = []
+        with self.schema_lock_thread:
+            for subject in self._subjects_range(subject_prefix=subject_prefix, start=start_after, include_start=False):
+                if limit is not None and len(subjects) >= limit:
+                    break
+                if include_deleted or any(
+                    not schema_version.deleted for schema_version in self.subjects[subject].schemas.values()
+                ):
+                    subjects.append(subject)
+        return subjects
+
+    def scan_schemas(
+        self,
+        *,
+        include_deleted: bool,
+        latest_only: bool,
+        subject_prefix: str = "",
+        start_after: tuple[Subject, Version] | None = None,
+        limit: int | None = None,
+    ) -> list[SchemaVersion]:
+        start_subject, start_version = start_after if start_after is not None else (None, None)
+        schema_versions: list[SchemaVersion] = []
+        with self.schema_lock_thread:
+            # The versions after `start_after` in its own subject are only returned without `latest_only`
+            for subject in self._subjects_range(
+                subject_prefix=subject_prefix, start=start_subject, include_start=not latest_only
+            ):
+                selected_versions = [
+                    schema_version
+                    for schema_version in self.subjects[subject].schemas.values()
+                    if include_deleted or not schema_version.deleted
+                ]
+                if latest_only:
+                    selected_versions = selected_versions[-1:]
+                elif subject == start_subject and start_version is not None:
+                    selected_versions = [
+                        schema_version for schema_version in selected_versions if schema_version.version > start_version
+                    ]
+                for schema_version in selected_versions:
+                    if limit is not None and len(schema_versions) >= limit:
+                        return schema_versions
+                    schema_versions.append(schema_version)
+        return schema_versions
+
+    def revision(self) -> int:
+        with self.schema_lock_thread:
+            return self._revision
+
+    def subject_revision(self, *, subject: Subject) -> int:
+        with self.schema_lock_thread:
+            return self._subject_revisions.get(subject, self._base_revision)
+
+    def _subject_changed(self, subject: Subject) -> None:
+        self._revision += 1
+        self._subject_revisions[subject] = self._revision
+
     def delete_subject(self, *, subject: Subject, version: Version) -> None:
         with self.schema_lock_thread:
+            self._subject_changed(subject)
             for schema_version in self.subjects[subject].schemas.values():
-                if schema_version.version <= version:
+                if schema_version.version <= version and not schema_version.deleted:
                     schema_version.deleted = True
+                    self._count_version(deleted=False, amount=-1)
+                    self._count_version(deleted=True, amount=1)
                 self._delete_from_schema_id_on_subject(subject=subject, schema=schema_version.schema)
 
     def delete_subject_hard(self, *, subject: Subject) -> None:
         with self.schema_lock_thread:
+            self._subject_changed(subject)
             for schema in self.subjects[subject].schemas.values():
                 if schema.references:
                     self._remove_referenced_by(schema.schema_id, schema.references)
+                self._remove_subject_version_for_schema_id(
+                    schema_id=schema.schema_id, subject=subject, version=schema.version
+                )
+                self._count_version(deleted=schema.deleted, amount=-1)
             del self.subjects[subject]
+            if self._sorted_subjects is not None:
+                del self._sorted_subjects[bisect.bisect_left(self._sorted_subjects, subject)]
             self._delete_subject_from_schema_id_on_subject(subject=subject)
 
     def delete_subject_schema(self, *, subject: Subject, version: Version) -> None:
         with self.schema_lock_thread:
             schema = self.subjects[subject].schemas.pop(version, None)
             if schema:
+                self._subject_changed(subject)
                 if schema.references:
                     self._remove_referenced_by(schema.schema_id, schema.references)
+                self._remove_subject_version_for_schema_id(schema_id=schema.schema_id, subject=subject, version=version)
+                self._count_version(deleted=schema.deleted, amount=-1)
                 self._delete_from_schema_id_on_subject(subject=subject, schema=schema.schema)
+                self._delete_version_from_subject(subject=subject, schema=schema.schema, version=version)
 
     def num_schemas(self) -> int:
         return len(self.schemas)
@@ -369,16 +636,8 @@ class InMemoryDatabase(KarapaceDatabase):
         return len(self.subjects)
 
     def num_schema_versions(self) -> tuple[int, int]:
-        live_versions = 0
-        soft_deleted_versions = 0
         with self.schema_lock_thread:
-            for subject_data in self.subjects.values():
-                for version in subject_data.schemas.values():
-                    if not version.deleted:
-                        live_versions += 1
-                    else:
-                        soft_deleted_versions += 1
-        return (live_versions, soft_deleted_versions)
+            return (self._num_live_versions, self._num_soft_deleted_versions)
 
     def _insert_referenced_by(self, *, subject: Subject, version: Version, schema_id: SchemaId) -> None:
         with self.schema_lock_thread:
@@ -398,3 +657,57 @@ class InMemoryDatabase(KarapaceDatabase):
                 key = (ref.subject, ref.version)
                 if self.referenced_by.get(key, None) and schema_id in self.referenced_by[key]:
                     self.referenced_by[key].remove(schema_id)
+
+
+class CompactInMemoryDatabase(InMemoryDatabase):
+    """In memory database sharing the repeated parts of the stored versions.
+
+    The subject names are interned, the `Version` objects and the reference lists with equal
+    content are shared by all the stored versions. This reduces the memory used by registries
+    with many versions, see `performance-test/database-memory-benchmark.py`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._subject_names: dict[Subject, Subject] = {}
+        self._versions: dict[Version, Version] = {}
+        self._references: dict[tuple[Reference, ...], Sequence[Reference]] = {}
+
+    def clear(self) -> None:
+        with self.schema_lock_thread:
+            super().clear()
+            self._subject_names.clear()
+            self._versions.clear()
+            self._references.clear()
+
+    def _intern_subject(self, subject: Subject) -> Subject:
+        return self._subject_names.setdefault(subject, subject)
+
+    def _compact_references(self, references: Sequence[Reference] | None) -> Sequence[Reference] | None:
+        if not references:
+            return references
+        return self._references.setdefault(tuple(references), references)
+
+    def insert_schema_version(
+        self,
+        *,
+        subject: Subject,
+        schema_id: SchemaId,
+        version: Version,
+        deleted: bool,
+        schema: TypedSchema,
+        references: Sequence[Reference] | None,
+    ) -> None:
+        with self.schema_lock_thread:
+            super().insert_schema_version(
+                subject=self._intern_subject(subject),
+                schema_id=schema_id,
+                version=self._versions.setdefault(version, version),
+                deleted=deleted,
+                schema=schema,
+                references=self._compact_references(references),
+            )
+
+    def insert_subject(self, *, subject: Subject) -> None:
+        with self.schema_lock_thread:
+            super().insert_subject(subject=self._intern_subject(subject))
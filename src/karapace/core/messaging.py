@@ -6,6 +6,8 @@ See LICENSE for details
 """
 
 from aiokafka.errors import MessageSizeTooLargeError
+from collections.abc import Sequence
+from functools import partial
 from karapace.core.config import Config
 from karapace.core.errors import SchemaTooLargeException
 from karapace.core.kafka.producer import KafkaProducer
@@ -15,6 +17,7 @@ from karapace.core.utils import json_encode
 from karapace.version import __version__
 from typing import Any, Final
 
+import asyncio
 import logging
 import time
 
@@ -22,6 +25,14 @@ LOG = logging.getLogger(__name__)
 X_REGISTRY_VERSION_HEADER = ("X-Registry-Version", f"karapace-{__version__}".encode())
 
 
+def _delivery_error(error: Exception) -> Exception:
+    if isinstance(error, MessageSizeTooLargeError):
+        schema_too_large = SchemaTooLargeException()
+        schema_too_large.__cause__ = error
+        return schema_too_large
+    return error
+
+
 class KarapaceProducer:
     def __init__(self, *, config: Config, offset_watcher: OffsetWatcher, key_formatter: KeyFormatter):
         self._producer: KafkaProducer | None = None
@@ -61,52 +72,85 @@ class KarapaceProducer:
         if self._producer is not None:
             self._producer.flush()
 
-    def _send_kafka_message(self, key: bytes | str, value: bytes | str) -> None:
+    async def _send_kafka_messages(self, records: Sequence[tuple[bytes | str, bytes | str]]) -> list[Exception | None]:
+        """Produce `records` as one batch and wait until the schema reader has seen them.
+
+        Returns the send or delivery error of each record, `None` for the delivered records.
+        """
         assert self._producer is not None
 
-        if isinstance(key, str):
-            key = key.encode("utf8")
-        if isinstance(value, str):
-            value = value.encode("utf8")
+        errors: list[Exception | None] = [None] * len(records)
+        sent_records: list[tuple[int, bytes, bytes]] = []
+        futures = []
+        for index, (key, value) in enumerate(records):
+            if isinstance(key, str):
+                key = key.encode("utf8")
+            if isinstance(value, str):
+                value = value.encode("utf8")
+            try:
+                future = self._producer.send(
+                    self._schemas_topic,
+                    key=key,
+                    value=value,
+                    headers=[X_REGISTRY_VERSION_HEADER, self._x_origin_host_header],
+                )
+            except Exception as e:
+                # The records sent before are still produced, only this one failed.
+                errors[index] = _delivery_error(e)
+                continue
+            sent_records.append((index, key, value))
+            futures.append(future)
+        if not futures:
+            return errors
 
-        future = self._producer.send(
-            self._schemas_topic,
-            key=key,
-            value=value,
-            headers=[X_REGISTRY_VERSION_HEADER, self._x_origin_host_header],
-        )
-        self._producer.flush(timeout=self._kafka_timeout)
-        try:
-            msg = future.result(self._kafka_timeout)
-        except MessageSizeTooLargeError as ex:
-            raise SchemaTooLargeException from ex
-
-        sent_offset = msg.offset()
-
-        LOG.info(
-            "Waiting for schema reader to catch up. key: %r, value: %r, offset: %r",
-            key,
-            value,
-            sent_offset,
+        # Flushing and the delivery callbacks run in the default executor, the event loop
+        # keeps serving other requests while the messages are delivered.
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, partial(self._producer.flush, timeout=self._kafka_timeout))
+        results = await asyncio.wait_for(
+            asyncio.gather(*(asyncio.wrap_future(future) for future in futures), return_exceptions=True),
+            timeout=self._kafka_timeout,
         )
 
-        if self._offset_watcher.wait_for_offset(sent_offset, timeout=60) is True:
-            LOG.info(
-                "Schema reader has found key. key: %r, value: %r, offset: %r",
-                key,
-                value,
-                sent_offset,
-            )
-        else:
-            raise RuntimeError(
-                "Schema reader timed out while looking for key. key: {!r}, value: {!r}, offset: {}".format(
-                    key, value, sent_offset
+        sent_offset = -1
+        for (index, key, value), result in zip(sent_records, results):
+            if isinstance(result, Exception):
+                errors[index] = _delivery_error(result)
+            else:
+                sent_offset = max(sent_offset, result.offset())
+                LOG.info(
+                    "Waiting for schema reader to catch up. key: %r, value: %r, offset: %r",
+                    key,
+                    value,
+                    result.offset(),
                 )
-            )
+        if sent_offset == -1:
+            return errors
+
+        if await self._offset_watcher.wait_for_offset_async(sent_offset, timeout=60) is True:
+            LOG.info("Schema reader has found offset: %r", sent_offset)
+        else:
+            raise RuntimeError(f"Schema reader timed out while looking for offset: {sent_offset}")
+        return errors
 
-    def send_message(self, *, key: dict[str, Any], value: dict[str, Any] | None) -> None:
+    async def _send_kafka_message(self, key: bytes | str, value: bytes | str) -> None:
+        error = (await self._send_kafka_messages([(key, value)]))[0]
+        if error is not None:
+            raise error
+
+    def _format_message(self, key: dict[str, Any], value: dict[str, Any] | None) -> tuple[bytes | str, bytes | str]:
         key_bytes = self._key_formatter.format_key(key)
         value_bytes: bytes | str = b""
         if value is not None:
             value_bytes = json_encode(value, binary=True, compact=True)
-        self._send_kafka_message(key=key_bytes, value=value_bytes)
+        return key_bytes, value_bytes
+
+    async def send_message(self, *, key: dict[str, Any], value: dict[str, Any] | None) -> None:
+        key_bytes, value_bytes = self._format_message(key, value)
+        await self._send_kafka_message(key=key_bytes, value=value_bytes)
+
+    async def send_messages(
+        self, messages: Sequence[tuple[dict[str, Any], dict[str, Any] | None]]
+    ) -> list[Exception | None]:
+        """Send `messages` in a single batch, returns the delivery error of each message."""
+        return await self._send_kafka_messages([self._format_message(key, value) for key, value in messages])
@@ -8,12 +8,24 @@ See LICENSE for details
 from karapace.core.instrumentation.tracer import Tracer
 from threading import Condition
 
+import asyncio
+import heapq
+import itertools
+
+
+def _resolve_waiter(future: asyncio.Future[None]) -> None:
+    if not future.done():
+        future.set_result(None)
+
 
 class OffsetWatcher:
     """Synchronization container for threads to wait until an offset is seen.
 
     This works under the assumption offsets are used only once, which should be
     correct as long as no unclean leader election is performed.
+
+    Threads wait with `wait_for_offset`, coroutines with `wait_for_offset_async`
+    which does not block the event loop.
     """
 
     def __init__(self) -> None:
@@ -21,6 +33,9 @@ class OffsetWatcher:
         # be performed with this condition acquired
         self._condition = Condition()
         self._greatest_offset = -1  # Would fail if initially this is 0 as it will be first offset ever.
+        # Coroutines waiting for an offset, ordered by the offset. Protected by _condition.
+        self._async_waiters: list[tuple[int, int, asyncio.AbstractEventLoop, asyncio.Future[None]]] = []
+        self._async_waiter_counter = itertools.count()
         self._tracer = Tracer()
 
     def greatest_offset(self) -> int:
@@ -33,6 +48,13 @@ class OffsetWatcher:
         with self._condition:
             self._greatest_offset = max(self._greatest_offset, new_offset)
             self._condition.notify_all()
+            while self._async_waiters and self._async_waiters[0][0] <= self._greatest_offset:
+                _, _, loop, future = heapq.heappop(self._async_waiters)
+                try:
+                    loop.call_soon_threadsafe(_resolve_waiter, future)
+                except RuntimeError:
+                    # The loop of the waiter is closed, nobody is waiting anymore
+                    pass
 
     def wait_for_offset(self, expected_offset: int, timeout: float) -> bool:
         """Block until expected_offset is seen.
@@ -43,3 +65,28 @@ class OffsetWatcher:
         """
         with self._condition:
             return self._condition.wait_for(lambda: expected_offset <= self._greatest_offset, timeout=timeout)
+
+    async def wait_for_offset_async(self, expected_offset: int, timeout: float) -> bool:
+        """Wait until expected_offset is seen, without blocking the event loop.
+
+        Args:
+            expected_offset: The message offset generated by the producer.
+            timeout: How long the caller will wait for the offset in seconds.
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[None] = loop.create_future()
+        waiter = (expected_offset, next(self._async_waiter_counter), loop, future)
+        with self._condition:
+            if expected_offset <= self._greatest_offset:
+                return True
+            heapq.heappush(self._async_waiters, waiter)
+
+        try:
+            await asyncio.wait_for(future, timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            with self._condition:
+                if waiter in self._async_waiters:
+                    self._async_waiters.remove(waiter)
+                    heapq.heapify(self._async_waiters)
+            return False
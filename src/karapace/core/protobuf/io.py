@@ -5,7 +5,8 @@ See LICENSE for details
 
 from __future__ import annotations
 
-from collections.abc import Generator, Iterable
+from collections import OrderedDict
+from collections.abc import Generator, Iterable, Sequence
 from io import BytesIO
 from karapace.core.config import Config
 from karapace.core.protobuf.encoding_variants import read_indexes, write_indexes
@@ -20,12 +21,15 @@ from karapace.core.protobuf.schema import ProtobufSchema
 from karapace.core.protobuf.type_element import TypeElement
 from multiprocessing import Process, Queue
 from pathlib import Path
-from typing import Final, Protocol, TypeAlias
+from threading import Lock
+from types import ModuleType
+from typing import cast, Final, Protocol, TypeAlias
 from typing_extensions import Self
 
 import hashlib
 import importlib
 import importlib.util
+import queue
 import subprocess
 import sys
 
@@ -97,18 +101,20 @@ class _ProtobufModel(Protocol):
     def SerializeToString(self) -> bytes: ...
 
 
-def get_protobuf_class_instance(
-    schema: ProtobufSchema,
-    class_name: str,
-    cfg: Config,
-) -> _ProtobufModel:
-    directory = Path(cfg.protobuf_runtime_directory)
+def protobuf_class_name(schema: ProtobufSchema) -> str:
+    """Unique name of the generated module of `schema` and its dependencies."""
     deps_list = crawl_dependencies(schema)
     root_class_name = ""
     for value in deps_list.values():
         root_class_name = root_class_name + value["unique_class_name"]
     root_class_name = root_class_name + str(schema)
-    proto_name = calculate_class_name(root_class_name)
+    return calculate_class_name(root_class_name)
+
+
+def load_protobuf_module(schema: ProtobufSchema, cfg: Config) -> ModuleType:
+    directory = Path(cfg.protobuf_runtime_directory)
+    deps_list = crawl_dependencies(schema)
+    proto_name = protobuf_class_name(schema)
 
     main_proto_filename = f"{proto_name}.proto"
     work_dir = directory / Path(proto_name)
@@ -150,77 +156,239 @@ def get_protobuf_class_instance(
     assert spec.loader is not None
     spec.loader.exec_module(tmp_module)
     sys.path.pop()
-    class_to_call = getattr(tmp_module, class_name)
+    return tmp_module
 
+
+def get_protobuf_class_instance(
+    schema: ProtobufSchema,
+    class_name: str,
+    cfg: Config,
+) -> _ProtobufModel:
+    class_to_call = getattr(load_protobuf_module(schema, cfg), class_name)
     return class_to_call()
 
 
-def read_data(
-    config: Config,
+def read_message_name(
     writer_schema: ProtobufSchema,
     reader_schema: ProtobufSchema,
     bio: BytesIO,
-) -> _ProtobufModel:
+) -> str:
     if not match_schemas(writer_schema, reader_schema):
         fail_msg = "Schemas do not match."
         raise ProtobufSchemaResolutionException(fail_msg, writer_schema, reader_schema)
 
     indexes = read_indexes(bio)
-    name = find_message_name(writer_schema, indexes)
+    return find_message_name(writer_schema, indexes)
 
-    class_instance = get_protobuf_class_instance(writer_schema, name, config)
-    class_instance.ParseFromString(bio.read())
 
-    return class_instance
+# Note Protobuf enum values use C++ scoping rules,
+# meaning that enum values are siblings of their type, not children of it.
+# Therefore, if we have two proto files with Enums which elements have the same name we will have error.
+# There we use simple way of Serialization/Deserialization (SerDe) which use python Protobuf library and
+# protoc compiler.
+# To avoid problem with enum values for basic SerDe support we isolate work with protobuf libraries in
+# child processes. Every generated module (see `protobuf_class_name`) gets a dedicated long-lived worker
+# process, so a worker only ever loads one schema into its descriptor pool and the module is imported once
+# instead of once per record.
+# The timeout is per record, a batch is given the time of its records.
+PROTOBUF_WORKER_RESPONSE_TIMEOUT_SECONDS: Final = 10
 
+_OPERATION_READ: Final = "read"
+_OPERATION_WRITE: Final = "write"
 
-_ReaderQueue: TypeAlias = "Queue[dict[object, object] | BaseException]"
+_WorkerRequest: TypeAlias = "list[tuple[str, str, bytes | dict[object, object]]]"
+_WorkerResponse: TypeAlias = "list[dict[object, object] | bytes | BaseException]"
+_RequestQueue: TypeAlias = "Queue[_WorkerRequest | None]"
+_ResponseQueue: TypeAlias = "Queue[_WorkerResponse]"
 
 
-def reader_process(
-    reader_queue: _ReaderQueue,
+def _serde_worker(
+    requests: _RequestQueue,
+    responses: _ResponseQueue,
     config: Config,
-    writer_schema: ProtobufSchema,
-    reader_schema: ProtobufSchema,
-    bio: BytesIO,
+    schema: ProtobufSchema,
 ) -> None:
-    try:
-        reader_queue.put(protobuf_to_dict(read_data(config, writer_schema, reader_schema, bio), True))
-    # Reading happens in the forked process, catch is broad so exception will get communicated
-    # back to calling process.
-    except BaseException as base_exception:
-        reader_queue.put(base_exception)
+    module: ModuleType | None = None
+
+    def new_instance(message_name: str) -> _ProtobufModel:
+        nonlocal module
+        if module is None:
+            module = load_protobuf_module(schema, config)
+        return getattr(module, message_name)()
+
+    while True:
+        request = requests.get()
+        if request is None:
+            return
+        results: _WorkerResponse = []
+        for operation, message_name, payload in request:
+            # Catch is broad so exceptions will get communicated back to calling process.
+            if operation == _OPERATION_READ:
+                assert isinstance(payload, bytes)
+                try:
+                    class_instance = new_instance(message_name)
+                    class_instance.ParseFromString(payload)
+                    results.append(protobuf_to_dict(class_instance, True))
+                except Exception as exception:
+                    results.append(exception)
+            else:
+                assert isinstance(payload, dict)
+                try:
+                    class_instance = new_instance(message_name)
+                    dict_to_protobuf(class_instance, payload)
+                    results.append(class_instance.SerializeToString())
+                except Exception as bare_exception:
+                    protobuf_exception = ProtobufTypeException(schema, payload)
+                    protobuf_exception.__cause__ = bare_exception
+                    results.append(protobuf_exception)
+        responses.put(results)
+
+
+class _WorkerClosed(Exception):
+    pass
+
+
+class _ProtobufWorker:
+    def __init__(self, config: Config, schema: ProtobufSchema) -> None:
+        self._lock = Lock()
+        self._closed = False
+        self._requests: _RequestQueue = Queue()
+        self._responses: _ResponseQueue = Queue()
+        self._process = Process(
+            target=_serde_worker,
+            args=(self._requests, self._responses, config, schema),
+            daemon=True,
+        )
+        self._process.start()
+
+    def is_alive(self) -> bool:
+        return not self._closed and self._process.is_alive()
+
+    def execute(self, request: _WorkerRequest) -> _WorkerResponse:
+        with self._lock:
+            if self._closed:
+                raise _WorkerClosed()
+            self._requests.put(request)
+            try:
+                return self._responses.get(True, PROTOBUF_WORKER_RESPONSE_TIMEOUT_SECONDS * max(1, len(request)))
+            except queue.Empty:
+                # Terminated before the lock is released, a late response must not be read by the next request.
+                self.terminate()
+                raise
+
+    def close(self) -> None:
+        # Waits for an in-flight request, the sentinel makes the process exit after that. The
+        # process is not joined, `multiprocessing` reaps finished children on the next start.
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            if self._process.is_alive():
+                self._requests.put(None)
+
+    def terminate(self) -> None:
+        self._closed = True
+        self._process.terminate()
+
+
+class ProtobufWorkerPool:
+    """Long-lived worker processes for Protobuf SerDe, one per generated module.
+
+    Least recently used workers are shut down when more than `max_workers` distinct
+    schemas are in use.
+    """
+
+    def __init__(self, config: Config, max_workers: int) -> None:
+        self.config: Final = config
+        self.max_workers: Final = max(1, max_workers)
+        self._lock = Lock()
+        self._workers: OrderedDict[str, _ProtobufWorker] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._workers)
+
+    def _get_worker(self, schema: ProtobufSchema) -> _ProtobufWorker:
+        key = protobuf_class_name(schema)
+        evicted: list[_ProtobufWorker] = []
+        with self._lock:
+            worker = self._workers.get(key)
+            if worker is not None and worker.is_alive():
+                self._workers.move_to_end(key)
+                return worker
+            if worker is not None:
+                evicted.append(self._workers.pop(key))
+            worker = _ProtobufWorker(self.config, schema)
+            self._workers[key] = worker
+            while len(self._workers) > self.max_workers:
+                _, least_recently_used = self._workers.popitem(last=False)
+                evicted.append(least_recently_used)
+        for evicted_worker in evicted:
+            evicted_worker.close()
+        return worker
+
+    def _discard(self, worker: _ProtobufWorker) -> None:
+        with self._lock:
+            for key, candidate in self._workers.items():
+                if candidate is worker:
+                    del self._workers[key]
+                    break
+        worker.terminate()
+
+    def _execute(self, schema: ProtobufSchema, request: _WorkerRequest) -> _WorkerResponse:
+        while True:
+            worker = self._get_worker(schema)
+            try:
+                return worker.execute(request)
+            except _WorkerClosed:
+                # Evicted between lookup and use, retry with a fresh worker.
+                continue
+            except queue.Empty:
+                # The worker is stuck or died and was terminated, the next request starts a new one.
+                self._discard(worker)
+                raise
+
+    @staticmethod
+    def _unwrap(response: _WorkerResponse) -> list[dict[object, object] | bytes]:
+        for result in response:
+            if isinstance(result, BaseException):
+                raise result
+        return cast(list[dict[object, object] | bytes], response)
+
+    def read_many(self, schema: ProtobufSchema, message_names: Sequence[str], payloads: Sequence[bytes]) -> list[dict]:
+        request: _WorkerRequest = [
+            (_OPERATION_READ, message_name, payload) for message_name, payload in zip(message_names, payloads)
+        ]
+        results = self._unwrap(self._execute(schema, request))
+        if not all(isinstance(result, dict) for result in results):
+            raise IllegalArgumentException()
+        return cast(list[dict], results)
 
+    def write_many(self, schema: ProtobufSchema, message_name: str, datums: Sequence[dict[object, object]]) -> list[bytes]:
+        request: _WorkerRequest = [(_OPERATION_WRITE, message_name, datum) for datum in datums]
+        results = self._unwrap(self._execute(schema, request))
+        if not all(isinstance(result, bytes) for result in results):
+            raise IllegalArgumentException()
+        return cast(list[bytes], results)
+
+    def close(self) -> None:
+        with self._lock:
+            workers = list(self._workers.values())
+            self._workers.clear()
+        for worker in workers:
+            worker.close()
 
-def read_in_forked_multiprocess_process(
-    config: Config,
-    writer_schema: ProtobufSchema,
-    reader_schema: ProtobufSchema,
-    bio: BytesIO,
-) -> dict[object, object]:
-    # Note Protobuf enum values use C++ scoping rules,
-    # meaning that enum values are siblings of their type, not children of it.
-    # Therefore, if we have two proto files with Enums which elements have the same name we will have error.
-    # There we use simple way of Serialization/Deserialization (SerDe) which use python Protobuf library and
-    # protoc compiler.
-    # To avoid problem with enum values for basic SerDe support we
-    # will isolate work with call protobuf libraries in child process.
-    if __name__ == "karapace.core.protobuf.io":
-        reader_queue: _ReaderQueue = Queue()
-        p = Process(target=reader_process, args=(reader_queue, config, writer_schema, reader_schema, bio))
-        p.start()
-        TEN_SECONDS_WAIT = 10
-        try:
-            result = reader_queue.get(True, TEN_SECONDS_WAIT)
-        finally:
-            p.join()
-            reader_queue.close()
-        if isinstance(result, dict):
-            return result
-        if isinstance(result, BaseException):
-            raise result
-        raise IllegalArgumentException()
-    return {"Error": "This never must be returned"}
+
+_worker_pool: ProtobufWorkerPool | None = None
+_worker_pool_lock = Lock()
+
+
+def get_worker_pool(config: Config) -> ProtobufWorkerPool:
+    global _worker_pool
+    with _worker_pool_lock:
+        if _worker_pool is None:
+            _worker_pool = ProtobufWorkerPool(config, max_workers=config.protobuf_serde_max_workers)
+        return _worker_pool
 
 
 class ProtobufDatumReader:
@@ -241,67 +409,17 @@ class ProtobufDatumReader:
         self._reader_schema = reader_schema
 
     def read(self, bio: BytesIO) -> dict:
+        return self.read_many([bio])[0]
+
+    def read_many(self, bios: Iterable[BytesIO]) -> list[dict]:
         if self._reader_schema is None:
             self._reader_schema = self._writer_schema
-        return read_in_forked_multiprocess_process(self.config, self._writer_schema, self._reader_schema, bio)
-
-
-_WriterQueue: TypeAlias = "Queue[bytes | str | BaseException]"
-
-
-def writer_process(
-    writer_queue: _WriterQueue,
-    config: Config,
-    writer_schema: ProtobufSchema,
-    message_name: str,
-    datum: dict,
-) -> None:
-    try:
-        class_instance = get_protobuf_class_instance(writer_schema, message_name, config)
-        dict_to_protobuf(class_instance, datum)
-        result = class_instance.SerializeToString()
-        writer_queue.put(result)
-    # Writing happens in the forked process, catch is broad so exception will get communicated
-    # back to calling process.
-    except Exception as bare_exception:
-        try:
-            raise ProtobufTypeException(writer_schema, datum) from bare_exception
-        except ProtobufTypeException as protobuf_exception:
-            writer_queue.put(protobuf_exception)
-            raise protobuf_exception
-    except BaseException as base_exception:
-        writer_queue.put(base_exception)
-
-
-def write_in_forked_multiprocess_process(
-    config: Config,
-    writer_schema: ProtobufSchema,
-    message_name: str,
-    datum: dict[object, object],
-) -> bytes:
-    # Note Protobuf enum values use C++ scoping rules,
-    # meaning that enum values are siblings of their type, not children of it.
-    # Therefore, if we have two proto files with Enums which elements have the same name we will have error.
-    # There we use simple way of Serialization/Deserialization (SerDe) which use python Protobuf library and
-    # protoc compiler.
-    # To avoid problem with enum values for basic SerDe support we
-    # will isolate work with call protobuf libraries in child process.
-    if __name__ == "karapace.core.protobuf.io":
-        writer_queue: _WriterQueue = Queue(1)
-        p = Process(target=writer_process, args=(writer_queue, config, writer_schema, message_name, datum))
-        p.start()
-        TEN_SECONDS_WAIT = 10
-        try:
-            result = writer_queue.get(True, TEN_SECONDS_WAIT)  # Block for ten seconds
-        finally:
-            p.join()
-            writer_queue.close()
-        if isinstance(result, bytes):
-            return result
-        if isinstance(result, BaseException):
-            raise result
-        raise IllegalArgumentException()
-    raise NotImplementedError("Error: Reached unreachable code")
+        message_names: list[str] = []
+        payloads: list[bytes] = []
+        for bio in bios:
+            message_names.append(read_message_name(self._writer_schema, self._reader_schema, bio))
+            payloads.append(bio.read())
+        return get_worker_pool(self.config).read_many(self._writer_schema, message_names, payloads)
 
 
 class ProtobufDatumWriter:
@@ -326,4 +444,8 @@ class ProtobufDatumWriter:
         write_indexes(writer, [self._message_index])
 
     def write(self, datum: dict[object, object], writer: BytesIO) -> None:
-        writer.write(write_in_forked_multiprocess_process(self.config, self._writer_schema, self._message_name, datum))
+        writer.write(self.write_many([datum])[0])
+
+    def write_many(self, datums: Sequence[dict[object, object]]) -> list[bytes]:
+        """Encode the message bodies of `datums`, without the message index prefix."""
+        return get_worker_pool(self.config).write_many(self._writer_schema, self._message_name, datums)
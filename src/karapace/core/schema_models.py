@@ -7,7 +7,8 @@ from __future__ import annotations
 
 from avro.errors import SchemaParseException
 from avro.schema import parse as avro_parse, Schema as AvroSchema
-from collections.abc import Collection, Mapping, Sequence
+from cachetools import LRUCache
+from collections.abc import Collection, Hashable, Mapping, Sequence
 from dataclasses import dataclass
 from jsonschema import Draft7Validator
 from jsonschema.exceptions import SchemaError
@@ -28,6 +29,7 @@ from karapace.core.schema_references import Reference
 from karapace.core.schema_type import SchemaType
 from karapace.core.typing import JsonObject, SchemaId, Subject, Version, VersionTag
 from karapace.core.utils import assert_never, json_decode, json_encode, JSONDecodeError
+from threading import Lock
 from typing import Any, cast, Final, final
 
 import hashlib
@@ -100,6 +102,73 @@ def parse_protobuf_schema_definition(
     return protobuf_schema
 
 
+# Rough ratio of the memory used by a parsed schema object to the length of the schema string.
+PARSED_SCHEMA_SIZE_FACTOR: Final = 10
+PARSED_SCHEMA_CACHE_MAX_SIZE_BYTES: Final = 128 * 1024 * 1024
+
+
+class ParsedSchemaCache:
+    """Thread safe least recently used cache of parsed schema objects.
+
+    The cache is bounded by the estimated memory usage of the entries,
+    see `PARSED_SCHEMA_SIZE_FACTOR`.
+    """
+
+    def __init__(self, max_size_bytes: int) -> None:
+        self._lock = Lock()
+        self._cache: LRUCache[Hashable, tuple[int, Draft7Validator | AvroSchema | ProtobufSchema]] = LRUCache(
+            maxsize=max_size_bytes,
+            getsizeof=lambda entry: entry[0],
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._cache)
+
+    @property
+    def size_bytes(self) -> int:
+        with self._lock:
+            return int(self._cache.currsize)
+
+    def get(self, key: Hashable) -> Draft7Validator | AvroSchema | ProtobufSchema | None:
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, schema_str: str, schema: Draft7Validator | AvroSchema | ProtobufSchema) -> None:
+        size = max(1, len(schema_str) * PARSED_SCHEMA_SIZE_FACTOR)
+        with self._lock:
+            try:
+                self._cache[key] = (size, schema)
+            except ValueError:
+                # Larger than the whole cache
+                LOG.debug("Parsed schema of size %s is too large to cache", size)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+PARSED_SCHEMA_CACHE: Final = ParsedSchemaCache(max_size_bytes=PARSED_SCHEMA_CACHE_MAX_SIZE_BYTES)
+
+
+def _dependencies_cache_key(dependencies: Mapping[str, Dependency] | None) -> Hashable:
+    if not dependencies:
+        return None
+    return tuple(
+        (name, dependency.schema.fingerprint(), _dependencies_cache_key(dependency.schema.dependencies))
+        for name, dependency in sorted(dependencies.items())
+    )
+
+
 class TypedSchema:
     def __init__(
         self,
@@ -124,6 +193,7 @@ class TypedSchema:
         self.schema_str: Final = TypedSchema.normalize_schema_str(schema_str, schema_type, schema)
         self.max_id: SchemaId | None = None
         self._fingerprint_cached: str | None = None
+        self._parsed_schema_cache_key: Hashable | None = None
 
     def to_dict(self) -> JsonObject:
         if self.schema_type is SchemaType.PROTOBUF:
@@ -182,8 +252,22 @@ class TypedSchema:
             and self.references == other.references
         )
 
+    def _get_parsed_schema_cache_key(self) -> Hashable:
+        # The fingerprint does not cover the schema type nor the content of the dependencies.
+        if self._parsed_schema_cache_key is None:
+            self._parsed_schema_cache_key = (
+                self.schema_type,
+                self.fingerprint(),
+                _dependencies_cache_key(self.dependencies),
+            )
+        return self._parsed_schema_cache_key
+
     @property
     def schema(self) -> Draft7Validator | AvroSchema | ProtobufSchema:
+        cache_key = self._get_parsed_schema_cache_key()
+        parsed_schema = PARSED_SCHEMA_CACHE.get(cache_key)
+        if parsed_schema is not None:
+            return parsed_schema
         parsed_typed_schema = parse(
             schema_type=self.schema_type,
             schema_str=self.schema_str,
@@ -193,6 +277,7 @@ class TypedSchema:
             dependencies=self.dependencies,
             normalize=False,
         )
+        PARSED_SCHEMA_CACHE.set(cache_key, self.schema_str, parsed_typed_schema.schema)
         return parsed_typed_schema.schema
 
 
@@ -406,7 +491,7 @@ class ValidatedTypedSchema(ParsedTypedSchema):
         return cast(ValidatedTypedSchema, parsed_schema)
 
 
-@dataclass
+@dataclass(slots=True)
 class SchemaVersion:
     subject: Subject
     version: Version
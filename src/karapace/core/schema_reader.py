@@ -23,7 +23,8 @@ from aiokafka.errors import (
 )
 from avro.schema import Schema as AvroSchema
 from collections.abc import Mapping, Sequence
-from confluent_kafka import Message, TopicCollection, TopicPartition
+from concurrent.futures import ProcessPoolExecutor
+from confluent_kafka import Message, OFFSET_BEGINNING, TopicCollection, TopicPartition
 from contextlib import closing, ExitStack
 from enum import Enum
 from jsonschema.validators import Draft7Validator
@@ -31,9 +32,18 @@ from karapace.core.instrumentation.tracer import Tracer
 from karapace.core import constants
 from karapace.core.config import Config
 from karapace.core.coordinator.master_coordinator import MasterCoordinator
-from karapace.core.dependency import Dependency
+from karapace.core.database_snapshot import (
+    create_snapshot,
+    DatabaseSnapshot,
+    InvalidSnapshot,
+    read_snapshot,
+    record_digest,
+    restore_snapshot,
+    write_snapshot,
+)
+from karapace.core.dependency import Dependency, ResolvedSchemas
 from karapace.core.errors import InvalidReferences, InvalidSchema, InvalidVersion, ShutdownException
-from karapace.core.in_memory_database import KarapaceDatabase
+from karapace.core.in_memory_database import InMemoryDatabase, KarapaceDatabase
 from karapace.core.kafka.admin import KafkaAdminClient
 from karapace.core.kafka.common import translate_from_kafkaerror
 from karapace.core.kafka.consumer import KafkaConsumer
@@ -42,12 +52,18 @@ from karapace.core.key_format import is_key_in_canonical_format, KeyFormatter, K
 from karapace.core.offset_watcher import OffsetWatcher
 from karapace.core.protobuf.exception import ProtobufException
 from karapace.core.protobuf.schema import ProtobufSchema
-from karapace.core.schema_models import parse_protobuf_schema_definition, SchemaType, TypedSchema, ValidatedTypedSchema
+from karapace.core.schema_models import (
+    parse_protobuf_schema_definition,
+    SchemaType,
+    TypedSchema,
+    ValidatedTypedSchema,
+)
 from karapace.core.schema_references import LatestVersionReference, Reference, reference_from_mapping, Referents
 
 from karapace.core.stats import StatsClient
 from karapace.core.typing import JsonObject, SchemaReaderStoppper, Subject, Version
 from karapace.core.utils import json_decode, JSONDecodeError, shutdown
+from pathlib import Path
 from threading import Event, Lock, Thread
 from typing import Final
 
@@ -80,6 +96,15 @@ UNHEALTHY_CONSECUTIVE_ERRORS: Final = 3
 MAX_MESSAGES_TO_CONSUME_ON_STARTUP: Final = 1000
 MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP: Final = 1
 MESSAGE_CONSUME_TIMEOUT_SECONDS: Final = 0.2
+# After startup the number of messages to consume follows the backlog of the
+# reader, bounded by the startup value. With a backlog the records are already
+# in the topic and a shorter timeout limits the wait for an overestimated backlog
+# (e.g. offsets used by transaction markers).
+MESSAGE_CONSUME_TIMEOUT_SECONDS_WITH_BACKLOG: Final = 0.05
+
+# Batches with fewer Protobuf schemas are parsed on the reader thread, the
+# replay workers are not worth the inter-process communication.
+MIN_PROTOBUF_SCHEMAS_FOR_REPLAY_WORKERS: Final = 8
 
 
 class MessageType(Enum):
@@ -89,12 +114,12 @@ class MessageType(Enum):
     no_operation = "NOOP"
 
 
-def _create_consumer_from_config(config: Config) -> KafkaConsumer:
+def _create_consumer_from_config(config: Config, *, subscribe: bool = True) -> KafkaConsumer:
     # Group not set on purpose, all consumers read the same data
     session_timeout_ms = config.session_timeout_ms
     return KafkaConsumer(
         bootstrap_servers=config.bootstrap_uri,
-        topic=config.topic_name,
+        topic=config.topic_name if subscribe else None,
         enable_auto_commit=False,
         client_id=config.client_id,
         fetch_max_wait_ms=50,
@@ -111,6 +136,17 @@ def _create_consumer_from_config(config: Config) -> KafkaConsumer:
     )
 
 
+def _parse_protobuf_schema(schema_str: str) -> ProtobufSchema | None:
+    """Parse a Protobuf schema without references in a replay worker.
+
+    Invalid schemas are parsed again and reported when the record is applied.
+    """
+    try:
+        return parse_protobuf_schema_definition(schema_str, None, None, validate_references=False, normalize=False)
+    except (InvalidSchema, ProtobufException):
+        return None
+
+
 def _create_admin_client_from_config(config: Config) -> KafkaAdminClient:
     return KafkaAdminClient(
         bootstrap_servers=config.bootstrap_uri,
@@ -176,6 +212,28 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
         self.key_formatter = key_formatter
 
+        # Snapshot of the database, restored on startup to consume only the records after it.
+        # The global compatibility is kept to reset it when the snapshot is discarded.
+        self._snapshot_path: Path | None = None
+        if config.schema_reader_snapshot_path and isinstance(database, InMemoryDatabase):
+            self._snapshot_path = Path(config.schema_reader_snapshot_path)
+        self._initial_compatibility = config.compatibility
+        self._last_snapshot_time: float | None = None
+        self._last_snapshot_offset = OFFSET_UNINITIALIZED
+        # Offset and digest of the last consumed record, and of the restored snapshot
+        # record until it is compared with the record in the topic.
+        self._last_record: tuple[int, str] | None = None
+        self._unverified_snapshot_record: tuple[int, str] | None = None
+
+        # Until the reader is ready the Protobuf schemas of a batch are parsed in worker
+        # processes, the records are still applied in order by this thread.
+        self._replay_pool: ProcessPoolExecutor | None = None
+        self._replay_parsed_schemas: dict[str, ProtobufSchema] = {}
+
+        # The referenced versions are resolved once, the entries are discarded on changes of the
+        # version or of the versions it references, see `_discard_resolved_schemas`.
+        self._resolved_schemas = ResolvedSchemas()
+
         # Metrics
         self.processed_canonical_keys_total = 0
         self.processed_deprecated_karapace_keys_total = 0
@@ -211,7 +269,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
 
             while not self._stop_schema_reader.is_set() and self.consumer is None:
                 try:
-                    self.consumer = _create_consumer_from_config(self.config)
+                    self.consumer = _create_consumer_from_config(self.config, subscribe=self._snapshot_path is None)
                     stack.enter_context(closing(self.consumer))
                 except (NodeNotReadyError, NoBrokersAvailable, AssertionError):
                     LOG.warning("[Consumer] No Brokers available yet. Retrying")
@@ -252,6 +310,11 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                     LOG.exception("[Schema Topic] Failed to create %r, retrying", self.config.topic_name)
                     self._stop_schema_reader.wait(timeout=SCHEMA_TOPIC_CREATION_TIMEOUT_SECONDS)
 
+            stack.callback(self._shutdown_replay_pool)
+
+            if self._snapshot_path is not None and not self._stop_schema_reader.is_set():
+                self._assign_from_snapshot()
+
             while not self._stop_schema_reader.is_set():
                 if self.offset == OFFSET_UNINITIALIZED:
                     # Handles also a unusual case of purged schemas topic where starting offset can be > 0
@@ -273,6 +336,9 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                         self.consecutive_unexpected_errors_start = time.monotonic()
                     LOG.warning("Unexpected exception in schema reader loop - %s", e)
 
+            if self._snapshot_path is not None and self.ready():
+                self._write_snapshot()
+
     async def is_healthy(self) -> bool:
         with self._tracer.get_tracer().start_as_current_span(
             self._tracer.get_name_from_caller_with_class(self, self.is_healthy)
@@ -363,9 +429,10 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         )
         self.last_check = cur_time
         self.startup_previous_processed_offset = self.offset
-        ready = self.offset >= self._highest_offset
+        ready = self._unverified_snapshot_record is None and self.offset >= self._highest_offset
         if ready:
             self.max_messages_to_process = MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP
+            self._shutdown_replay_pool()
             LOG.info("Ready in %s seconds", time.monotonic() - self.start_time)
         return ready
 
@@ -396,6 +463,8 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
     def handle_messages(self) -> None:
         assert self.consumer is not None, "Thread must be started"
         msgs: list[Message] = self.consumer.consume(timeout=self.timeout_s, num_messages=self.max_messages_to_process)
+        if self._unverified_snapshot_record is not None and msgs:
+            msgs = self._verify_snapshot_record(msgs)
         self._update_is_ready_flag()
 
         watch_offsets = False
@@ -408,7 +477,204 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             if primary_info.primary:
                 watch_offsets = True
 
-        self.consume_messages(msgs, watch_offsets)
+        if self.config.schema_reader_replay_workers > 0 and not self.ready():
+            self._parse_replay_schemas(msgs)
+        try:
+            self.consume_messages(msgs, watch_offsets)
+        finally:
+            self._replay_parsed_schemas.clear()
+
+        if self.ready():
+            self._adapt_consume_batch_size()
+
+        if self._snapshot_path is not None:
+            if msgs:
+                self._last_record = (msgs[-1].offset(), record_digest(msgs[-1].key(), msgs[-1].value()))
+            self._maybe_write_snapshot()
+
+    def _adapt_consume_batch_size(self) -> None:
+        """Size the next consume after startup by the backlog of the reader.
+
+        A burst of records is consumed in a few batches, while a single new record
+        is returned as soon as it arrives.
+        """
+        assert self.consumer is not None, "Thread must be started"
+        try:
+            # The cached watermark is updated by the fetch responses, no request is made
+            _, end_offset = self.consumer.get_watermark_offsets(TopicPartition(self.config.topic_name, 0), cached=True)
+        except Exception as e:
+            LOG.warning("Reading cached end offset failed: %s", e)
+            return
+        if end_offset >= 0:
+            self._highest_offset = max(self._highest_offset, end_offset - 1)
+        lag = max(0, end_offset - 1 - self.offset)
+        self.max_messages_to_process = min(
+            MAX_MESSAGES_TO_CONSUME_ON_STARTUP, max(MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP, lag)
+        )
+        self.timeout_s = MESSAGE_CONSUME_TIMEOUT_SECONDS_WITH_BACKLOG if lag else MESSAGE_CONSUME_TIMEOUT_SECONDS
+        self.stats.set_schema_reader_lag(value=lag)
+        self.stats.set_schema_reader_consume_batch_size(value=self.max_messages_to_process)
+
+    def _parse_replay_schemas(self, msgs: list[Message]) -> None:
+        """Parse the Protobuf schemas without references of the batch in the replay workers.
+
+        The schemas with references depend on the records before them and are parsed when applied.
+        """
+        schema_strs: dict[str, None] = {}
+        for msg in msgs:
+            message_value = msg.value()
+            if msg.error() is not None or not message_value or b'"PROTOBUF"' not in message_value:
+                continue
+            try:
+                value = self._parse_message_value(message_value)
+            except (JSONDecodeError, TypeError):
+                continue
+            if (
+                value is not None
+                and value.get("schemaType") == SchemaType.PROTOBUF.value
+                and not value.get("references")
+                and isinstance(value.get("schema"), str)
+            ):
+                schema_strs[value["schema"]] = None
+        if len(schema_strs) < MIN_PROTOBUF_SCHEMAS_FOR_REPLAY_WORKERS:
+            return
+
+        if self._replay_pool is None:
+            self._replay_pool = ProcessPoolExecutor(max_workers=self.config.schema_reader_replay_workers)
+        chunksize = max(1, len(schema_strs) // (self.config.schema_reader_replay_workers * 4))
+        for schema_str, parsed_schema in zip(
+            schema_strs, self._replay_pool.map(_parse_protobuf_schema, schema_strs, chunksize=chunksize)
+        ):
+            if parsed_schema is not None:
+                self._replay_parsed_schemas[schema_str] = parsed_schema
+
+    def _shutdown_replay_pool(self) -> None:
+        if self._replay_pool is not None:
+            self._replay_pool.shutdown(wait=False, cancel_futures=True)
+            self._replay_pool = None
+
+    def _assign_from_snapshot(self) -> None:
+        """Restore the database from the snapshot and consume only the records after it.
+
+        The consumption starts from the last record of the snapshot, it is compared with the
+        snapshot in `_verify_snapshot_record` before the reader becomes ready.
+        """
+        assert self.consumer is not None, "Thread must be started"
+        start_offset = OFFSET_BEGINNING
+        snapshot = self._load_snapshot()
+        if snapshot is not None:
+            start_offset = snapshot.offset
+            self.offset = snapshot.offset - 1
+            self._unverified_snapshot_record = (snapshot.offset, snapshot.record_digest)
+        self.consumer.assign([TopicPartition(self.config.topic_name, 0, start_offset)])
+
+    def _load_snapshot(self) -> DatabaseSnapshot | None:
+        assert self.consumer is not None, "Thread must be started"
+        assert self._snapshot_path is not None
+        assert isinstance(self.database, InMemoryDatabase)
+
+        try:
+            snapshot = read_snapshot(self._snapshot_path)
+        except FileNotFoundError:
+            LOG.info("No snapshot in %s, reading the whole schemas topic", self._snapshot_path)
+            return None
+        except (OSError, InvalidSnapshot) as e:
+            LOG.warning("Discarding snapshot %s: %s", self._snapshot_path, e)
+            return None
+
+        if snapshot.topic_name != self.config.topic_name:
+            LOG.warning("Discarding snapshot %s of topic %r", self._snapshot_path, snapshot.topic_name)
+            return None
+        try:
+            beginning_offset, end_offset = self.consumer.get_watermark_offsets(TopicPartition(self.config.topic_name, 0))
+        except Exception as e:
+            LOG.warning("Discarding snapshot %s, reading the offsets failed: %s", self._snapshot_path, e)
+            return None
+        if not beginning_offset <= snapshot.offset < end_offset:
+            LOG.warning(
+                "Discarding snapshot %s, offset %s is not in the schemas topic [%s, %s)",
+                self._snapshot_path,
+                snapshot.offset,
+                beginning_offset,
+                end_offset,
+            )
+            return None
+
+        try:
+            keymode = KeyMode[snapshot.keymode]
+            restore_snapshot(self.database, snapshot)
+        except (KeyError, InvalidSnapshot) as e:
+            LOG.warning("Discarding snapshot %s: %s", self._snapshot_path, e)
+            self.database.clear()
+            self._resolved_schemas.clear()
+            return None
+        self.config.compatibility = snapshot.compatibility
+        self.key_formatter.set_keymode(keymode)
+        LOG.info("Restored snapshot %s at offset %s", self._snapshot_path, snapshot.offset)
+        return snapshot
+
+    def _verify_snapshot_record(self, msgs: list[Message]) -> list[Message]:
+        """Compare the first consumed record with the last record of the restored snapshot.
+
+        On a match the remaining records are returned for processing, otherwise the restored
+        state is discarded and the schemas topic is consumed again from the beginning.
+        """
+        assert self.consumer is not None, "Thread must be started"
+        assert self._unverified_snapshot_record is not None
+        offset, digest = self._unverified_snapshot_record
+        self._unverified_snapshot_record = None
+
+        msg = msgs[0]
+        if msg.error() is None and msg.offset() == offset and record_digest(msg.key(), msg.value()) == digest:
+            self.offset = offset
+            self._last_record = (offset, digest)
+            self._last_snapshot_offset = offset
+            return msgs[1:]
+
+        LOG.warning("Discarding snapshot %s, it does not match the record at offset %s", self._snapshot_path, offset)
+        assert isinstance(self.database, InMemoryDatabase)
+        self.database.clear()
+        self._resolved_schemas.clear()
+        self.config.compatibility = self._initial_compatibility
+        self.key_formatter.set_keymode(KeyMode.CANONICAL)
+        self.offset = OFFSET_UNINITIALIZED
+        self.consumer.assign([TopicPartition(self.config.topic_name, 0, OFFSET_BEGINNING)])
+        return []
+
+    def _maybe_write_snapshot(self) -> None:
+        now = time.monotonic()
+        if (
+            self._last_snapshot_time is not None
+            and now - self._last_snapshot_time < self.config.schema_reader_snapshot_interval_seconds
+        ):
+            return
+        if self.ready():
+            self._last_snapshot_time = now
+            self._write_snapshot()
+
+    def _write_snapshot(self) -> None:
+        """Write a snapshot of the database if records were consumed since the previous one."""
+        assert self._snapshot_path is not None
+        assert isinstance(self.database, InMemoryDatabase)
+        if self._last_record is None or self._last_record[0] != self.offset or self.offset == self._last_snapshot_offset:
+            return
+
+        offset, digest = self._last_record
+        snapshot = create_snapshot(
+            self.database,
+            topic_name=self.config.topic_name,
+            offset=offset,
+            record_digest=digest,
+            compatibility=self.config.compatibility,
+            keymode=self.key_formatter.get_keymode().name,
+        )
+        try:
+            write_snapshot(self._snapshot_path, snapshot)
+        except OSError:
+            LOG.exception("Writing snapshot %s failed", self._snapshot_path)
+            return
+        self._last_snapshot_offset = offset
+        LOG.info("Wrote snapshot %s at offset %s", self._snapshot_path, offset)
 
     def consume_messages(self, msgs: list[Message], watch_offsets: bool) -> None:
         schema_records_processed_keymode_canonical = 0
@@ -552,7 +818,14 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             LOG.warning("Subject: %r did not exist, should have", subject)
         else:
             LOG.info("Deleting subject: %r, value: %r", subject, value)
+            deleted_versions = [
+                deleted_version
+                for deleted_version in self.database.find_subject_schemas(subject=subject, include_deleted=False)
+                if deleted_version <= version
+            ]
             self.database.delete_subject(subject=subject, version=version)
+            for deleted_version in deleted_versions:
+                self._discard_resolved_schemas(subject, deleted_version)
 
     def _handle_msg_schema_hard_delete(self, key: dict) -> None:
         subject, version = key["subject"], Version(key["version"])
@@ -564,6 +837,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         else:
             LOG.info("Hard delete: subject: %r version: %r", subject, version)
             self.database.delete_subject_schema(subject=subject, version=version)
+            self._discard_resolved_schemas(subject, version)
             if not self.database.find_subject_schemas(subject=subject, include_deleted=True):
                 LOG.info("Hard delete last version, subject %r is gone", subject)
                 self.database.delete_subject_hard(subject=subject)
@@ -608,13 +882,16 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
                 if schema_references:
                     candidate_references = [reference_from_mapping(reference_data) for reference_data in schema_references]
                     resolved_references, resolved_dependencies = self.resolve_references(candidate_references)
-                parsed_schema = parse_protobuf_schema_definition(
-                    schema_str,
-                    resolved_references,
-                    resolved_dependencies,
-                    validate_references=False,
-                    normalize=False,
-                )
+                else:
+                    parsed_schema = self._replay_parsed_schemas.get(schema_str)
+                if parsed_schema is None:
+                    parsed_schema = parse_protobuf_schema_definition(
+                        schema_str,
+                        resolved_references,
+                        resolved_dependencies,
+                        validate_references=False,
+                        normalize=False,
+                    )
                 schema_str = str(parsed_schema)
             except (InvalidSchema, ProtobufException) as exc:
                 LOG.warning("Schema is not valid ProtoBuf definition")
@@ -634,6 +911,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         except (InvalidSchema, JSONDecodeError) as exc:
             raise InvalidSchema from exc
 
+        replaced = schema_version in self.database.find_subject_schemas(subject=schema_subject, include_deleted=True)
         self.database.insert_schema_version(
             subject=schema_subject,
             schema_id=schema_id,
@@ -642,6 +920,8 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             schema=typed_schema,
             references=resolved_references,
         )
+        if replaced:
+            self._discard_resolved_schemas(schema_subject, schema_version)
 
     def handle_msg(self, key: dict, value: dict | None) -> None:
         if "keytype" in key:
@@ -673,6 +953,24 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
     ) -> Referents | None:
         return self.database.get_referenced_by(subject, version)
 
+    def _discard_resolved_schemas(self, subject: Subject, version: Version) -> None:
+        """Discard the resolved schema of the version and of the versions referencing it, also transitively.
+
+        Called after the version is changed in the database. The discard is done also when nothing is cached,
+        it makes a resolve that read the database before the change drop its result.
+        """
+        discarded: set[tuple[Subject, Version]] = set()
+        pending = [(subject, version)]
+        while pending:
+            key = pending.pop()
+            if key in discarded:
+                continue
+            discarded.add(key)
+            for schema_id in self.database.get_referenced_by(*key) or ():
+                for referent in self.database.find_schema_versions_by_schema_id(schema_id=schema_id, include_deleted=True):
+                    pending.append((referent.subject, referent.version))
+        self._resolved_schemas.discard(discarded)
+
     def _resolve_and_validate(self, schema: TypedSchema) -> ValidatedTypedSchema:
         references, dependencies = (
             self.resolve_references(schema.references) if schema.references else (schema.references, schema.dependencies)
@@ -684,10 +982,7 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
             dependencies=dependencies,
         )
 
-    def _resolve_reference(
-        self,
-        reference: Reference | LatestVersionReference,
-    ) -> tuple[Reference, Dependency]:
+    def _resolve_reference_version(self, reference: Reference | LatestVersionReference) -> Reference:
         subject_data = self.database.find_subject_schemas(
             subject=reference.subject,
             include_deleted=False,
@@ -699,14 +994,36 @@ class KafkaSchemaReader(Thread, SchemaReaderStoppper):
         if isinstance(reference, LatestVersionReference):
             reference = reference.resolve(max(subject_data))
 
-        schema_version = subject_data.get(reference.version, None)
-        if schema_version is None:
+        if reference.version not in subject_data:
             raise InvalidReferences(f"Subject {reference.subject} has no such schema version")
+        return reference
+
+    def _resolve_reference(
+        self,
+        reference: Reference | LatestVersionReference,
+    ) -> tuple[Reference, Dependency]:
+        # Read before the database, a change after it discards the resolved schema and its referrers
+        generation = self._resolved_schemas.generation
+        reference = self._resolve_reference_version(reference)
+        schema_version = self.database.find_subject_schemas(subject=reference.subject, include_deleted=False)[
+            reference.version
+        ]
 
         if not schema_version.schema:
             raise InvalidReferences(f"No schema in {reference.subject} with version {reference.version}.")
 
-        validated_schema = self._resolve_and_validate(schema_version.schema)
+        validated_schema = self._resolved_schemas.get(
+            subject=reference.subject, version=reference.version, schema_id=schema_version.schema_id
+        )
+        if validated_schema is None:
+            validated_schema = self._resolve_and_validate(schema_version.schema)
+            self._resolved_schemas.put(
+                subject=reference.subject,
+                version=reference.version,
+                schema_id=schema_version.schema_id,
+                schema=validated_schema,
+                generation=generation,
+            )
 
         return reference, Dependency.of(reference, validated_schema)
 
@@ -5,13 +5,16 @@ See LICENSE for details
 
 from __future__ import annotations
 
-from avro.compatibility import SchemaCompatibilityResult, SchemaCompatibilityType
-from collections.abc import Sequence
+from avro.compatibility import merge, SchemaCompatibilityResult, SchemaCompatibilityType
+from collections import OrderedDict
+from collections.abc import Callable, Iterator, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import AsyncExitStack, closing
+from dataclasses import dataclass
 from karapace.core.instrumentation.tracer import Tracer
 from karapace.core.compatibility import CompatibilityModes
 from karapace.core.compatibility.jsonschema.checks import is_incompatible
-from karapace.core.compatibility.schema_compatibility import SchemaCompatibility
+from karapace.core.compatibility.schema_compatibility import CompatibilityVerdictCache
 from karapace.core.config import Config
 from karapace.core.coordinator.master_coordinator import MasterCoordinator
 from karapace.core.dependency import Dependency
@@ -26,7 +29,7 @@ from karapace.core.errors import (
     SubjectSoftDeletedException,
     VersionNotFoundException,
 )
-from karapace.core.in_memory_database import InMemoryDatabase
+from karapace.core.in_memory_database import CompactInMemoryDatabase, InMemoryDatabase, KarapaceDatabase
 from karapace.core.key_format import KeyFormatter
 from karapace.core.messaging import KarapaceProducer
 from karapace.core.offset_watcher import OffsetWatcher
@@ -42,6 +45,8 @@ from karapace.core.schema_reader import KafkaSchemaReader
 from karapace.core.schema_references import LatestVersionReference, Reference
 from karapace.core.stats import StatsClient
 from karapace.core.typing import JsonObject, Mode, PrimaryInfo, SchemaId, Subject, Version
+from threading import Lock
+from typing import Any
 
 import asyncio
 import logging
@@ -49,6 +54,88 @@ import logging
 LOG = logging.getLogger(__name__)
 
 
+@dataclass
+class _PendingRegistration:
+    subject: Subject
+    schema: ValidatedTypedSchema
+    references: Sequence[Reference] | None
+    result: asyncio.Future[SchemaId]
+
+    def set_result(self, schema_id: SchemaId) -> None:
+        if not self.result.done():
+            self.result.set_result(schema_id)
+
+    def set_exception(self, exception: Exception) -> None:
+        if not self.result.done():
+            self.result.set_exception(exception)
+
+
+def _dependency_subjects(dependencies: dict[str, Dependency] | None) -> Iterator[Subject]:
+    for dependency in (dependencies or {}).values():
+        yield dependency.subject
+        yield from _dependency_subjects(dependency.schema.dependencies)
+
+
+@dataclass(frozen=True)
+class _ParsedSchemaVersion:
+    schema_id: SchemaId
+    subject_revisions: tuple[tuple[Subject, int], ...]
+    schema: ParsedTypedSchema
+
+
+class _ParsedSchemaCache:
+    """Least recently used bound of the parsed schemas of the subject versions, for the compatibility checks.
+
+    A parsed schema is valid while the revisions of its subject and of the subjects of its transitive
+    dependencies are unchanged, the revisions change when the schema reader applies a delete or replaces
+    a version. Registering a new version does not invalidate the parsed versions of the subject.
+    """
+
+    def __init__(self, *, database: KarapaceDatabase, max_size: int) -> None:
+        self._database = database
+        self._max_size = max_size
+        self._lock = Lock()
+        self._parsed_versions: OrderedDict[tuple[Subject, Version], _ParsedSchemaVersion] = OrderedDict()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._parsed_versions)
+
+    def _is_valid(self, parsed_version: _ParsedSchemaVersion, schema_version: SchemaVersion) -> bool:
+        return parsed_version.schema_id == schema_version.schema_id and all(
+            self._database.subject_revision(subject=subject) == revision
+            for subject, revision in parsed_version.subject_revisions
+        )
+
+    def get(self, schema_version: SchemaVersion, parse: Callable[[TypedSchema], ParsedTypedSchema]) -> ParsedTypedSchema:
+        if self._max_size <= 0:
+            return parse(schema_version.schema)
+
+        key = (schema_version.subject, schema_version.version)
+        with self._lock:
+            parsed_version = self._parsed_versions.get(key)
+            if parsed_version is not None:
+                self._parsed_versions.move_to_end(key)
+        if parsed_version is not None and self._is_valid(parsed_version, schema_version):
+            return parsed_version.schema
+
+        revision = self._database.revision()
+        parsed_schema = parse(schema_version.schema)
+        subjects = {schema_version.subject, *_dependency_subjects(parsed_schema.dependencies)}
+        subject_revisions = tuple((subject, self._database.subject_revision(subject=subject)) for subject in subjects)
+        if any(subject_revision > revision for _, subject_revision in subject_revisions):
+            # A referenced version changed while parsing, the dependencies may be stale
+            return parsed_schema
+        with self._lock:
+            self._parsed_versions[key] = _ParsedSchemaVersion(
+                schema_id=schema_version.schema_id, subject_revisions=subject_revisions, schema=parsed_schema
+            )
+            self._parsed_versions.move_to_end(key)
+            while len(self._parsed_versions) > self._max_size:
+                self._parsed_versions.popitem(last=False)
+        return parsed_schema
+
+
 class KarapaceSchemaRegistry:
     def __init__(self, config: Config, stats: StatsClient) -> None:
         # TODO: compatibility was previously in mutable dict, fix the runtime config to be distinct from static config.
@@ -62,7 +149,7 @@ class KarapaceSchemaRegistry:
         )
 
         self.mc = MasterCoordinator(config=self.config)
-        self.database = InMemoryDatabase()
+        self.database = CompactInMemoryDatabase() if self.config.compact_schema_database else InMemoryDatabase()
         self.schema_reader = KafkaSchemaReader(
             config=self.config,
             offset_watcher=offset_watcher,
@@ -72,10 +159,25 @@ class KarapaceSchemaRegistry:
             stats=stats,
         )
         self.mc.set_stoppper(self.schema_reader)
+        self._parsed_schemas = _ParsedSchemaCache(
+            database=self.database, max_size=self.config.compatibility_parsed_schemas_cache_size
+        )
+        self.compatibility_verdicts = CompatibilityVerdictCache(
+            max_size=self.config.compatibility_verdict_cache_size, stats=stats
+        )
+        # The compatibility checks of a schema against the previous versions run in the pool, if configured
+        self._compatibility_check_executor: ThreadPoolExecutor | None = None
+        if self.config.compatibility_check_workers > 0:
+            self._compatibility_check_executor = ThreadPoolExecutor(
+                max_workers=self.config.compatibility_check_workers, thread_name_prefix="karapace_compatibility"
+            )
 
         self.schema_lock = asyncio.Lock()
         self._master_lock = asyncio.Lock()
 
+        self._pending_registrations: list[_PendingRegistration] = []
+        self._group_commit_task: asyncio.Task[None] | None = None
+
     def subjects_list(self, include_deleted: bool = False) -> list[Subject]:
         return self.database.find_subjects(include_deleted=include_deleted)
 
@@ -97,6 +199,8 @@ class KarapaceSchemaRegistry:
             stack.push_async_callback(self.mc.close)
             stack.enter_context(closing(self.schema_reader))
             stack.enter_context(closing(self.producer))
+            if self._compatibility_check_executor is not None:
+                stack.callback(self._compatibility_check_executor.shutdown, wait=False, cancel_futures=True)
 
     async def get_master(self) -> PrimaryInfo:
         """Resolve if current node is the primary and the primary node address.
@@ -126,10 +230,23 @@ class KarapaceSchemaRegistry:
             raise ValueError(f"Unknown compatibility mode {compatibility}") from e
         return compatibility_mode
 
-    async def schemas_list(self, *, include_deleted: bool, latest_only: bool) -> dict[Subject, list[SchemaVersion]]:
+    async def schemas_list(
+        self,
+        *,
+        include_deleted: bool,
+        latest_only: bool,
+        subject_prefix: str = "",
+        start_after: tuple[Subject, Version] | None = None,
+        limit: int | None = None,
+    ) -> list[SchemaVersion]:
         async with self.schema_lock:
-            schemas = self.database.find_schemas(include_deleted=include_deleted, latest_only=latest_only)
-            return schemas
+            return self.database.scan_schemas(
+                include_deleted=include_deleted,
+                latest_only=latest_only,
+                subject_prefix=subject_prefix,
+                start_after=start_after,
+                limit=limit,
+            )
 
     def schemas_get(self, schema_id: SchemaId, *, fetch_max_id: bool = False) -> TypedSchema | None:
         try:
@@ -174,7 +291,7 @@ class KarapaceSchemaRegistry:
                         version_id,
                         schema_version.schema_id,
                     )
-                    self.send_schema_message(
+                    await self.send_schema_message(
                         subject=subject,
                         schema=None,
                         schema_id=schema_version.schema_id,
@@ -198,7 +315,7 @@ class KarapaceSchemaRegistry:
                 referenced_by = self.schema_reader.get_referenced_by(subject, latest_version_id)
                 if referenced_by and len(referenced_by) > 0:
                     raise ReferenceExistsException(referenced_by, latest_version_id)
-                self.send_delete_subject_message(subject, latest_version_id)
+                await self.send_delete_subject_message(subject, latest_version_id)
 
             return version_list
 
@@ -227,7 +344,7 @@ class KarapaceSchemaRegistry:
             if referenced_by and len(referenced_by) > 0:
                 raise ReferenceExistsException(referenced_by, resolved_version)
 
-            self.send_schema_message(
+            await self.send_schema_message(
                 subject=subject,
                 schema=None if permanent else schema_version.schema,
                 schema_id=schema_version.schema_id,
@@ -312,85 +429,179 @@ class KarapaceSchemaRegistry:
         This function is allowed to be called only from the Karapace master node.
         """
         LOG.info("Writing new schema locally since we're the master")
+        if self.config.schema_registration_group_commit:
+            return await self._register_in_group_commit(subject, new_schema, new_schema_references)
+
         async with self.schema_lock:
-            # When waiting for a lock, another writer may have written the schema.
-            # Fast path check for resolving.
-            maybe_schema_id = self.database.get_schema_id_if_exists(
-                subject=subject, schema=new_schema, include_deleted=False
-            )
-            if maybe_schema_id is not None:
-                LOG.debug("Schema id %r found from subject+schema cache", maybe_schema_id)
-                return maybe_schema_id
-
-            all_schema_versions = self.database.find_subject_schemas(subject=subject, include_deleted=True)
-            if not all_schema_versions:
-                version = Version(1)
-                schema_id = self.database.get_schema_id(new_schema)
-                LOG.debug(
-                    "Registering new subject: %r, id: %r with version: %r with schema %r, schema_id: %r",
-                    subject,
-                    schema_id,
-                    version,
-                    new_schema.schema_str,
-                    schema_id,
+            schema_id, version = await self._plan_new_schema(subject, new_schema, self.database.get_schema_id)
+            if version is not None:
+                await self.send_schema_message(
+                    subject=subject,
+                    schema=new_schema,
+                    schema_id=schema_id,
+                    version=version,
+                    deleted=False,
+                    references=new_schema_references,
                 )
-            else:
-                # First check if any of the existing schemas for the subject match
-                live_versions = self.get_live_versions_sorted(all_schema_versions)
-                if not live_versions:  # Previous ones have been deleted by the user.
-                    version = self.database.get_next_version(subject=subject)
-                    schema_id = self.database.get_schema_id(new_schema)
-                    LOG.debug(
-                        "Registering subject: %r, id: %r new version: %r with schema %r, schema_id: %r",
-                        subject,
-                        schema_id,
-                        version,
-                        new_schema.schema_str,
-                        schema_id,
-                    )
-                    self.send_schema_message(
-                        subject=subject,
-                        schema=new_schema,
-                        schema_id=schema_id,
-                        version=version,
-                        deleted=False,
-                        references=new_schema_references,
-                    )
-                    return schema_id
+            return schema_id
 
-                result = self.check_schema_compatibility(new_schema, subject)
+    async def _plan_new_schema(
+        self,
+        subject: Subject,
+        new_schema: ValidatedTypedSchema,
+        get_schema_id: Callable[[TypedSchema], SchemaId],
+    ) -> tuple[SchemaId, Version | None]:
+        """Resolve the schema id and the version to write for `new_schema`.
 
-                if is_incompatible(result):
-                    LOG.warning(
-                        "Incompatible schema: %s, incompatibilities: %s", result.compatibility, result.incompatibilities
-                    )
-                    compatibility_mode = self.get_compatibility_mode(subject=subject)
-                    raise IncompatibleSchema(
-                        f"Incompatible schema, compatibility_mode={compatibility_mode.value}. "
-                        f"Incompatibilities: {', '.join(result.messages)[:300]}"
-                    )
+        The version is `None` if the schema is already registered for the subject. Must be
+        called with `schema_lock` held.
+        """
+        # When waiting for a lock, another writer may have written the schema.
+        # Fast path check for resolving.
+        maybe_schema_id = self.database.get_schema_id_if_exists(subject=subject, schema=new_schema, include_deleted=False)
+        if maybe_schema_id is not None:
+            LOG.debug("Schema id %r found from subject+schema cache", maybe_schema_id)
+            return maybe_schema_id, None
+
+        all_schema_versions = self.database.find_subject_schemas(subject=subject, include_deleted=True)
+        if not all_schema_versions:
+            version = Version(1)
+            schema_id = get_schema_id(new_schema)
+            LOG.debug(
+                "Registering new subject: %r, id: %r with version: %r with schema %r, schema_id: %r",
+                subject,
+                schema_id,
+                version,
+                new_schema.schema_str,
+                schema_id,
+            )
+            return schema_id, version
 
-                # We didn't find an existing schema and the schema is compatible so go and create one
-                version = self.database.get_next_version(subject=subject)
-                schema_id = self.database.get_schema_id(new_schema)
-                LOG.debug(
-                    "Registering subject: %r, id: %r new version: %r with schema %s, schema_id: %r",
-                    subject,
-                    schema_id,
-                    version,
-                    new_schema,
-                    schema_id,
-                )
+        # First check if any of the existing schemas for the subject match
+        live_versions = self.get_live_versions_sorted(all_schema_versions)
+        if not live_versions:  # Previous ones have been deleted by the user.
+            version = self.database.get_next_version(subject=subject)
+            schema_id = get_schema_id(new_schema)
+            LOG.debug(
+                "Registering subject: %r, id: %r new version: %r with schema %r, schema_id: %r",
+                subject,
+                schema_id,
+                version,
+                new_schema.schema_str,
+                schema_id,
+            )
+            return schema_id, version
 
-            self.send_schema_message(
-                subject=subject,
-                schema=new_schema,
-                schema_id=schema_id,
-                version=version,
-                deleted=False,
-                references=new_schema_references,
+        result = await self.check_schema_compatibility(new_schema, subject)
+
+        if is_incompatible(result):
+            LOG.warning("Incompatible schema: %s, incompatibilities: %s", result.compatibility, result.incompatibilities)
+            compatibility_mode = self.get_compatibility_mode(subject=subject)
+            raise IncompatibleSchema(
+                f"Incompatible schema, compatibility_mode={compatibility_mode.value}. "
+                f"Incompatibilities: {', '.join(result.messages)[:300]}"
             )
-            return schema_id
+
+        # We didn't find an existing schema and the schema is compatible so go and create one
+        version = self.database.get_next_version(subject=subject)
+        schema_id = get_schema_id(new_schema)
+        LOG.debug(
+            "Registering subject: %r, id: %r new version: %r with schema %s, schema_id: %r",
+            subject,
+            schema_id,
+            version,
+            new_schema,
+            schema_id,
+        )
+        return schema_id, version
+
+    async def _register_in_group_commit(
+        self,
+        subject: Subject,
+        new_schema: ValidatedTypedSchema,
+        new_schema_references: Sequence[Reference] | None,
+    ) -> SchemaId:
+        registration = _PendingRegistration(
+            subject=subject,
+            schema=new_schema,
+            references=new_schema_references,
+            result=asyncio.get_running_loop().create_future(),
+        )
+        self._pending_registrations.append(registration)
+        if self._group_commit_task is None or self._group_commit_task.done():
+            self._group_commit_task = asyncio.create_task(self._group_commit_registrations())
+        return await registration.result
+
+    def _take_registration_batch(self) -> list[_PendingRegistration]:
+        # A batch has at most one registration per subject, the following registrations of the
+        # subject are checked against the state written by the batch and keep their order.
+        batch: list[_PendingRegistration] = []
+        remaining: list[_PendingRegistration] = []
+        subjects: set[Subject] = set()
+        for registration in self._pending_registrations:
+            if len(batch) < self.config.schema_registration_group_commit_max_size and registration.subject not in subjects:
+                batch.append(registration)
+                subjects.add(registration.subject)
+            else:
+                remaining.append(registration)
+        self._pending_registrations = remaining
+        return batch
+
+    async def _group_commit_registrations(self) -> None:
+        # Registrations arriving while a batch is written are collected into the next batch
+        while self._pending_registrations:
+            await self._commit_registrations(self._take_registration_batch())
+
+    async def _commit_registrations(self, batch: list[_PendingRegistration]) -> None:
+        async with self.schema_lock:
+            planned: list[tuple[_PendingRegistration, SchemaId, Version]] = []
+
+            def get_schema_id(schema: TypedSchema) -> SchemaId:
+                # The same new schema registered for multiple subjects of the batch gets a single id
+                for registration, schema_id, _ in planned:
+                    if registration.schema == schema:
+                        return schema_id
+                return self.database.get_schema_id(schema)
+
+            for registration in batch:
+                try:
+                    schema_id, version = await self._plan_new_schema(
+                        registration.subject, registration.schema, get_schema_id
+                    )
+                except Exception as e:
+                    registration.set_exception(e)
+                    continue
+                if version is None:
+                    registration.set_result(schema_id)
+                else:
+                    planned.append((registration, schema_id, version))
+
+            if not planned:
+                return
+
+            messages = [
+                self._schema_message(
+                    subject=registration.subject,
+                    schema=registration.schema,
+                    schema_id=schema_id,
+                    version=version,
+                    deleted=False,
+                    references=registration.references,
+                )
+                for registration, schema_id, version in planned
+            ]
+            try:
+                errors = await self.producer.send_messages(messages)
+            except Exception as e:
+                for registration, _, _ in planned:
+                    registration.set_exception(e)
+                return
+
+            for (registration, schema_id, _), error in zip(planned, errors):
+                if error is None:
+                    registration.set_result(schema_id)
+                else:
+                    registration.set_exception(error)
 
     def get_subject_versions_for_schema(
         self, schema_id: SchemaId, *, include_deleted: bool = False
@@ -411,7 +622,7 @@ class KarapaceSchemaRegistry:
     def get_subject_mode(self) -> Mode:
         return Mode.readwrite
 
-    def send_schema_message(
+    def _schema_message(
         self,
         *,
         subject: Subject,
@@ -420,8 +631,9 @@ class KarapaceSchemaRegistry:
         version: Version,
         deleted: bool,
         references: Sequence[Reference] | None,
-    ) -> None:
+    ) -> tuple[dict[str, Any], dict[str, Any] | None]:
         key = {"subject": subject, "version": version.value, "magic": 1, "keytype": "SCHEMA"}
+        value: dict[str, Any] | None
         if schema:
             value = {
                 "subject": subject,
@@ -436,16 +648,36 @@ class KarapaceSchemaRegistry:
                 value["schemaType"] = schema.schema_type
         else:
             value = None
-        self.producer.send_message(key=key, value=value)
+        return key, value
+
+    async def send_schema_message(
+        self,
+        *,
+        subject: Subject,
+        schema: TypedSchema | None,
+        schema_id: int,
+        version: Version,
+        deleted: bool,
+        references: Sequence[Reference] | None,
+    ) -> None:
+        key, value = self._schema_message(
+            subject=subject,
+            schema=schema,
+            schema_id=schema_id,
+            version=version,
+            deleted=deleted,
+            references=references,
+        )
+        await self.producer.send_message(key=key, value=value)
 
-    def send_config_message(self, compatibility_level: CompatibilityModes, subject: Subject | None = None) -> None:
+    async def send_config_message(self, compatibility_level: CompatibilityModes, subject: Subject | None = None) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "CONFIG"}
         value = {"compatibilityLevel": compatibility_level.value}
-        self.producer.send_message(key=key, value=value)
+        await self.producer.send_message(key=key, value=value)
 
-    def send_config_subject_delete_message(self, subject: Subject) -> None:
+    async def send_config_subject_delete_message(self, subject: Subject) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "CONFIG"}
-        self.producer.send_message(key=key, value=None)
+        await self.producer.send_message(key=key, value=None)
 
     def resolve_references(
         self,
@@ -453,16 +685,23 @@ class KarapaceSchemaRegistry:
     ) -> tuple[Sequence[Reference], dict[str, Dependency]] | tuple[None, None]:
         return self.schema_reader.resolve_references(references) if references else (None, None)
 
-    def send_delete_subject_message(self, subject: Subject, version: Version) -> None:
+    async def send_delete_subject_message(self, subject: Subject, version: Version) -> None:
         key = {"subject": subject, "magic": 0, "keytype": "DELETE_SUBJECT"}
         value = {"subject": subject, "version": version.value}
-        self.producer.send_message(key=key, value=value)
+        await self.producer.send_message(key=key, value=value)
 
-    def check_schema_compatibility(
+    async def check_schema_compatibility(
         self,
         new_schema: ValidatedTypedSchema,
         subject: Subject,
+        *,
+        all_versions: bool = False,
     ) -> SchemaCompatibilityResult:
+        """Check the compatibility of `new_schema` with the versions of the subject selected by the compatibility mode.
+
+        The check stops on the first incompatible version, unless `all_versions` is set, in which case the
+        incompatibilities of all the checked versions are returned.
+        """
         result = SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
 
         compatibility_mode = self.get_compatibility_mode(subject=subject)
@@ -480,20 +719,71 @@ class KarapaceSchemaRegistry:
             # Only check against latest version
             old_versions = [live_versions[-1]]
 
-        for old_version in old_versions:
-            old_parsed_schema = self.resolve_and_parse(all_schema_versions[old_version].schema)
-
-            result = SchemaCompatibility.check_compatibility(
-                old_schema=old_parsed_schema,
-                new_schema=new_schema,
-                compatibility_mode=compatibility_mode,
+        old_schema_versions = [all_schema_versions[old_version] for old_version in old_versions]
+        if self._compatibility_check_executor is not None and old_schema_versions:
+            return await self._check_versions_in_executor(
+                self._compatibility_check_executor, old_schema_versions, new_schema, compatibility_mode, all_versions
             )
 
-            if is_incompatible(result):
-                return result
+        for old_schema_version in old_schema_versions:
+            version_result = self._check_version_compatibility(old_schema_version, new_schema, compatibility_mode)
+            if is_incompatible(version_result):
+                if not all_versions:
+                    return version_result
+                result = merge(result, version_result)
 
         return result
 
+    def _check_version_compatibility(
+        self,
+        old_schema_version: SchemaVersion,
+        new_schema: ValidatedTypedSchema,
+        compatibility_mode: CompatibilityModes,
+    ) -> SchemaCompatibilityResult:
+        old_parsed_schema = self._parsed_schemas.get(old_schema_version, self.resolve_and_parse)
+        return self.compatibility_verdicts.check_compatibility(
+            old_schema=old_parsed_schema,
+            new_schema=new_schema,
+            compatibility_mode=compatibility_mode,
+        )
+
+    async def _check_versions_in_executor(
+        self,
+        executor: ThreadPoolExecutor,
+        old_schema_versions: list[SchemaVersion],
+        new_schema: ValidatedTypedSchema,
+        compatibility_mode: CompatibilityModes,
+        all_versions: bool,
+    ) -> SchemaCompatibilityResult:
+        # The checks run concurrently, without `all_versions` the result is the first incompatible
+        # version found, which is not necessarily the oldest one.
+        loop = asyncio.get_running_loop()
+        futures = [
+            loop.run_in_executor(
+                executor, self._check_version_compatibility, old_schema_version, new_schema, compatibility_mode
+            )
+            for old_schema_version in old_schema_versions
+        ]
+        result = SchemaCompatibilityResult(SchemaCompatibilityType.compatible)
+        try:
+            if all_versions:
+                for version_result in await asyncio.gather(*futures):
+                    if is_incompatible(version_result):
+                        result = merge(result, version_result)
+                return result
+            for future in asyncio.as_completed(futures):
+                version_result = await future
+                if is_incompatible(version_result):
+                    return version_result
+            return result
+        finally:
+            # The checks not started yet are cancelled, the errors of the completed ones are not reported
+            for future in futures:
+                if not future.done():
+                    future.cancel()
+                elif not future.cancelled():
+                    future.exception()
+
     @staticmethod
     def get_live_versions_sorted(all_schema_versions: dict[Version, SchemaVersion]) -> list[Version]:
         live_schema_versions = {
@@ -9,7 +9,9 @@ from aiohttp import BasicAuth
 from async_lru import alru_cache
 from avro.io import BinaryDecoder, BinaryEncoder, DatumReader, DatumWriter
 from cachetools import TTLCache
-from collections.abc import Callable, MutableMapping
+from collections.abc import Callable, MutableMapping, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
 from google.protobuf.message import DecodeError
 from jsonschema import ValidationError
 from karapace.core.client import Client
@@ -28,9 +30,10 @@ from karapace.core.schema_models import (
     Versioner,
 )
 from karapace.core.schema_references import LatestVersionReference, Reference, reference_from_mapping
-from karapace.core.typing import NameStrategy, SchemaId, Subject, SubjectType, Version
+from karapace.core.typing import NameStrategy, SchemaId, SerdeExecutorType, Subject, SubjectType, Version
 from karapace.core.utils import json_decode, json_encode
-from typing import Any
+from karapace.statsd import StatsClient
+from typing import Any, cast, Final, TypeVar
 from urllib.parse import quote
 
 import asyncio
@@ -38,11 +41,17 @@ import avro
 import avro.schema
 import io
 import struct
+import time
 
 START_BYTE = 0x0
 HEADER_FORMAT = ">bI"
 HEADER_SIZE = 5
 
+METRIC_SERDE_EXECUTOR_PENDING: Final = "serde_executor_pending"
+METRIC_SERDE_EXECUTOR_LATENCY: Final = "serde_executor_latency"
+
+T = TypeVar("T")
+
 
 class DeserializationError(Exception):
     pass
@@ -307,6 +316,8 @@ class SchemaRegistrySerializer:
         self.ids_to_schemas: dict[int, TypedSchema] = {}
         self.ids_to_subjects: MutableMapping[int, list[Subject]] = TTLCache(maxsize=10000, ttl=600)
         self.schemas_to_ids: dict[str, SchemaId] = {}
+        # Schema ids are immutable, the prepared codecs can be reused for the lifetime of the serializer
+        self.ids_to_avro_codecs: dict[SchemaId, AvroSchemaCodec] = {}
 
     async def close(self) -> None:
         if self.registry_client:
@@ -358,35 +369,210 @@ class SchemaRegistrySerializer:
             self.ids_to_subjects[schema_id] = subjects
         return schema_typed, subjects
 
+    def get_avro_codec(self, schema_id: SchemaId, schema: TypedSchema) -> AvroSchemaCodec | None:
+        if schema.schema_type is not SchemaType.AVRO:
+            return None
+        codec = self.ids_to_avro_codecs.get(schema_id)
+        if codec is None:
+            codec = AvroSchemaCodec(schema.schema)
+            self.ids_to_avro_codecs[schema_id] = codec
+        return codec
+
     async def serialize(self, schema: TypedSchema, value: dict) -> bytes:
+        return (await self.serialize_many(schema, [value]))[0]
+
+    async def serialize_many(
+        self,
+        schema: TypedSchema,
+        values: Sequence[dict],
+        *,
+        executor: SerdeExecutor | None = None,
+    ) -> list[bytes]:
+        """Serialize `values` with `schema`, the results are in the same order as `values`.
+
+        The encoding runs in `executor` if given, otherwise on the calling thread.
+        """
         schema_id = self.schemas_to_ids[str(schema)]
-        with io.BytesIO() as bio:
-            bio.write(struct.pack(HEADER_FORMAT, START_BYTE, schema_id))
-            try:
-                write_value(self.config, schema, bio, value)
-                return bio.getvalue()
-            except ProtobufTypeException as e:
-                raise InvalidMessageSchema("Object does not fit to stored schema") from e
-            except avro.errors.AvroTypeException as e:
-                raise InvalidMessageSchema("Object does not fit to stored schema") from e
+        header = struct.pack(HEADER_FORMAT, START_BYTE, schema_id)
+        try:
+            if schema.schema_type is SchemaType.AVRO:
+                avro_codec = self.get_avro_codec(schema_id, schema)
+                assert avro_codec is not None
+                return await _run(executor, schema.schema_type, _write_avro_values, avro_codec, header, values)
+            return await _run(executor, schema.schema_type, _write_values, self.config, schema, header, values)
+        except ProtobufTypeException as e:
+            raise InvalidMessageSchema("Object does not fit to stored schema") from e
+        except avro.errors.AvroTypeException as e:
+            raise InvalidMessageSchema("Object does not fit to stored schema") from e
 
     async def deserialize(self, bytes_: bytes) -> dict:
-        with io.BytesIO(bytes_) as bio:
-            byte_arr = bio.read(HEADER_SIZE)
+        return (await self.deserialize_many([bytes_]))[0]
+
+    async def deserialize_many(
+        self,
+        bytes_list: Sequence[bytes],
+        *,
+        executor: SerdeExecutor | None = None,
+    ) -> list[dict]:
+        """Deserialize `bytes_list`, the results are in the same order as `bytes_list`.
+
+        Every distinct schema id is resolved once and the messages of a schema are decoded
+        as a single batch, in `executor` if given, otherwise on the calling thread. The first
+        invalid message fails the whole batch.
+        """
+        batches: dict[SchemaId, list[int]] = {}
+        for idx, bytes_ in enumerate(bytes_list):
             # we should probably check for compatibility here
-            start_byte, schema_id = struct.unpack(HEADER_FORMAT, byte_arr)
+            start_byte, schema_id = struct.unpack(HEADER_FORMAT, bytes_[:HEADER_SIZE])
             if start_byte != START_BYTE:
                 raise InvalidMessageHeader(f"Start byte is {start_byte:x} and should be {START_BYTE:x}")
-            try:
+            batches.setdefault(schema_id, []).append(idx)
+
+        try:
+            decoding = []
+            for schema_id, indexes in batches.items():
                 schema, _ = await self.get_schema_for_id(schema_id)
                 if schema is None:
                     raise InvalidPayload("No schema with ID from payload")
-                ret_val = read_value(self.config, schema, bio)
-                return ret_val
-            except (UnicodeDecodeError, TypeError, avro.errors.InvalidAvroBinaryEncoding) as e:
-                raise InvalidPayload("Data does not contain a valid message") from e
-            except avro.errors.SchemaResolutionException as e:
-                raise InvalidPayload("Data cannot be decoded with provided schema") from e
+                payloads = [bytes_list[idx][HEADER_SIZE:] for idx in indexes]
+                if schema.schema_type is SchemaType.AVRO:
+                    avro_codec = self.get_avro_codec(schema_id, schema)
+                    assert avro_codec is not None
+                    decoding.append(_run(executor, schema.schema_type, _read_avro_values, avro_codec, payloads))
+                else:
+                    decoding.append(_run(executor, schema.schema_type, _read_values, self.config, schema, payloads))
+
+            result: list[dict | None] = [None] * len(bytes_list)
+            for indexes, values in zip(batches.values(), await asyncio.gather(*decoding)):
+                for idx, value in zip(indexes, values):
+                    result[idx] = value
+            return cast(list[dict], result)
+        except (UnicodeDecodeError, TypeError, avro.errors.InvalidAvroBinaryEncoding) as e:
+            raise InvalidPayload("Data does not contain a valid message") from e
+        except avro.errors.SchemaResolutionException as e:
+            raise InvalidPayload("Data cannot be decoded with provided schema") from e
+
+
+class SerdeExecutor:
+    """Runs the encoding and decoding of record batches off the event loop.
+
+    With `SerdeExecutorType.thread` all the work runs in a thread pool. With
+    `SerdeExecutorType.process` the Avro work, which is pure Python and holds the GIL,
+    runs in a process pool and the other schema types in the thread pool. Protobuf is
+    always encoded by the protobuf worker processes, the thread only waits for them.
+    """
+
+    def __init__(self, *, executor_type: SerdeExecutorType, max_workers: int, stats: StatsClient | None = None) -> None:
+        self.executor_type: Final = executor_type
+        self._stats: Final = stats
+        self._thread_pool: ThreadPoolExecutor | None = None
+        self._process_pool: ProcessPoolExecutor | None = None
+        if executor_type is not SerdeExecutorType.inline:
+            self._thread_pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="karapace_serde")
+        if executor_type is SerdeExecutorType.process:
+            self._process_pool = ProcessPoolExecutor(max_workers=max_workers)
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of batches submitted and not yet completed."""
+        return self._pending
+
+    async def run(self, schema_type: SchemaType, fn: Callable[..., T], *args: Any) -> T:
+        if schema_type is SchemaType.AVRO and self._process_pool is not None:
+            executor: Executor | None = self._process_pool
+            executor_name = "process"
+        else:
+            executor = self._thread_pool
+            executor_name = "thread"
+        if executor is None:
+            return fn(*args)
+
+        self._pending += 1
+        self._report_pending()
+        start_time = time.monotonic()
+        try:
+            return await asyncio.get_running_loop().run_in_executor(executor, partial(fn, *args))
+        finally:
+            self._pending -= 1
+            self._report_pending()
+            if self._stats is not None:
+                self._stats.timing(
+                    METRIC_SERDE_EXECUTOR_LATENCY,
+                    time.monotonic() - start_time,
+                    tags={"executor": executor_name, "schema_type": schema_type.value},
+                )
+
+    def _report_pending(self) -> None:
+        if self._stats is not None:
+            self._stats.gauge(METRIC_SERDE_EXECUTOR_PENDING, self._pending)
+
+    def close(self) -> None:
+        if self._thread_pool is not None:
+            self._thread_pool.shutdown(wait=False, cancel_futures=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+
+
+async def _run(executor: SerdeExecutor | None, schema_type: SchemaType, fn: Callable[..., T], *args: Any) -> T:
+    if executor is None:
+        return fn(*args)
+    return await executor.run(schema_type, fn, *args)
+
+
+# The batch functions are defined at module level to be usable with a process pool.
+
+
+def _write_avro_values(avro_codec: AvroSchemaCodec, header: bytes, values: Sequence[dict]) -> list[bytes]:
+    result = []
+    for value in values:
+        with io.BytesIO() as bio:
+            bio.write(header)
+            avro_codec.write(value, bio)
+            result.append(bio.getvalue())
+    return result
+
+
+def _read_avro_values(avro_codec: AvroSchemaCodec, payloads: Sequence[bytes]) -> list[dict]:
+    result = []
+    for payload in payloads:
+        with io.BytesIO(payload) as bio:
+            result.append(avro_codec.read(bio))
+    return result
+
+
+def _write_values(config: Config, schema: TypedSchema, header: bytes, values: Sequence[dict]) -> list[bytes]:
+    if schema.schema_type is SchemaType.PROTOBUF:
+        # All the messages are encoded with a single round trip to the protobuf worker
+        writer = ProtobufDatumWriter(config, schema.schema)
+        with io.BytesIO() as bio:
+            bio.write(header)
+            writer.write_index(bio)
+            prefix = bio.getvalue()
+        return [prefix + body for body in writer.write_many(values)]
+
+    result = []
+    for value in values:
+        with io.BytesIO() as bio:
+            bio.write(header)
+            write_value(config, schema, bio, value)
+            result.append(bio.getvalue())
+    return result
+
+
+def _read_values(config: Config, schema: TypedSchema, payloads: Sequence[bytes]) -> list[dict]:
+    if schema.schema_type is SchemaType.PROTOBUF:
+        # All the messages are decoded with a single round trip to the protobuf worker
+        try:
+            return ProtobufDatumReader(config, schema.schema).read_many(io.BytesIO(payload) for payload in payloads)
+        except DecodeError as e:
+            raise InvalidPayload from e
+
+    result = []
+    for payload in payloads:
+        with io.BytesIO(payload) as bio:
+            result.append(read_value(config, schema, bio))
+    return result
 
 
 def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
@@ -428,19 +614,11 @@ def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
         return result
 
     if isinstance(schema, avro.schema.UnionSchema) and isinstance(value, dict):
-
-        def get_name(obj) -> str:
-            if isinstance(obj, avro.schema.PrimitiveSchema):
-                return obj.fullname
-            if isinstance(obj, (avro.schema.ArraySchema, avro.schema.MapSchema)):
-                return obj.type
-            return obj.name
-
-        f = next((s for s in schema.schemas if get_name(s) in value), None)
+        f = next((s for s in schema.schemas if _union_branch_name(s) in value), None)
         if f is not None:
             # Note: This is intentionally skipping the dictionary, here the JSON representation
             # is flattened to the Python representation
-            return flatten_unions(f, value[get_name(f)])
+            return flatten_unions(f, value[_union_branch_name(f)])
 
     if isinstance(schema, avro.schema.ArraySchema) and isinstance(value, list):
         return [flatten_unions(schema.items, v) for v in value]
@@ -451,10 +629,122 @@ def flatten_unions(schema: avro.schema.Schema, value: Any) -> Any:
     return value
 
 
-def read_value(config: Config, schema: TypedSchema, bio: io.BytesIO):
+def _union_branch_name(schema: avro.schema.Schema) -> str:
+    if isinstance(schema, avro.schema.PrimitiveSchema):
+        return schema.fullname
+    if isinstance(schema, (avro.schema.ArraySchema, avro.schema.MapSchema)):
+        return schema.type
+    return schema.name
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def compile_flatten_unions(schema: avro.schema.Schema) -> Callable[[Any], Any]:
+    """Precompile `flatten_unions` for `schema`.
+
+    The schema is walked once, the returned function only visits the parts of the
+    value which can contain unions and uses a precomputed table of the union branch
+    names.
+    """
+    compiled: dict[int, Callable[[Any], Any]] = {}
+
+    def compile_schema(schema: avro.schema.Schema) -> Callable[[Any], Any]:
+        key = id(schema)
+        if key in compiled:
+            return compiled[key]
+        # Recursive schemas refer to the function before it is fully compiled
+        resolved: list[Callable[[Any], Any]] = []
+        compiled[key] = lambda value: resolved[0](value)
+        flatten = compile_type(schema)
+        resolved.append(flatten)
+        compiled[key] = flatten
+        return flatten
+
+    def compile_type(schema: avro.schema.Schema) -> Callable[[Any], Any]:
+        if isinstance(schema, avro.schema.RecordSchema):
+            fields = [(field.name, compile_schema(field.type)) for field in schema.fields]
+            fields = [(name, flatten) for name, flatten in fields if flatten is not _identity]
+            if not fields:
+                return _identity
+
+            def flatten_record(value: Any) -> Any:
+                if not isinstance(value, dict):
+                    return value
+                result = dict(value)
+                for name, flatten in fields:
+                    if name in value:
+                        result[name] = flatten(value[name])
+                return result
+
+            return flatten_record
+
+        if isinstance(schema, avro.schema.UnionSchema):
+            branches = [(_union_branch_name(branch), compile_schema(branch)) for branch in schema.schemas]
+
+            def flatten_union(value: Any) -> Any:
+                if isinstance(value, dict):
+                    for name, flatten in branches:
+                        if name in value:
+                            return flatten(value[name])
+                return value
+
+            return flatten_union
+
+        if isinstance(schema, avro.schema.ArraySchema):
+            flatten_item = compile_schema(schema.items)
+            if flatten_item is _identity:
+                return _identity
+            return lambda value: [flatten_item(v) for v in value] if isinstance(value, list) else value
+
+        if isinstance(schema, avro.schema.MapSchema):
+            flatten_value = compile_schema(schema.values)
+            if flatten_value is _identity:
+                return _identity
+            return lambda value: {k: flatten_value(v) for (k, v) in value.items()} if isinstance(value, dict) else value
+
+        return _identity
+
+    return compile_schema(schema)
+
+
+class AvroSchemaCodec:
+    """Prepared reader and writer of an Avro schema, reusable for all records of the schema."""
+
+    def __init__(self, schema: avro.schema.Schema) -> None:
+        self.schema: Final = schema
+        self._reader: Final = DatumReader(writers_schema=schema)
+        self._writer: Final = DatumWriter(writers_schema=schema)
+        self._flatten_unions: Callable[[Any], Any] | None = None
+
+    def __getstate__(self) -> dict[str, Any]:
+        # The compiled plan is made of closures, it is recompiled on demand after unpickling
+        return {**self.__dict__, "_flatten_unions": None}
+
+    def flatten_unions(self, value: Any) -> Any:
+        if self._flatten_unions is None:
+            self._flatten_unions = compile_flatten_unions(self.schema)
+        return self._flatten_unions(value)
+
+    def read(self, bio: io.BytesIO) -> Any:
+        return self._reader.read(BinaryDecoder(bio))
+
+    def write(self, value: Any, bio: io.BytesIO) -> None:
+        # Backwards compatibility: Support JSON encoded data without the tags for unions.
+        if avro.io.validate(self.schema, value):
+            # The value is valid, skip the second validation done by `DatumWriter.write`
+            self._writer.write_data(self.schema, value, BinaryEncoder(bio))
+        else:
+            # Raises if the flattened value is not valid either
+            self._writer.write(self.flatten_unions(value), BinaryEncoder(bio))
+
+
+def read_value(config: Config, schema: TypedSchema, bio: io.BytesIO, *, avro_codec: AvroSchemaCodec | None = None):
     if schema.schema_type is SchemaType.AVRO:
-        reader = DatumReader(writers_schema=schema.schema)
-        return reader.read(BinaryDecoder(bio))
+        if avro_codec is None:
+            avro_codec = AvroSchemaCodec(schema.schema)
+        return avro_codec.read(bio)
     if schema.schema_type is SchemaType.JSONSCHEMA:
         value = json_decode(bio)
         try:
@@ -473,16 +763,18 @@ def read_value(config: Config, schema: TypedSchema, bio: io.BytesIO):
     raise ValueError("Unknown schema type")
 
 
-def write_value(config: Config, schema: TypedSchema, bio: io.BytesIO, value: dict) -> None:
+def write_value(
+    config: Config,
+    schema: TypedSchema,
+    bio: io.BytesIO,
+    value: dict,
+    *,
+    avro_codec: AvroSchemaCodec | None = None,
+) -> None:
     if schema.schema_type is SchemaType.AVRO:
-        # Backwards compatibility: Support JSON encoded data without the tags for unions.
-        if avro.io.validate(schema.schema, value):
-            data = value
-        else:
-            data = flatten_unions(schema.schema, value)
-
-        writer = DatumWriter(writers_schema=schema.schema)
-        writer.write(data, BinaryEncoder(bio))
+        if avro_codec is None:
+            avro_codec = AvroSchemaCodec(schema.schema)
+        avro_codec.write(value, bio)
     elif schema.schema_type is SchemaType.JSONSCHEMA:
         try:
             schema.schema.validate(value)
@@ -23,6 +23,10 @@ METRIC_SCHEMA_TOPIC_RECORDS_PROCESSED_COUNT: Final = "karapace_schema_reader_rec
 METRIC_SCHEMAS_GAUGE: Final = "karapace_schema_reader_schemas_total"
 METRIC_SUBJECTS_GAUGE: Final = "karapace_schema_reader_subjects_total"
 METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE: Final = "karapace_schema_reader_subject_data_schema_versions_total"
+METRIC_SCHEMA_READER_LAG_GAUGE: Final = "karapace_schema_reader_lag"
+METRIC_SCHEMA_READER_CONSUME_BATCH_SIZE_GAUGE: Final = "karapace_schema_reader_consume_batch_size"
+METRIC_AUTHORIZATION_DECISION_CACHE_LOOKUPS_COUNT: Final = "karapace_authorization_decision_cache_lookups_total"
+METRIC_COMPATIBILITY_VERDICT_CACHE_LOOKUPS_COUNT: Final = "karapace_compatibility_verdict_cache_lookups_total"
 METRIC_EXCEPTIONS = "karapace_exceptions_total"
 
 
@@ -54,6 +58,23 @@ class StatsClient:
             name=METRIC_SUBJECT_DATA_SCHEMA_VERSIONS_GAUGE,
             description="Schema versions",
         )
+        self._schema_reader_lag_gauge: Final[_Gauge] = self._meter.get_meter().create_gauge(
+            name=METRIC_SCHEMA_READER_LAG_GAUGE,
+            description="Number of records in the schemas topic not yet consumed by the schema reader",
+        )
+        self._schema_reader_consume_batch_size_gauge: Final[_Gauge] = self._meter.get_meter().create_gauge(
+            name=METRIC_SCHEMA_READER_CONSUME_BATCH_SIZE_GAUGE,
+            description="Maximum number of records consumed by the schema reader at once",
+        )
+        # Supports labels for the result of the lookup, the hit ratio is hits / (hits + misses)
+        self._authorization_decision_cache_lookups_counter: Final[Counter] = self._meter.get_meter().create_counter(
+            name=METRIC_AUTHORIZATION_DECISION_CACHE_LOOKUPS_COUNT,
+            description="Total lookups of authorization decisions from the cache",
+        )
+        self._compatibility_verdict_cache_lookups_counter: Final[Counter] = self._meter.get_meter().create_counter(
+            name=METRIC_COMPATIBILITY_VERDICT_CACHE_LOOKUPS_COUNT,
+            description="Total lookups of schema compatibility check results from the cache",
+        )
         self._exceptions_total: Final[Counter] = self._meter.get_meter().create_counter(
             name=METRIC_EXCEPTIONS, description="Unexpected exceptions"
         )
@@ -76,6 +97,22 @@ class StatsClient:
         self._schema_versions_gauge.set(amount=live_versions, attributes={"state": "live", **self._tags})
         self._schema_versions_gauge.set(amount=soft_deleted_versions, attributes={"state": "soft_deleted", **self._tags})
 
+    def set_schema_reader_lag(self, *, value: int) -> None:
+        self._schema_reader_lag_gauge.set(amount=value, attributes=self._tags)
+
+    def set_schema_reader_consume_batch_size(self, *, value: int) -> None:
+        self._schema_reader_consume_batch_size_gauge.set(amount=value, attributes=self._tags)
+
+    def authorization_decision_cache_lookup(self, *, hit: bool) -> None:
+        self._authorization_decision_cache_lookups_counter.add(
+            amount=1, attributes={"result": "hit" if hit else "miss", **self._tags}
+        )
+
+    def compatibility_verdict_cache_lookup(self, *, hit: bool) -> None:
+        self._compatibility_verdict_cache_lookups_counter.add(
+            amount=1, attributes={"result": "hit" if hit else "miss", **self._tags}
+        )
+
     def unexpected_exception(self, ex: Exception, where: str, tags: dict | None = None) -> None:
         all_tags = {
             "exception": ex.__class__.__name__,
@@ -33,8 +33,9 @@ from karapace.core.serialization import (
     InvalidPayload,
     SchemaRegistrySerializer,
     SchemaRetrievalError,
+    SerdeExecutor,
 )
-from karapace.core.typing import NameStrategy, SchemaId, Subject, SubjectType
+from karapace.core.typing import NameStrategy, SchemaId, SerdeExecutorType, Subject, SubjectType
 from karapace.core.utils import json_encode
 from karapace.kafka_rest_apis.authentication import (
     get_auth_config_from_header,
@@ -77,6 +78,11 @@ class KafkaRest(KarapaceBase):
         super().__init__(config=config)
         self._add_kafka_rest_routes()
         self.serializer = SchemaRegistrySerializer(config=config)
+        self.serde_executor = SerdeExecutor(
+            executor_type=SerdeExecutorType(self.config.rest_serde_executor),
+            max_workers=self.config.rest_serde_executor_max_workers,
+            stats=self.stats,
+        )
         self.proxies: dict[str, UserRestProxy] = {}
         self._proxy_lock = asyncio.Lock()
         log.info("REST proxy starting with (delegated authorization=%s)", self.config.rest_authorization)
@@ -90,6 +96,7 @@ class KafkaRest(KarapaceBase):
         async with AsyncExitStack() as stack:
             stack.push_async_callback(super().close)
             stack.push_async_callback(self.serializer.close)
+            stack.callback(self.serde_executor.close)
 
             for proxy in self.proxies.values():
                 stack.push_async_callback(proxy.aclose)
@@ -320,10 +327,14 @@ class KafkaRest(KarapaceBase):
                             config.sasl_plain_username = auth_config["sasl_plain_username"]
                             config.sasl_plain_password = auth_config["sasl_plain_password"]
 
-                        self.proxies[key] = UserRestProxy(config, self.kafka_timeout, self.serializer, auth_expiry)
+                        self.proxies[key] = UserRestProxy(
+                            config, self.kafka_timeout, self.serializer, auth_expiry, serde_executor=self.serde_executor
+                        )
                 else:
                     if self.proxies.get(key) is None:
-                        self.proxies[key] = UserRestProxy(self.config, self.kafka_timeout, self.serializer)
+                        self.proxies[key] = UserRestProxy(
+                            self.config, self.kafka_timeout, self.serializer, serde_executor=self.serde_executor
+                        )
             except (NoBrokersAvailable, AuthenticationFailedError):
                 log.warning("Failed to connect to Kafka with the credentials")
                 self.r(body={"message": "Forbidden"}, content_type=JSON_CONTENT_TYPE, status=HTTPStatus.FORBIDDEN)
@@ -463,10 +474,12 @@ class UserRestProxy:
         serializer: SchemaRegistrySerializer,
         auth_expiry: datetime.datetime | None = None,
         verify_connection: bool = True,
+        serde_executor: SerdeExecutor | None = None,
     ):
         self.config = config
         self.kafka_timeout = kafka_timeout
         self.serializer = serializer
+        self.serde_executor = serde_executor
         self._cluster_metadata: _ClusterMetadata = self._empty_cluster_metadata_cache()
         self._cluster_metadata_complete = False
         # birth of all the metadata (when the request was requiring all the metadata available in the cluster)
@@ -477,7 +490,9 @@ class UserRestProxy:
         self.admin_lock = asyncio.Lock()
         self.metadata_cache = None
         self.topic_schema_cache = TopicSchemaCache()
-        self.consumer_manager = ConsumerManager(config=config, deserializer=self.serializer)
+        self.consumer_manager = ConsumerManager(
+            config=config, deserializer=self.serializer, serde_executor=self.serde_executor
+        )
         self.init_admin_client(verify_connection)
         self._last_used = time.monotonic()
         self._auth_expiry = auth_expiry
@@ -1035,15 +1050,20 @@ class UserRestProxy:
         value_schema_id: int | None,
         default_partition: int | None = None,
     ) -> list[tuple]:
-        prepared_records = []
-        for record in data["records"]:
-            key = record.get("key")
-            value = record.get("value")
-            if key is not None:
-                key = await self.serialize(content_type, key, ser_format, key_schema_id)
-            value = await self.serialize(content_type, value, ser_format, value_schema_id)
-            prepared_records.append((key, value, record.get("partition", default_partition)))
-        return prepared_records
+        records = data["records"]
+        keys = [record.get("key") for record in records]
+        key_indexes = [idx for idx, key in enumerate(keys) if key is not None]
+        serialized_keys = await self.serialize_many(
+            content_type, [keys[idx] for idx in key_indexes], ser_format, key_schema_id
+        )
+        for idx, serialized_key in zip(key_indexes, serialized_keys):
+            keys[idx] = serialized_key
+        values = await self.serialize_many(
+            content_type, [record.get("value") for record in records], ser_format, value_schema_id
+        )
+        return [
+            (key, value, record.get("partition", default_partition)) for key, value, record in zip(keys, values, records)
+        ]
 
     async def get_partition_info(self, topic: str, partition: str, content_type: str) -> dict:
         partition = self.validate_partition_id(partition, content_type)
@@ -1110,10 +1130,29 @@ class UserRestProxy:
             return await self.schema_serialize(obj, schema_id)
         raise FormatError(f"Unknown format: {ser_format}")
 
+    async def serialize_many(
+        self,
+        content_type: str,
+        objs: list,
+        ser_format: str | None = None,
+        schema_id: int | None = None,
+    ) -> list[bytes]:
+        if ser_format not in {"avro", "jsonschema", "protobuf"}:
+            return [await self.serialize(content_type, obj, ser_format, schema_id) for obj in objs]
+        result = [b""] * len(objs)
+        indexes = [idx for idx, obj in enumerate(objs) if obj]
+        if indexes:
+            serialized = await self.schema_serialize_many([objs[idx] for idx in indexes], schema_id)
+            for idx, bytes_ in zip(indexes, serialized):
+                result[idx] = bytes_
+        return result
+
     async def schema_serialize(self, obj: dict, schema_id: int | None) -> bytes:
+        return (await self.schema_serialize_many([obj], schema_id))[0]
+
+    async def schema_serialize_many(self, objs: list[dict], schema_id: int | None) -> list[bytes]:
         schema, _ = await self.serializer.get_schema_for_id(schema_id)
-        bytes_ = await self.serializer.serialize(schema, obj)
-        return bytes_
+        return await self.serializer.serialize_many(schema, objs, executor=self.serde_executor)
 
     async def validate_publish_request_format(self, data: dict, formats: dict, content_type: str, topic: str):
         # this method will do in place updates for binary embedded formats, because the validation itself
@@ -20,7 +20,13 @@ from karapace.core.config import Config
 from karapace.core.kafka.common import translate_from_kafkaerror
 from karapace.core.kafka.consumer import AsyncKafkaConsumer
 from karapace.core.kafka.types import DEFAULT_REQUEST_TIMEOUT_MS, Timestamp
-from karapace.core.serialization import DeserializationError, InvalidMessageHeader, InvalidPayload, SchemaRegistrySerializer
+from karapace.core.serialization import (
+    DeserializationError,
+    InvalidMessageHeader,
+    InvalidPayload,
+    SchemaRegistrySerializer,
+    SerdeExecutor,
+)
 from karapace.core.utils import json_decode, JSONDecodeError
 from karapace.kafka_rest_apis.convert_to_int import convert_to_int
 from karapace.kafka_rest_apis.authentication import get_kafka_client_auth_parameters_from_config
@@ -47,10 +53,16 @@ def new_name() -> str:
 
 
 class ConsumerManager:
-    def __init__(self, config: Config, deserializer: SchemaRegistrySerializer) -> None:
+    def __init__(
+        self,
+        config: Config,
+        deserializer: SchemaRegistrySerializer,
+        serde_executor: SerdeExecutor | None = None,
+    ) -> None:
         self.config = config
         self.base_uri = self.config.rest_base_uri
         self.deserializer = deserializer
+        self.serde_executor = serde_executor
         self.consumers = {}
         self.consumer_locks = defaultdict(Lock)
 
@@ -548,23 +560,23 @@ class ConsumerManager:
                 time.monotonic() - start_time,
             )
             response = []
-            for msg in poll_data:
-                try:
-                    key = await self.deserialize(msg.key(), request_format) if msg.key() else None
-                except DeserializationError as e:
-                    KarapaceBase.unprocessable_entity(
-                        message=f"key deserialization error for format {request_format}: {e}",
-                        sub_code=RESTErrorCodes.HTTP_UNPROCESSABLE_ENTITY.value,
-                        content_type=content_type,
-                    )
-                try:
-                    value = await self.deserialize(msg.value(), request_format) if msg.value() else None
-                except DeserializationError as e:
-                    KarapaceBase.unprocessable_entity(
-                        message=f"value deserialization error for format {request_format}: {e}",
-                        sub_code=RESTErrorCodes.HTTP_UNPROCESSABLE_ENTITY.value,
-                        content_type=content_type,
-                    )
+            try:
+                keys = await self.deserialize_many([msg.key() for msg in poll_data], request_format)
+            except DeserializationError as e:
+                KarapaceBase.unprocessable_entity(
+                    message=f"key deserialization error for format {request_format}: {e}",
+                    sub_code=RESTErrorCodes.HTTP_UNPROCESSABLE_ENTITY.value,
+                    content_type=content_type,
+                )
+            try:
+                values = await self.deserialize_many([msg.value() for msg in poll_data], request_format)
+            except DeserializationError as e:
+                KarapaceBase.unprocessable_entity(
+                    message=f"value deserialization error for format {request_format}: {e}",
+                    sub_code=RESTErrorCodes.HTTP_UNPROCESSABLE_ENTITY.value,
+                    content_type=content_type,
+                )
+            for msg, key, value in zip(poll_data, keys, values):
                 element = {
                     "topic": msg.topic(),
                     "partition": msg.partition(),
@@ -582,6 +594,22 @@ class ConsumerManager:
 
             KarapaceBase.r(content_type=content_type, body=response)
 
+    async def deserialize_many(self, bytes_list: list[bytes | None], fmt: str) -> list:
+        if fmt not in {"avro", "jsonschema", "protobuf"}:
+            return [await self.deserialize(bytes_, fmt) for bytes_ in bytes_list]
+        result: list = [None] * len(bytes_list)
+        indexes = [idx for idx, bytes_ in enumerate(bytes_list) if bytes_]
+        if indexes:
+            try:
+                values = await self.deserializer.deserialize_many(
+                    [bytes_list[idx] for idx in indexes], executor=self.serde_executor
+                )
+            except (UnpackError, InvalidMessageHeader, InvalidPayload, JSONDecodeError, UnicodeDecodeError) as e:
+                raise DeserializationError(e) from e
+            for idx, value in zip(indexes, values):
+                result[idx] = value
+        return result
+
     async def deserialize(self, bytes_: bytes, fmt: str):
         try:
             if not bytes_:
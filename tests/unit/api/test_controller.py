@@ -4,18 +4,25 @@ See LICENSE for details
 """
 
 from fastapi.exceptions import HTTPException
+from fastapi.responses import StreamingResponse
 
 from karapace.api.container import SchemaRegistryContainer
-from karapace.core.schema_models import SchemaType, ValidatedTypedSchema
+from karapace.api.controller import KarapaceSchemaRegistryController
+from karapace.api.routers.requests import SchemaRequest
+from karapace.core.auth import ACLAuthorizer, ACLEntry, HashAlgorithm, Operation, User
+from karapace.core.in_memory_database import InMemoryDatabase
+from karapace.core.schema_models import ParsedTypedSchema, SchemaType, SchemaVersion, ValidatedTypedSchema
 from karapace.core.schema_reader import KafkaSchemaReader
 from karapace.core.schema_registry import KarapaceSchemaRegistry
-from karapace.core.typing import PrimaryInfo
+from karapace.core.typing import PrimaryInfo, SchemaId, Subject, Version
 from karapace.rapu import HTTPResponse
+from typing import Any
 from unittest.mock import Mock, PropertyMock, patch
 
 import asyncio
 import json
 import pytest
+import re
 
 
 TYPED_AVRO_SCHEMA = ValidatedTypedSchema.parse(
@@ -87,3 +94,175 @@ async def test_forward_when_not_ready(schema_registry_container: SchemaRegistryC
             # prevent `future exception was never retrieved` warning logs
             # future: <Future finished exception=HTTPResponse(status=200 body={'mock': 'response'})>
             await mock_forward_func_future
+
+
+def _authorizer_for_subjects(*resources: str) -> tuple[User, ACLAuthorizer]:
+    user = User(username="user", algorithm=HashAlgorithm.SHA256, salt="salt", password_hash="")
+    permissions = [ACLEntry("user", Operation.Read, re.compile(resource)) for resource in resources]
+    return user, ACLAuthorizer(user_db={"user": user}, permissions=permissions)
+
+
+def _listing_controller(
+    schema_registry_container: SchemaRegistryContainer, subjects: tuple[str, ...]
+) -> KarapaceSchemaRegistryController:
+    controller = schema_registry_container.schema_registry_controller()
+    database = InMemoryDatabase()
+    controller.schema_registry = Mock(spec=KarapaceSchemaRegistry)
+    controller.schema_registry.database = database
+
+    async def schemas_list(**kwargs) -> list[SchemaVersion]:
+        return database.scan_schemas(**kwargs)
+
+    controller.schema_registry.schemas_list = schemas_list
+    controller.schema_registry.get_subject_versions_for_schema = lambda schema_id, include_deleted: (
+        KarapaceSchemaRegistry.get_subject_versions_for_schema(
+            controller.schema_registry, schema_id, include_deleted=include_deleted
+        )
+    )
+    for subject in subjects:
+        for version in (1, 2):
+            database.insert_schema_version(
+                subject=Subject(subject),
+                schema_id=SchemaId(1),
+                version=Version(version),
+                deleted=False,
+                schema=TYPED_AVRO_SCHEMA,
+                references=None,
+            )
+    return controller
+
+
+async def test_listings_are_paged(schema_registry_container: SchemaRegistryContainer) -> None:
+    controller = _listing_controller(schema_registry_container, ("b", "a", "c", "ab"))
+    user, authorizer = _authorizer_for_subjects("Subject:a.*", "Subject:c")
+
+    with patch("karapace.api.controller.LISTING_SCAN_PAGE_SIZE", 3):
+        subjects = await controller.subjects_list(deleted=False, user=None, authorizer=None)
+        assert subjects == ["a", "ab", "b", "c"]
+        subjects = await controller.subjects_list(deleted=False, user=user, offset=1, limit=2, authorizer=authorizer)
+        assert subjects == ["ab", "c"]
+        subjects = await controller.subjects_list(deleted=False, user=None, subject_prefix="a", authorizer=None)
+        assert subjects == ["a", "ab"]
+
+        schemas = await controller.schemas_list(deleted=False, latest_only=False, user=user, authorizer=authorizer)
+        assert [(schema.subject, schema.version) for schema in schemas] == [
+            ("a", 1),
+            ("a", 2),
+            ("ab", 1),
+            ("ab", 2),
+            ("c", 1),
+            ("c", 2),
+        ]
+        schemas = await controller.schemas_list(
+            deleted=False, latest_only=False, offset=3, limit=2, user=user, authorizer=authorizer
+        )
+        assert [(schema.subject, schema.version) for schema in schemas] == [("ab", 2), ("c", 1)]
+        schemas = await controller.schemas_list(
+            deleted=False, latest_only=True, subject_prefix="a", user=None, authorizer=None
+        )
+        assert [(schema.subject, schema.version) for schema in schemas] == [("a", 2), ("ab", 2)]
+
+
+async def test_schemas_list_selects_deleted_and_latest_versions(
+    schema_registry_container: SchemaRegistryContainer,
+) -> None:
+    controller = _listing_controller(schema_registry_container, ("a", "b"))
+    controller.schema_registry.database.delete_subject_schema(subject=Subject("a"), version=Version(2))
+    controller.schema_registry.database.insert_schema_version(
+        subject=Subject("a"),
+        schema_id=SchemaId(1),
+        version=Version(2),
+        deleted=True,
+        schema=TYPED_AVRO_SCHEMA,
+        references=None,
+    )
+
+    expected = {
+        (False, False): [("a", 1), ("b", 1), ("b", 2)],
+        (True, False): [("a", 1), ("a", 2), ("b", 1), ("b", 2)],
+        # The latest of the listed versions, a soft deleted latest version is skipped
+        (False, True): [("a", 1), ("b", 2)],
+        (True, True): [("a", 2), ("b", 2)],
+    }
+    for (deleted, latest_only), expected_versions in expected.items():
+        schemas = await controller.schemas_list(deleted=deleted, latest_only=latest_only, user=None, authorizer=None)
+        assert [(schema.subject, schema.version) for schema in schemas] == expected_versions, (deleted, latest_only)
+
+
+async def test_listings_are_streamed(schema_registry_container: SchemaRegistryContainer) -> None:
+    controller = _listing_controller(schema_registry_container, ("b", "a"))
+    controller.config = controller.config.set_config_defaults(new_config={"streaming_listings": True})
+    user, authorizer = _authorizer_for_subjects("Subject:a.*", "Subject:c")
+
+    async def read_json(response: StreamingResponse) -> Any:
+        return json.loads("".join([chunk async for chunk in response.body_iterator]))
+
+    response = await controller.subjects_list(deleted=False, user=user, authorizer=authorizer)
+    assert await read_json(response) == ["a"]
+    response = await controller.subjects_list(deleted=False, user=None, subject_prefix="c", authorizer=None)
+    assert await read_json(response) == []
+
+    response = await controller.schemas_list(deleted=False, latest_only=True, user=None, authorizer=None)
+    assert await read_json(response) == [
+        {
+            "subject": subject,
+            "schema": TYPED_AVRO_SCHEMA.schema_str,
+            "version": 2,
+            "id": 1,
+            "schemaType": "AVRO",
+            "references": None,
+        }
+        for subject in ("a", "b")
+    ]
+
+    # The versions of a schema are not streamed
+    versions = await controller.schemas_get_versions(schema_id="1", deleted=False, user=user, authorizer=authorizer)
+    assert [(version.subject, version.version) for version in versions] == [("a", 1), ("a", 2)]
+
+
+async def test_subjects_schema_post_matches_by_fingerprint(schema_registry_container: SchemaRegistryContainer) -> None:
+    controller = _listing_controller(schema_registry_container, ())
+    controller.schema_registry.resolve_references = lambda references: (None, None)
+    controller.schema_registry.subject_get = lambda subject, include_deleted: KarapaceSchemaRegistry.subject_get(
+        controller.schema_registry, subject, include_deleted
+    )
+    other_schema = ValidatedTypedSchema.parse(SchemaType.AVRO, json.dumps({"type": "string", "name": "Other"}))
+    for version, schema_id, schema in ((1, 1, TYPED_AVRO_SCHEMA), (2, 2, other_schema)):
+        controller.schema_registry.database.insert_schema_version(
+            subject=Subject("subject"),
+            schema_id=SchemaId(schema_id),
+            version=Version(version),
+            deleted=False,
+            schema=schema,
+            references=None,
+        )
+
+    with patch.object(ParsedTypedSchema, "parse", wraps=ParsedTypedSchema.parse) as parse:
+        # The latest version matches, only the posted schema is parsed
+        response = await controller.subjects_schema_post(
+            subject=Subject("subject"),
+            schema_request=SchemaRequest(schema=json.dumps({"type": "string", "name": "Other"})),
+            deleted=False,
+            normalize=False,
+        )
+        assert (response.version, response.schema_id) == (2, 2)
+        assert parse.call_count == 1
+
+        # The newer versions are matched by parsing them
+        response = await controller.subjects_schema_post(
+            subject=Subject("subject"),
+            schema_request=SchemaRequest(schema=TYPED_AVRO_SCHEMA.schema_str),
+            deleted=False,
+            normalize=False,
+        )
+        assert (response.version, response.schema_id, response.schema_str) == (1, 1, TYPED_AVRO_SCHEMA.schema_str)
+        assert parse.call_count == 3
+
+        # A semantically equal schema is matched by parsing the versions
+        response = await controller.subjects_schema_post(
+            subject=Subject("subject"),
+            schema_request=SchemaRequest(schema='"string"'),
+            deleted=False,
+            normalize=False,
+        )
+        assert (response.version, response.schema_id) == (2, 2)
@@ -4,12 +4,14 @@ See LICENSE for details
 """
 
 import json
+from unittest.mock import call, Mock, patch
 
 from avro.compatibility import SchemaCompatibilityType
 
 from karapace.core.compatibility import CompatibilityModes
-from karapace.core.compatibility.schema_compatibility import SchemaCompatibility
+from karapace.core.compatibility.schema_compatibility import CompatibilityVerdictCache, SchemaCompatibility
 from karapace.core.schema_models import SchemaType, ValidatedTypedSchema
+from karapace.core.stats import StatsClient
 
 
 def test_schema_type_can_change_when_mode_none() -> None:
@@ -46,3 +48,43 @@ def test_schema_incompatible_in_transitive_mode() -> None:
         old_schema=old_schema, new_schema=new_schema, compatibility_mode=CompatibilityModes.FULL_TRANSITIVE
     )
     assert result.compatibility is SchemaCompatibilityType.incompatible
+
+
+def test_compatibility_verdict_cache() -> None:
+    stats = Mock(spec=StatsClient)
+    cache = CompatibilityVerdictCache(max_size=2, stats=stats)
+    old_schema = ValidatedTypedSchema.parse(SchemaType.JSONSCHEMA, '{"type": "array"}')
+    new_schema = ValidatedTypedSchema.parse(SchemaType.JSONSCHEMA, '{"type": "integer"}')
+    # Same content, different instance
+    new_schema_copy = ValidatedTypedSchema.parse(SchemaType.JSONSCHEMA, '{"type": "integer"}')
+
+    with patch.object(SchemaCompatibility, "check_compatibility", wraps=SchemaCompatibility.check_compatibility) as check:
+        first = cache.check_compatibility(old_schema, new_schema, CompatibilityModes.BACKWARD)
+        first.messages.add("modified by the caller")
+        second = cache.check_compatibility(old_schema, new_schema_copy, CompatibilityModes.BACKWARD)
+        assert check.call_count == 1
+        assert second.compatibility is SchemaCompatibilityType.incompatible
+        assert "modified by the caller" not in second.messages
+
+        # The compatibility mode is part of the key
+        cache.check_compatibility(old_schema, new_schema, CompatibilityModes.FORWARD)
+        assert check.call_count == 2
+        # Mode NONE is not cached
+        cache.check_compatibility(old_schema, new_schema, CompatibilityModes.NONE)
+        cache.check_compatibility(old_schema, new_schema, CompatibilityModes.NONE)
+        assert check.call_count == 4
+        assert len(cache) == 2
+
+        # The least recently used result is evicted
+        cache.check_compatibility(new_schema, old_schema, CompatibilityModes.BACKWARD)
+        cache.check_compatibility(old_schema, new_schema, CompatibilityModes.BACKWARD)
+        assert check.call_count == 6
+        assert len(cache) == 2
+
+    assert stats.compatibility_verdict_cache_lookup.call_args_list == [
+        call(hit=False),
+        call(hit=True),
+        call(hit=False),
+        call(hit=False),
+        call(hit=False),
+    ]
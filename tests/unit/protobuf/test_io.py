@@ -3,10 +3,17 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 
+import queue
 import textwrap
+from pathlib import Path
 
+import pytest
+
+from karapace.core.config import Config
 from karapace.core.dependency import Dependency
-from karapace.core.protobuf.io import crawl_dependencies
+from karapace.core.protobuf import io
+from karapace.core.protobuf.exception import ProtobufTypeException
+from karapace.core.protobuf.io import crawl_dependencies, ProtobufWorkerPool
 from karapace.core.protobuf.schema import ProtobufSchema
 from karapace.core.schema_models import ValidatedTypedSchema
 from karapace.core.schema_type import SchemaType
@@ -71,3 +78,90 @@ def test_crawl_dependencies() -> None:
             "unique_class_name": "c_df098b6b018617c2b8eb95156535dec6",
         },
     }
+
+
+def test_worker_pool_reuses_worker_per_schema(tmp_path: Path) -> None:
+    config = Config(protobuf_runtime_directory=str(tmp_path))
+    schema_a = ValidatedTypedSchema.parse(
+        schema_type=SchemaType.PROTOBUF,
+        schema_str=textwrap.dedent(
+            """\
+            syntax = "proto3";
+            message A {
+              string foo = 1;
+              Kind kind = 2;
+            }
+            enum Kind {
+              FIRST = 0;
+              SECOND = 1;
+            }
+            """
+        ),
+    ).schema
+    # Same enum value names in another schema, requires a separate descriptor pool.
+    schema_b = ValidatedTypedSchema.parse(
+        schema_type=SchemaType.PROTOBUF,
+        schema_str=textwrap.dedent(
+            """\
+            syntax = "proto3";
+            message B {
+              Other other = 1;
+            }
+            enum Other {
+              FIRST = 0;
+              SECOND = 1;
+            }
+            """
+        ),
+    ).schema
+    assert isinstance(schema_a, ProtobufSchema)
+    assert isinstance(schema_b, ProtobufSchema)
+
+    pool = ProtobufWorkerPool(config, max_workers=1)
+    try:
+        datums = [{"foo": "hello", "kind": "SECOND"}, {"foo": "world", "kind": "FIRST"}]
+        encoded = pool.write_many(schema_a, "A", datums)
+        assert len(pool) == 1
+        assert pool.read_many(schema_a, ["A", "A"], encoded) == datums
+        assert len(pool) == 1
+
+        encoded_b = pool.write_many(schema_b, "B", [{"other": "SECOND"}])
+        assert pool.read_many(schema_b, ["B"], encoded_b) == [{"other": "SECOND"}]
+        # Least recently used worker was evicted
+        assert len(pool) == 1
+
+        with pytest.raises(ProtobufTypeException):
+            pool.write_many(schema_a, "A", [{"foo": 1}])
+    finally:
+        pool.close()
+
+
+def test_worker_pool_terminates_timed_out_worker(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    config = Config(protobuf_runtime_directory=str(tmp_path))
+    schema = ValidatedTypedSchema.parse(
+        schema_type=SchemaType.PROTOBUF,
+        schema_str=textwrap.dedent(
+            """\
+            syntax = "proto3";
+            message A {
+              string foo = 1;
+            }
+            """
+        ),
+    ).schema
+    assert isinstance(schema, ProtobufSchema)
+
+    pool = ProtobufWorkerPool(config, max_workers=1)
+    try:
+        # The worker cannot compile the schema in time
+        monkeypatch.setattr(io, "PROTOBUF_WORKER_RESPONSE_TIMEOUT_SECONDS", 0.001)
+        with pytest.raises(queue.Empty):
+            pool.write_many(schema, "A", [{"foo": "first"}])
+        assert len(pool) == 0
+
+        # The late response of the timed out request is not returned to the next one
+        monkeypatch.undo()
+        encoded = pool.write_many(schema, "A", [{"foo": "second"}, {"foo": "third"}])
+        assert pool.read_many(schema, ["A", "A"], encoded) == [{"foo": "second"}, {"foo": "third"}]
+    finally:
+        pool.close()
@@ -3,9 +3,24 @@ Copyright (c) 2024 Aiven Ltd
 See LICENSE for details
 """
 
+import json
 import re
+from pathlib import Path
+from unittest.mock import Mock
 
-from karapace.core.auth import ACLAuthorizer, ACLEntry, HashAlgorithm, Operation, User, hash_password
+import pytest
+
+from karapace.core.auth import (
+    ACLAuthorizer,
+    ACLEntry,
+    HashAlgorithm,
+    HTTPAuthorizer,
+    Operation,
+    User,
+    compile_subject_authorization_plan,
+    hash_password,
+)
+from karapace.core.stats import StatsClient
 
 
 def test_empty_acl_authorizer() -> None:
@@ -223,3 +238,102 @@ def test_acl_authorizer() -> None:
             "Subject:readwrite_subject",
         ],
     )
+
+
+@pytest.mark.parametrize(
+    "resources, expected_prefixes",
+    [
+        (["Subject:.*"], None),
+        ([".*"], None),
+        (["Subject:*"], None),
+        (["Subject:(a|b)"], None),
+        (["Config:.*"], []),
+        (["Subject:team_a\\..*", "Subject:team_b", "Config:.*"], ["team_a.", "team_b"]),
+        (["Subject:team_a.*", "Subject:team_ab.*"], ["team_a"]),
+        (["Subject:team_x+"], ["team_"]),
+        (["Subject:team_[ab].*"], ["team_"]),
+    ],
+)
+def test_subject_authorization_plan_matches_the_acl(resources: list[str], expected_prefixes: list[str] | None) -> None:
+    user = User(username="user", algorithm=HashAlgorithm.SHA256, salt="salt", password_hash="")
+    authorizer = ACLAuthorizer(
+        user_db={"user": user},
+        permissions=[ACLEntry("user", Operation.Read, re.compile(resource)) for resource in resources]
+        + [ACLEntry("other", Operation.Read, re.compile(".*"))],
+    )
+    plan = authorizer.subject_authorization_plan(user, Operation.Read)
+
+    subjects = ["a", "b", "team", "team_a", "team_a.x", "team_ab", "team_b", "team_bb", "team_xx", "team_c", "zzz"]
+    for subject in subjects:
+        assert plan.allows(subject) is authorizer.check_authorization(user, Operation.Read, f"Subject:{subject}")
+    assert plan.scan_prefixes() == ([""] if expected_prefixes is None else expected_prefixes)
+    # Every allowed subject is in a scanned range
+    scan_prefixes = plan.scan_prefixes()
+    for subject in subjects:
+        if plan.allows(subject):
+            assert subject.startswith(tuple(scan_prefixes))
+
+    assert authorizer.subject_authorization_plan(None, Operation.Read).scan_prefixes() == []
+    assert authorizer.subject_authorization_plan(user, Operation.Write).scan_prefixes() == []
+
+
+def test_subject_authorization_plan_scan_prefixes_with_a_subject_prefix() -> None:
+    plan = compile_subject_authorization_plan(
+        ACLEntry("user", Operation.Read, re.compile(resource)) for resource in ["Subject:a.*", "Subject:bc.*", "Subject:bd"]
+    )
+    assert plan.scan_prefixes("b") == ["bc", "bd"]
+    assert plan.scan_prefixes("bcd") == ["bcd"]
+    assert plan.scan_prefixes("c") == []
+
+
+def test_subject_authorization_plan_follows_permission_reloads() -> None:
+    user = User(username="user", algorithm=HashAlgorithm.SHA256, salt="salt", password_hash="")
+    authorizer = ACLAuthorizer(
+        user_db={"user": user}, permissions=[ACLEntry("user", Operation.Read, re.compile("Subject:a"))]
+    )
+    assert not authorizer.subject_authorization_plan(user, Operation.Read).allows("b")
+    authorizer.permissions = [ACLEntry("user", Operation.Read, re.compile("Subject:b"))]
+    assert authorizer.subject_authorization_plan(user, Operation.Read).allows("b")
+
+
+def _write_authfile(path: Path, resource: str) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "users": [{"username": "user", "algorithm": "sha256", "salt": "salt", "password_hash": ""}],
+                "permissions": [{"username": "user", "operation": "Read", "resource": resource}],
+            }
+        )
+    )
+
+
+def test_http_authorizer_caches_decisions_until_reload(tmp_path: Path) -> None:
+    authfile = tmp_path / "authfile.json"
+    _write_authfile(authfile, "Subject:a")
+    authorizer = HTTPAuthorizer(auth_file=str(authfile), decision_cache_size=2)
+    stats = Mock(spec=StatsClient)
+    authorizer._stats = stats
+    authorizer._load_authfile()
+    user = authorizer.get_user("user")
+
+    assert authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert not authorizer.check_authorization(user, Operation.Read, "Subject:b")
+    assert not authorizer.check_authorization(user, Operation.Write, "Subject:a")
+    assert [call.kwargs["hit"] for call in stats.authorization_decision_cache_lookup.call_args_list] == [
+        False,
+        True,
+        False,
+        False,
+    ]
+    # The least recently used decision is evicted
+    assert len(authorizer._decision_cache) == 2
+    assert authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert stats.authorization_decision_cache_lookup.call_args.kwargs["hit"] is False
+
+    _write_authfile(authfile, "Subject:b")
+    authorizer._load_authfile()
+    user = authorizer.get_user("user")
+    assert not authorizer.check_authorization(user, Operation.Read, "Subject:a")
+    assert authorizer.check_authorization(user, Operation.Read, "Subject:b")
+    assert authorizer.check_authorization_any(user, Operation.Read, ["Subject:a", "Subject:b"])
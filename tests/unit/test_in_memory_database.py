@@ -17,7 +17,13 @@ from confluent_kafka.cimpl import KafkaError
 
 from karapace.core.constants import DEFAULT_SCHEMA_TOPIC
 from karapace.core.container import KarapaceContainer
-from karapace.core.in_memory_database import InMemoryDatabase, KarapaceDatabase, Subject, SubjectData
+from karapace.core.in_memory_database import (
+    CompactInMemoryDatabase,
+    InMemoryDatabase,
+    KarapaceDatabase,
+    Subject,
+    SubjectData,
+)
 from karapace.core.kafka.types import Timestamp
 from karapace.core.key_format import KeyFormatter
 from karapace.core.offset_watcher import OffsetWatcher
@@ -166,6 +172,48 @@ class WrappedInMemoryDatabase(KarapaceDatabase):
     def find_subject_schemas(self, *, subject: Subject, include_deleted: bool) -> dict[Version, SchemaVersion]:
         return self.db.find_subject_schemas(subject=subject, include_deleted=include_deleted)
 
+    def scan_subjects(
+        self,
+        *,
+        include_deleted: bool,
+        subject_prefix: str = "",
+        start_after: Subject | None = None,
+        limit: int | None = None,
+    ) -> list[Subject]:
+        return self.db.scan_subjects(
+            include_deleted=include_deleted, subject_prefix=subject_prefix, start_after=start_after, limit=limit
+        )
+
+    def scan_schemas(
+        self,
+        *,
+        include_deleted: bool,
+        latest_only: bool,
+        subject_prefix: str = "",
+        start_after: tuple[Subject, Version] | None = None,
+        limit: int | None = None,
+    ) -> list[SchemaVersion]:
+        return self.db.scan_schemas(
+            include_deleted=include_deleted,
+            latest_only=latest_only,
+            subject_prefix=subject_prefix,
+            start_after=start_after,
+            limit=limit,
+        )
+
+    def find_subject_schemas_by_fingerprint(
+        self, *, subject: Subject, fingerprint: str, include_deleted: bool
+    ) -> list[SchemaVersion]:
+        return self.db.find_subject_schemas_by_fingerprint(
+            subject=subject, fingerprint=fingerprint, include_deleted=include_deleted
+        )
+
+    def revision(self) -> int:
+        return self.db.revision()
+
+    def subject_revision(self, *, subject: Subject) -> int:
+        return self.db.subject_revision(subject=subject)
+
     def delete_subject(self, *, subject: Subject, version: Version) -> None:
         return self.db.delete_subject(subject=subject, version=version)
 
@@ -265,9 +313,9 @@ def test_can_ingest_schemas_from_log(karapace_container: KarapaceContainer) -> N
     assert duplicates == {}, "the schema database is broken. The id should be unique"
 
 
-@pytest.fixture(name="db_with_schemas")
-def fixture_in_memory_database_with_schemas() -> InMemoryDatabase:
-    db = InMemoryDatabase()
+@pytest.fixture(name="db_with_schemas", params=[InMemoryDatabase, CompactInMemoryDatabase])
+def fixture_in_memory_database_with_schemas(request: pytest.FixtureRequest) -> InMemoryDatabase:
+    db = request.param()
     schema_str = "syntax = 'proto3'; message Test { string test = 1; }"
 
     subject_a = Subject("subject_a")
@@ -337,3 +385,238 @@ def test_delete_subject(db_with_schemas: InMemoryDatabase) -> None:
     # Check that the schema is no longer referenced by subject_b
     referents = db_with_schemas.get_referenced_by(subject=Subject("subject_a"), version=Version(1))
     assert len(referents) == 0, "referents should be gone after hard deleting the subject"
+
+
+class TestGetSchemaId:
+    @staticmethod
+    def _avro_schema(name: str) -> TypedSchema:
+        return TypedSchema(
+            schema_type=SchemaType.AVRO,
+            schema_str=f'{{"type": "record", "name": "{name}", "fields": []}}',
+        )
+
+    def test_reuses_schema_id_of_equal_schema(self) -> None:
+        database = InMemoryDatabase()
+        schema = self._avro_schema("a")
+        schema_id = database.get_schema_id(schema)
+        database.insert_schema_version(
+            subject=Subject("a"), schema_id=schema_id, version=Version(1), deleted=False, schema=schema, references=None
+        )
+
+        assert database.get_schema_id(self._avro_schema("a")) == schema_id
+        assert database.get_schema_id(self._avro_schema("b")) == SchemaId(schema_id + 1)
+
+    def test_schema_id_is_reused_after_deletes(self) -> None:
+        database = InMemoryDatabase()
+        schema = self._avro_schema("a")
+        schema_id = database.get_schema_id(schema)
+        database.insert_schema_version(
+            subject=Subject("a"), schema_id=schema_id, version=Version(1), deleted=False, schema=schema, references=None
+        )
+        database.delete_subject(subject=Subject("a"), version=Version(1))
+        assert database.get_schema_id(self._avro_schema("a")) == schema_id
+
+        database.delete_subject_schema(subject=Subject("a"), version=Version(1))
+        database.delete_subject_hard(subject=Subject("a"))
+        assert database.get_schema_id(self._avro_schema("a")) == schema_id
+
+    def test_overwritten_schema_id_is_not_reused(self) -> None:
+        database = InMemoryDatabase()
+        schema_a = self._avro_schema("a")
+        schema_b = self._avro_schema("b")
+        database.insert_schema_version(
+            subject=Subject("a"), schema_id=SchemaId(1), version=Version(1), deleted=False, schema=schema_a, references=None
+        )
+        database.insert_schema_version(
+            subject=Subject("b"), schema_id=SchemaId(1), version=Version(1), deleted=False, schema=schema_b, references=None
+        )
+
+        assert database.get_schema_id(self._avro_schema("b")) == SchemaId(1)
+        assert database.get_schema_id(self._avro_schema("a")) == SchemaId(2)
+
+
+def test_find_schema_versions_by_schema_id_follows_deletes(db_with_schemas: InMemoryDatabase) -> None:
+    subject_a = Subject("subject_a")
+    schema_id_a = db_with_schemas.find_subject_schemas(subject=subject_a, include_deleted=False)[Version(1)].schema_id
+
+    versions = db_with_schemas.find_schema_versions_by_schema_id(schema_id=schema_id_a, include_deleted=False)
+    assert [(v.subject, v.version) for v in versions] == [(subject_a, Version(1)), (subject_a, Version(2))]
+    assert db_with_schemas.subjects_for_schema(schema_id_a) == [subject_a]
+
+    db_with_schemas.delete_subject(subject=subject_a, version=Version(1))
+    versions = db_with_schemas.find_schema_versions_by_schema_id(schema_id=schema_id_a, include_deleted=False)
+    assert [(v.subject, v.version) for v in versions] == [(subject_a, Version(2))]
+    versions = db_with_schemas.find_schema_versions_by_schema_id(schema_id=schema_id_a, include_deleted=True)
+    assert [(v.subject, v.version) for v in versions] == [(subject_a, Version(1)), (subject_a, Version(2))]
+
+    db_with_schemas.delete_subject(subject=subject_a, version=Version(2))
+    assert db_with_schemas.subjects_for_schema(schema_id_a) == []
+
+    db_with_schemas.delete_subject_schema(subject=subject_a, version=Version(1))
+    versions = db_with_schemas.find_schema_versions_by_schema_id(schema_id=schema_id_a, include_deleted=True)
+    assert [(v.subject, v.version) for v in versions] == [(subject_a, Version(2))]
+
+    db_with_schemas.delete_subject_hard(subject=subject_a)
+    assert db_with_schemas.find_schema_versions_by_schema_id(schema_id=schema_id_a, include_deleted=True) == []
+
+
+def test_num_schema_versions_follows_mutations(db_with_schemas: InMemoryDatabase) -> None:
+    def count_versions() -> tuple[int, int]:
+        all_versions = [
+            schema_version
+            for subject in db_with_schemas.find_subjects(include_deleted=True)
+            for schema_version in db_with_schemas.find_subject_schemas(subject=subject, include_deleted=True).values()
+        ]
+        live_versions = sum(1 for schema_version in all_versions if not schema_version.deleted)
+        return live_versions, len(all_versions) - live_versions
+
+    subject_a = Subject("subject_a")
+    assert db_with_schemas.num_schema_versions() == count_versions() == (3, 0)
+
+    db_with_schemas.delete_subject(subject=subject_a, version=Version(1))
+    assert db_with_schemas.num_schema_versions() == count_versions() == (2, 1)
+
+    # Soft deleting again does not count twice
+    db_with_schemas.delete_subject(subject=subject_a, version=Version(2))
+    assert db_with_schemas.num_schema_versions() == count_versions() == (1, 2)
+
+    # Overwriting a version replaces its count
+    schema_version = db_with_schemas.find_subject_schemas(subject=subject_a, include_deleted=True)[Version(2)]
+    db_with_schemas.insert_schema_version(
+        subject=subject_a,
+        schema_id=schema_version.schema_id,
+        version=Version(2),
+        deleted=False,
+        schema=schema_version.schema,
+        references=None,
+    )
+    assert db_with_schemas.num_schema_versions() == count_versions() == (2, 1)
+
+    db_with_schemas.delete_subject_schema(subject=subject_a, version=Version(1))
+    assert db_with_schemas.num_schema_versions() == count_versions() == (2, 0)
+
+    db_with_schemas.delete_subject_hard(subject=Subject("subject_b"))
+    assert db_with_schemas.num_schema_versions() == count_versions() == (1, 0)
+    assert db_with_schemas.num_subjects() == 1
+
+
+def test_compact_database_shares_repeated_version_data() -> None:
+    db = CompactInMemoryDatabase()
+    schema_str = "syntax = 'proto3'; message Test { string test = 1; }"
+    schema = TypedSchema(schema_type=SchemaType.PROTOBUF, schema_str=schema_str, schema=ProtobufSchema(schema=schema_str))
+    schema_id = db.get_schema_id(schema)
+    for subject_name in ("subject_a", "subject_b"):
+        for version in (1, 2):
+            # Decoded records carry fresh copies of the subject, version and references
+            db.insert_schema_version(
+                subject=Subject("".join(subject_name)),
+                schema_id=schema_id,
+                version=Version(version),
+                deleted=False,
+                schema=schema,
+                references=[Reference(name="test", subject=Subject("subject_c"), version=Version(1))],
+            )
+
+    versions_a = db.find_subject_schemas(subject=Subject("subject_a"), include_deleted=False)
+    versions_b = db.find_subject_schemas(subject=Subject("subject_b"), include_deleted=False)
+    assert versions_a[Version(1)].subject is versions_a[Version(2)].subject
+    assert versions_a[Version(1)].version is versions_b[Version(1)].version
+    assert versions_a[Version(1)].references is versions_b[Version(2)].references
+    assert versions_a[Version(2)].references == [Reference(name="test", subject=Subject("subject_c"), version=Version(1))]
+    assert db.get_referenced_by(subject=Subject("subject_c"), version=Version(1)) == {schema_id}
+
+    db.clear()
+    assert db.find_subjects(include_deleted=True) == []
+
+
+def test_scan_subjects_pages_in_name_order(db_with_schemas: InMemoryDatabase) -> None:
+    db_with_schemas.insert_subject(subject=Subject("other"))
+    db_with_schemas.insert_subject(subject=Subject("subject_0"))
+    db_with_schemas.delete_subject(subject=Subject("subject_b"), version=Version(1))
+
+    assert db_with_schemas.scan_subjects(include_deleted=True) == ["other", "subject_0", "subject_a", "subject_b"]
+    assert db_with_schemas.scan_subjects(include_deleted=False) == ["subject_a"]
+    assert db_with_schemas.scan_subjects(include_deleted=True, subject_prefix="subject_", limit=2) == [
+        "subject_0",
+        "subject_a",
+    ]
+    assert db_with_schemas.scan_subjects(
+        include_deleted=True, subject_prefix="subject_", start_after=Subject("subject_a")
+    ) == ["subject_b"]
+
+    # The sorted index follows the inserts and hard deletes after the first scan
+    db_with_schemas.delete_subject_hard(subject=Subject("subject_0"))
+    db_with_schemas.insert_subject(subject=Subject("aaa"))
+    assert db_with_schemas.scan_subjects(include_deleted=True) == ["aaa", "other", "subject_a", "subject_b"]
+
+
+def test_scan_schemas_continues_after_the_last_version(db_with_schemas: InMemoryDatabase) -> None:
+    def keys(schema_versions: list[SchemaVersion]) -> list[tuple[str, int]]:
+        return [(schema_version.subject, schema_version.version.value) for schema_version in schema_versions]
+
+    first_page = db_with_schemas.scan_schemas(include_deleted=False, latest_only=False, limit=2)
+    assert keys(first_page) == [("subject_a", 1), ("subject_a", 2)]
+    second_page = db_with_schemas.scan_schemas(
+        include_deleted=False, latest_only=False, start_after=(Subject("subject_a"), Version(1)), limit=2
+    )
+    assert keys(second_page) == [("subject_a", 2), ("subject_b", 1)]
+
+    db_with_schemas.delete_subject(subject=Subject("subject_a"), version=Version(2))
+    assert keys(db_with_schemas.scan_schemas(include_deleted=True, latest_only=True)) == [("subject_a", 2), ("subject_b", 1)]
+    assert keys(db_with_schemas.scan_schemas(include_deleted=False, latest_only=False)) == [("subject_b", 1)]
+    assert keys(
+        db_with_schemas.scan_schemas(include_deleted=True, latest_only=True, start_after=(Subject("subject_a"), Version(2)))
+    ) == [("subject_b", 1)]
+    assert db_with_schemas.scan_schemas(include_deleted=True, latest_only=False, subject_prefix="other") == []
+
+
+def test_subject_revision_changes_on_deletes(db_with_schemas: InMemoryDatabase) -> None:
+    subject_a = Subject("subject_a")
+    schema_version = db_with_schemas.find_subject_schemas(subject=subject_a, include_deleted=False)[Version(1)]
+    revision = db_with_schemas.subject_revision(subject=subject_a)
+
+    # Adding a version does not change the existing versions
+    db_with_schemas.insert_schema_version(
+        subject=subject_a,
+        schema_id=schema_version.schema_id,
+        version=Version(3),
+        deleted=False,
+        schema=schema_version.schema,
+        references=None,
+    )
+    assert db_with_schemas.subject_revision(subject=subject_a) == revision
+
+    revisions = [revision]
+    for delete in (
+        lambda: db_with_schemas.delete_subject(subject=subject_a, version=Version(1)),
+        lambda: db_with_schemas.delete_subject_schema(subject=subject_a, version=Version(1)),
+        lambda: db_with_schemas.delete_subject_hard(subject=subject_a),
+        db_with_schemas.clear,
+    ):
+        delete()
+        assert db_with_schemas.subject_revision(subject=subject_a) > revisions[-1]
+        assert db_with_schemas.subject_revision(subject=subject_a) == db_with_schemas.revision()
+        revisions.append(db_with_schemas.subject_revision(subject=subject_a))
+
+
+def test_find_subject_schemas_by_fingerprint_follows_mutations(db_with_schemas: InMemoryDatabase) -> None:
+    subject_a = Subject("subject_a")
+    schema_version = db_with_schemas.find_subject_schemas(subject=subject_a, include_deleted=False)[Version(1)]
+    fingerprint = schema_version.schema.fingerprint()
+
+    def versions(include_deleted: bool) -> list[Version]:
+        return [
+            schema_version.version
+            for schema_version in db_with_schemas.find_subject_schemas_by_fingerprint(
+                subject=subject_a, fingerprint=fingerprint, include_deleted=include_deleted
+            )
+        ]
+
+    assert versions(include_deleted=False) == [Version(2), Version(1)]
+    db_with_schemas.delete_subject(subject=subject_a, version=Version(1))
+    assert versions(include_deleted=False) == [Version(2)]
+    assert versions(include_deleted=True) == [Version(2), Version(1)]
+    db_with_schemas.delete_subject_schema(subject=subject_a, version=Version(1))
+    assert versions(include_deleted=True) == [Version(2)]
+    db_with_schemas.delete_subject_hard(subject=subject_a)
+    assert versions(include_deleted=True) == []
@@ -0,0 +1,58 @@
+"""
+Copyright (c) 2025 Aiven Ltd
+See LICENSE for details
+"""
+
+from concurrent.futures import Future
+from unittest.mock import Mock
+
+from aiokafka.errors import MessageSizeTooLargeError
+
+from karapace.core.container import KarapaceContainer
+from karapace.core.errors import SchemaTooLargeException
+from karapace.core.kafka.producer import KafkaProducer
+from karapace.core.key_format import KeyFormatter
+from karapace.core.messaging import KarapaceProducer
+from karapace.core.offset_watcher import OffsetWatcher
+
+
+def _key(subject: str) -> dict[str, object]:
+    return {"keytype": "SCHEMA", "subject": subject, "version": 1, "magic": 1}
+
+
+async def test_send_messages_reports_send_errors_per_message(karapace_container: KarapaceContainer) -> None:
+    offset_watcher = OffsetWatcher()
+    producer = KarapaceProducer(
+        config=karapace_container.config(), offset_watcher=offset_watcher, key_formatter=KeyFormatter()
+    )
+    producer._producer = Mock(spec=KafkaProducer)
+    sent_values = []
+
+    def send(topic: str, *, key: bytes, value: bytes, headers: list) -> Future:
+        if value == b'{"subject":"too-large"}':
+            raise MessageSizeTooLargeError()
+        sent_values.append(value)
+        message = Mock()
+        message.offset.return_value = len(sent_values)
+        future: Future = Future()
+        future.set_result(message)
+        return future
+
+    producer._producer.send.side_effect = send
+    offset_watcher.offset_seen(2)
+
+    errors = await producer.send_messages(
+        [
+            (_key("first"), {"subject": "first"}),
+            (_key("too-large"), {"subject": "too-large"}),
+            (_key("last"), {"subject": "last"}),
+        ]
+    )
+
+    # The records around the failed one are still produced and waited for
+    assert sent_values == [b'{"subject":"first"}', b'{"subject":"last"}']
+    producer._producer.flush.assert_called_once()
+    assert errors[0] is None
+    assert isinstance(errors[1], SchemaTooLargeException)
+    assert isinstance(errors[1].__cause__, MessageSizeTooLargeError)
+    assert errors[2] is None
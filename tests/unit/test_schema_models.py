@@ -13,7 +13,14 @@ import pytest
 from avro.schema import Schema as AvroSchema
 
 from karapace.core.errors import InvalidVersion, VersionNotFoundException
-from karapace.core.schema_models import SchemaVersion, TypedSchema, Versioner, parse_avro_schema_definition
+from karapace.core.schema_models import (
+    PARSED_SCHEMA_SIZE_FACTOR,
+    ParsedSchemaCache,
+    SchemaVersion,
+    TypedSchema,
+    Versioner,
+    parse_avro_schema_definition,
+)
 from karapace.core.schema_type import SchemaType
 from karapace.core.typing import Version, VersionTag
 
@@ -173,3 +180,44 @@ class TestVersioner:
         """
         with pytest.raises(InvalidVersion):
             Versioner.validate_tag(tag=tag)
+
+
+class TestParsedSchemaCache:
+    def test_schema_is_parsed_once(self) -> None:
+        schema_str = '{"type": "record", "name": "CachedRecord", "fields": [{"name": "f", "type": "int"}]}'
+        typed_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str=schema_str)
+        parsed = typed_schema.schema
+        assert isinstance(parsed, AvroSchema)
+        assert typed_schema.schema is parsed
+        # Equal schemas share the parsed object
+        assert TypedSchema(schema_type=SchemaType.AVRO, schema_str=schema_str).schema is parsed
+
+    def test_schema_type_is_part_of_the_key(self) -> None:
+        schema_str = '{"type": "string"}'
+        avro_schema = TypedSchema(schema_type=SchemaType.AVRO, schema_str=schema_str).schema
+        json_schema = TypedSchema(schema_type=SchemaType.JSONSCHEMA, schema_str=schema_str).schema
+        assert isinstance(avro_schema, AvroSchema)
+        assert not isinstance(json_schema, AvroSchema)
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        schema_a = '{"type": "record", "name": "A", "fields": []}'
+        schema_b = '{"type": "record", "name": "B", "fields": []}'
+        schema_c = '{"type": "record", "name": "C", "fields": []}'
+        cache = ParsedSchemaCache(max_size_bytes=2 * len(schema_a) * PARSED_SCHEMA_SIZE_FACTOR)
+        cache.set("a", schema_a, parse_avro_schema_definition(schema_a))
+        cache.set("b", schema_b, parse_avro_schema_definition(schema_b))
+        assert cache.get("a") is not None
+        cache.set("c", schema_c, parse_avro_schema_definition(schema_c))
+
+        assert len(cache) == 2
+        assert cache.size_bytes == 2 * len(schema_a) * PARSED_SCHEMA_SIZE_FACTOR
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_too_large_schema_is_not_cached(self) -> None:
+        schema_str = '{"type": "record", "name": "A", "fields": []}'
+        cache = ParsedSchemaCache(max_size_bytes=len(schema_str))
+        cache.set("a", schema_str, parse_avro_schema_definition(schema_str))
+        assert len(cache) == 0
@@ -5,6 +5,7 @@ Copyright (c) 2023 Aiven Ltd
 See LICENSE for details
 """
 
+import asyncio
 import json
 import logging
 import random
@@ -12,6 +13,8 @@ import time
 from collections.abc import Callable
 from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
 from unittest.mock import Mock
 
 import confluent_kafka
@@ -21,7 +24,9 @@ from _pytest.logging import LogCaptureFixture
 from confluent_kafka import Message
 from pytest import MonkeyPatch
 
+from karapace.core.config import Config
 from karapace.core.container import KarapaceContainer
+from karapace.core.database_snapshot import InvalidSnapshot, read_snapshot
 from karapace.core.errors import CorruptKafkaRecordException, ShutdownException
 from karapace.core.in_memory_database import InMemoryDatabase
 from karapace.core.kafka.consumer import KafkaConsumer
@@ -30,11 +35,14 @@ from karapace.core.offset_watcher import OffsetWatcher
 from karapace.core.schema_reader import (
     MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP,
     MAX_MESSAGES_TO_CONSUME_ON_STARTUP,
+    MESSAGE_CONSUME_TIMEOUT_SECONDS,
+    MESSAGE_CONSUME_TIMEOUT_SECONDS_WITH_BACKLOG,
     OFFSET_EMPTY,
     OFFSET_UNINITIALIZED,
     KafkaSchemaReader,
     MessageType,
 )
+from karapace.core.schema_models import ValidatedTypedSchema
 from karapace.core.schema_type import SchemaType
 from karapace.core.typing import SchemaId, Version
 from tests.base_testcase import BaseTestCase
@@ -88,6 +96,23 @@ def test_offset_watcher() -> None:
     assert consumed_cnt == 100, "Did not consume expected amount of records"
 
 
+async def test_offset_watcher_async() -> None:
+    watcher = OffsetWatcher()
+
+    # The offsets are seen from another thread, as the schema reader does
+    waiters = [asyncio.create_task(watcher.wait_for_offset_async(expected_offset=offset, timeout=5)) for offset in range(10)]
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        for offset in range(0, 10, 3):
+            executor.submit(watcher.offset_seen, new_offset=offset).result()
+        executor.submit(watcher.offset_seen, new_offset=9).result()
+    assert await asyncio.gather(*waiters) == [True] * 10
+
+    # Already seen offsets return immediately, unseen offsets time out and are not kept around
+    assert await watcher.wait_for_offset_async(expected_offset=5, timeout=0)
+    assert not await watcher.wait_for_offset_async(expected_offset=10, timeout=0.01)
+    assert watcher._async_waiters == []
+
+
 @dataclass
 class ReadinessTestCase(BaseTestCase):
     cur_offset: int
@@ -273,6 +298,7 @@ def test_soft_deleted_schema_storing(karapace_container: KarapaceContainer) -> N
     consumer_mock = Mock(spec=KafkaConsumer)
     soft_deleted_schema_record = Mock(spec=confluent_kafka.Message)
     soft_deleted_schema_record.error.return_value = None
+    soft_deleted_schema_record.offset.return_value = 0
     soft_deleted_schema_record.key.return_value = json.dumps(
         {
             "keytype": "SCHEMA",
@@ -681,3 +707,332 @@ def test_message_error_handling_with_invalid_reference_schema_protobuf(
 
         assert warn_records[1].name == "karapace.core.schema_reader"
         assert warn_records[1].message == "Invalid Protobuf references"
+
+
+def _snapshot_test_messages() -> list[Message]:
+    base_schema = 'syntax = "proto3";\npackage a;\nmessage Base {\n  string x = 1;\n}\n'
+    ref_schema = 'syntax = "proto3";\npackage b;\nimport "base.proto";\nmessage Ref {\n  a.Base base = 1;\n}\n'
+    records = [
+        (
+            {"keytype": "SCHEMA", "subject": "avro", "version": 1, "magic": 1},
+            {"subject": "avro", "version": 1, "id": 1, "deleted": False, "schema": '"int"'},
+        ),
+        (
+            {"keytype": "SCHEMA", "subject": "base", "version": 1, "magic": 1},
+            {"schemaType": "PROTOBUF", "subject": "base", "version": 1, "id": 2, "deleted": False, "schema": base_schema},
+        ),
+        (
+            {"keytype": "SCHEMA", "subject": "ref", "version": 1, "magic": 1},
+            {
+                "schemaType": "PROTOBUF",
+                "subject": "ref",
+                "version": 1,
+                "id": 3,
+                "deleted": False,
+                "schema": ref_schema,
+                "references": [{"name": "base.proto", "subject": "base", "version": 1}],
+            },
+        ),
+        (
+            {"keytype": "SCHEMA", "subject": "deleted", "version": 1, "magic": 1},
+            {"subject": "deleted", "version": 1, "id": 4, "deleted": False, "schema": '"string"'},
+        ),
+        ({"keytype": "SCHEMA", "subject": "deleted", "version": 1, "magic": 1}, None),
+        ({"keytype": "CONFIG", "subject": "avro", "magic": 0}, {"compatibilityLevel": "FULL"}),
+        ({"keytype": "CONFIG", "subject": None, "magic": 0}, {"compatibilityLevel": "NONE"}),
+    ]
+    messages = []
+    for offset, (key, value) in enumerate(records):
+        message = Mock(spec=Message)
+        message.key.return_value = json.dumps(key).encode()
+        message.value.return_value = None if value is None else json.dumps(value).encode()
+        message.error.return_value = None
+        message.offset.return_value = offset
+        messages.append(message)
+    return messages
+
+
+def _snapshot_schema_reader(config: Config, messages: list[Message]) -> KafkaSchemaReader:
+    consumer_mock = Mock(spec=KafkaConsumer)
+    consumer_mock.get_watermark_offsets.return_value = (0, len(messages))
+    schema_reader = KafkaSchemaReader(
+        config=config,
+        offset_watcher=OffsetWatcher(),
+        key_formatter=KeyFormatter(),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+        stats=Mock(spec=StatsClient),
+    )
+    schema_reader.consumer = consumer_mock
+    return schema_reader
+
+
+def test_snapshot_restores_the_database(tmp_path: Path, karapace_container: KarapaceContainer) -> None:
+    snapshot_path = tmp_path / "snapshot"
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(
+        new_config={"schema_reader_snapshot_path": str(snapshot_path), "compatibility": "BACKWARD"}
+    )
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages, []]
+    schema_reader._assign_from_snapshot()
+    schema_reader.consumer.assign.assert_called_once()
+    assert schema_reader.consumer.assign.call_args.args[0][0].offset == confluent_kafka.OFFSET_BEGINNING
+    schema_reader.offset = schema_reader._get_beginning_offset()
+
+    schema_reader.handle_messages()
+    assert not schema_reader.ready()
+    # The snapshot is written once the reader is ready
+    schema_reader.handle_messages()
+    assert schema_reader.ready()
+    assert snapshot_path.exists()
+
+    restored_config = karapace_container.config().set_config_defaults(
+        new_config={"schema_reader_snapshot_path": str(snapshot_path), "compatibility": "BACKWARD"}
+    )
+    restored_reader = _snapshot_schema_reader(restored_config, messages)
+    restored_reader._assign_from_snapshot()
+    assert restored_reader.consumer.assign.call_args.args[0][0].offset == len(messages) - 1
+
+    database, restored_database = schema_reader.database, restored_reader.database
+    assert restored_database.find_schemas(include_deleted=True, latest_only=False) == database.find_schemas(
+        include_deleted=True, latest_only=False
+    )
+    assert restored_database.schemas == database.schemas
+    assert restored_database.referenced_by == database.referenced_by == {("base", Version(1)): {SchemaId(3)}}
+    assert restored_database.get_subject_compatibility(subject="avro") == "FULL"
+    assert restored_database.global_schema_id == 4
+    assert restored_reader.config.compatibility == "NONE"
+    assert restored_database.find_schema(schema_id=SchemaId(3)).dependencies["base.proto"].subject == "base"
+
+    # Ready only after the last record of the snapshot has been compared with the topic
+    restored_reader.consumer.consume.side_effect = [[], messages[-1:]]
+    restored_reader.handle_messages()
+    assert not restored_reader.ready()
+    restored_reader.handle_messages()
+    assert restored_reader.ready()
+    assert restored_reader.offset == len(messages) - 1
+
+
+def test_snapshot_not_matching_the_topic_is_discarded(tmp_path: Path, karapace_container: KarapaceContainer) -> None:
+    snapshot_path = tmp_path / "snapshot"
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(
+        new_config={"schema_reader_snapshot_path": str(snapshot_path), "compatibility": "BACKWARD"}
+    )
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages, []]
+    schema_reader.offset = OFFSET_EMPTY
+    schema_reader.handle_messages()
+    schema_reader.handle_messages()
+    assert schema_reader.ready()
+
+    restored_config = karapace_container.config().set_config_defaults(
+        new_config={"schema_reader_snapshot_path": str(snapshot_path), "compatibility": "BACKWARD"}
+    )
+    restored_reader = _snapshot_schema_reader(restored_config, messages)
+    restored_reader._assign_from_snapshot()
+    assert restored_reader.database.num_subjects() == 3
+
+    # The topic has a different record at the offset of the snapshot
+    other_message = Mock(spec=Message)
+    other_message.key.return_value = b'{"keytype":"NOOP","magic":0}'
+    other_message.value.return_value = None
+    other_message.error.return_value = None
+    other_message.offset.return_value = len(messages) - 1
+    restored_reader.consumer.consume.side_effect = [[other_message]]
+    restored_reader.handle_messages()
+
+    assert not restored_reader.ready()
+    assert restored_reader.offset == OFFSET_UNINITIALIZED
+    assert restored_reader.database.num_subjects() == 0
+    assert restored_reader.config.compatibility == "BACKWARD"
+    assert restored_reader.consumer.assign.call_args.args[0][0].offset == confluent_kafka.OFFSET_BEGINNING
+
+
+def test_corrupted_snapshot_is_discarded(tmp_path: Path, karapace_container: KarapaceContainer) -> None:
+    snapshot_path = tmp_path / "snapshot"
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(
+        new_config={"schema_reader_snapshot_path": str(snapshot_path), "compatibility": "BACKWARD"}
+    )
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages, []]
+    schema_reader.offset = OFFSET_EMPTY
+    schema_reader.handle_messages()
+    schema_reader.handle_messages()
+
+    content = snapshot_path.read_bytes()
+    snapshot_path.write_bytes(content[:-10] + b"corrupted!")
+    with pytest.raises(InvalidSnapshot):
+        read_snapshot(snapshot_path)
+
+    restored_reader = _snapshot_schema_reader(config, messages)
+    restored_reader._assign_from_snapshot()
+    assert restored_reader.database.num_subjects() == 0
+    assert restored_reader.offset == OFFSET_UNINITIALIZED
+    assert restored_reader.consumer.assign.call_args.args[0][0].offset == confluent_kafka.OFFSET_BEGINNING
+
+
+def test_replay_workers_parse_protobuf_schemas(karapace_container: KarapaceContainer) -> None:
+    messages = []
+    for offset in range(10):
+        schema = f'syntax = "proto3";\npackage p{offset};\nmessage M {{\n  string x = 1;\n}}\n'
+        message = Mock(spec=Message)
+        message.key.return_value = json.dumps(
+            {"keytype": "SCHEMA", "subject": f"s{offset}", "version": 1, "magic": 1}
+        ).encode()
+        message.value.return_value = json.dumps(
+            {"schemaType": "PROTOBUF", "subject": f"s{offset}", "version": 1, "id": offset + 1, "schema": schema}
+        ).encode()
+        message.error.return_value = None
+        message.offset.return_value = offset
+        messages.append(message)
+
+    databases = []
+    for replay_workers in (0, 2):
+        config = karapace_container.config().set_config_defaults(new_config={"schema_reader_replay_workers": replay_workers})
+        schema_reader = _snapshot_schema_reader(config, messages)
+        schema_reader.consumer.consume.side_effect = [messages, []]
+        schema_reader.offset = OFFSET_EMPTY
+        schema_reader.handle_messages()
+        assert (schema_reader._replay_pool is not None) is (replay_workers > 0)
+        schema_reader.handle_messages()
+        assert schema_reader.ready()
+        assert schema_reader._replay_pool is None
+        databases.append(schema_reader.database)
+
+    inline_database, replay_workers_database = databases
+    assert replay_workers_database.num_schemas() == 10
+    assert replay_workers_database.schemas == inline_database.schemas
+
+
+def test_consume_batch_size_follows_backlog_after_ready(karapace_container: KarapaceContainer) -> None:
+    stats_mock = Mock(spec=StatsClient)
+    consumer_mock = Mock(spec=KafkaConsumer)
+    consumer_mock.consume.return_value = []
+    consumer_mock.get_watermark_offsets.return_value = (0, 1)
+
+    schema_reader = KafkaSchemaReader(
+        config=karapace_container.config(),
+        offset_watcher=OffsetWatcher(),
+        key_formatter=Mock(spec=KeyFormatter),
+        master_coordinator=None,
+        database=InMemoryDatabase(),
+        stats=stats_mock,
+    )
+    schema_reader.consumer = consumer_mock
+    schema_reader.offset = 0
+    schema_reader.handle_messages()
+    assert schema_reader.ready()
+    assert schema_reader.max_messages_to_process == MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP
+    assert schema_reader.timeout_s == MESSAGE_CONSUME_TIMEOUT_SECONDS
+
+    # A burst of records is produced
+    consumer_mock.get_watermark_offsets.return_value = (0, 101)
+    schema_reader.handle_messages()
+    assert schema_reader.max_messages_to_process == 100
+    assert schema_reader.timeout_s == MESSAGE_CONSUME_TIMEOUT_SECONDS_WITH_BACKLOG
+    assert schema_reader.highest_offset() == 100
+    stats_mock.set_schema_reader_lag.assert_called_with(value=100)
+    stats_mock.set_schema_reader_consume_batch_size.assert_called_with(value=100)
+
+    consumer_mock.get_watermark_offsets.return_value = (0, 5001)
+    schema_reader.handle_messages()
+    assert schema_reader.max_messages_to_process == MAX_MESSAGES_TO_CONSUME_ON_STARTUP
+
+    # The backlog is consumed
+    schema_reader.offset = 5000
+    schema_reader.handle_messages()
+    assert schema_reader.max_messages_to_process == MAX_MESSAGES_TO_CONSUME_AFTER_STARTUP
+    assert schema_reader.timeout_s == MESSAGE_CONSUME_TIMEOUT_SECONDS
+    stats_mock.set_schema_reader_lag.assert_called_with(value=0)
+
+
+def test_referenced_schemas_are_resolved_once(karapace_container: KarapaceContainer) -> None:
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(new_config={"compatibility": "BACKWARD"})
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages]
+    schema_reader.offset = OFFSET_EMPTY
+    schema_reader.handle_messages()
+
+    references = [{"name": "ref.proto", "subject": "ref", "version": 1}]
+    _, dependencies = schema_reader.resolve_references(references)
+    _, resolved_again = schema_reader.resolve_references(references)
+    ref_schema = dependencies["ref.proto"].schema
+    assert resolved_again["ref.proto"].schema is ref_schema
+    assert (
+        ref_schema.dependencies["base.proto"].schema
+        is schema_reader.resolve_references([{"name": "base.proto", "subject": "base", "version": 1}])[1][
+            "base.proto"
+        ].schema
+    )
+
+    # Replacing the referenced version discards the versions referencing it
+    new_base_schema = 'syntax = "proto3";\npackage a;\nmessage Base {\n  string x = 1;\n  string y = 2;\n}\n'
+    schema_reader.handle_msg(
+        {"keytype": "SCHEMA", "subject": "base", "version": 1, "magic": 1},
+        {"schemaType": "PROTOBUF", "subject": "base", "version": 1, "id": 5, "deleted": False, "schema": new_base_schema},
+    )
+    _, dependencies = schema_reader.resolve_references(references)
+    assert dependencies["ref.proto"].schema is not ref_schema
+    assert "string y = 2;" in str(dependencies["ref.proto"].schema.dependencies["base.proto"].schema)
+
+
+def test_resolved_schema_of_replaced_version_is_not_stored(karapace_container: KarapaceContainer) -> None:
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(new_config={"compatibility": "BACKWARD"})
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages]
+    schema_reader.offset = OFFSET_EMPTY
+    schema_reader.handle_messages()
+    schema_reader._resolved_schemas.clear()
+
+    # A resolve of the version races with its replacement while nothing is cached
+    generation = schema_reader._resolved_schemas.generation
+    stale_schema = ValidatedTypedSchema.parse(
+        SchemaType.PROTOBUF, str(schema_reader.database.find_schema(schema_id=SchemaId(2)))
+    )
+    new_base_schema = 'syntax = "proto3";\npackage a;\nmessage Base {\n  string x = 1;\n  string y = 2;\n}\n'
+    schema_reader.handle_msg(
+        {"keytype": "SCHEMA", "subject": "base", "version": 1, "magic": 1},
+        {"schemaType": "PROTOBUF", "subject": "base", "version": 1, "id": 5, "deleted": False, "schema": new_base_schema},
+    )
+    schema_reader._resolved_schemas.put(
+        subject="base", version=Version(1), schema_id=SchemaId(2), schema=stale_schema, generation=generation
+    )
+    assert len(schema_reader._resolved_schemas) == 0
+
+    _, dependencies = schema_reader.resolve_references([{"name": "base.proto", "subject": "base", "version": 1}])
+    assert "string y = 2;" in str(dependencies["base.proto"].schema)
+
+
+def test_resolve_racing_a_replace_is_not_stored(karapace_container: KarapaceContainer) -> None:
+    messages = _snapshot_test_messages()
+    config = karapace_container.config().set_config_defaults(new_config={"compatibility": "BACKWARD"})
+    schema_reader = _snapshot_schema_reader(config, messages)
+    schema_reader.consumer.consume.side_effect = [messages]
+    schema_reader.offset = OFFSET_EMPTY
+    schema_reader.handle_messages()
+    schema_reader._resolved_schemas.clear()
+
+    references = [{"name": "ref.proto", "subject": "ref", "version": 1}]
+    insert_schema_version = schema_reader.database.insert_schema_version
+
+    def insert_after_resolve(**kwargs: Any) -> None:
+        # A resolve reads the database right before the replaced version is stored
+        schema_reader.resolve_references(references)
+        insert_schema_version(**kwargs)
+
+    schema_reader.database.insert_schema_version = insert_after_resolve
+    new_base_schema = 'syntax = "proto3";\npackage a;\nmessage Base {\n  string x = 1;\n  string y = 2;\n}\n'
+    schema_reader.handle_msg(
+        {"keytype": "SCHEMA", "subject": "base", "version": 1, "magic": 1},
+        {"schemaType": "PROTOBUF", "subject": "base", "version": 1, "id": 5, "deleted": False, "schema": new_base_schema},
+    )
+    schema_reader.database.insert_schema_version = insert_schema_version
+
+    # The referrer keeps its schema id, its stale entry would be used
+    _, dependencies = schema_reader.resolve_references(references)
+    assert "string y = 2;" in str(dependencies["ref.proto"].schema.dependencies["base.proto"].schema)
@@ -0,0 +1,149 @@
+"""
+Copyright (c) 2025 Aiven Ltd
+See LICENSE for details
+"""
+
+import asyncio
+import json
+from typing import Any
+from unittest.mock import Mock, patch
+
+import pytest
+from avro.compatibility import SchemaCompatibilityType
+
+from karapace.core.container import KarapaceContainer
+from karapace.core.errors import IncompatibleSchema
+from karapace.core.schema_models import SchemaType, ValidatedTypedSchema
+from karapace.core.schema_registry import KarapaceSchemaRegistry
+from karapace.core.stats import StatsClient
+from karapace.core.typing import SchemaId, Subject, Version
+
+
+def _avro_schema(*fields: dict[str, Any]) -> ValidatedTypedSchema:
+    return ValidatedTypedSchema.parse(
+        SchemaType.AVRO,
+        json.dumps({"type": "record", "name": "Test", "fields": list(fields)}),
+    )
+
+
+async def test_group_commit_batches_registrations_for_different_subjects(karapace_container: KarapaceContainer) -> None:
+    config = karapace_container.config().set_config_defaults(
+        new_config={"schema_registration_group_commit": True, "compatibility": "BACKWARD"}
+    )
+    registry = KarapaceSchemaRegistry(config=config, stats=Mock(spec=StatsClient))
+
+    batches: list[list[tuple[str, int]]] = []
+
+    async def send_messages(messages: list[tuple[dict, dict]]) -> list[Exception | None]:
+        batches.append([(key["subject"], key["version"]) for key, _ in messages])
+        # Simulates the schema reader consuming the batch
+        for _, value in messages:
+            registry.database.insert_schema_version(
+                subject=Subject(value["subject"]),
+                schema_id=SchemaId(value["id"]),
+                version=Version(value["version"]),
+                deleted=False,
+                schema=ValidatedTypedSchema.parse(SchemaType.AVRO, value["schema"]),
+                references=None,
+            )
+        return [None] * len(messages)
+
+    registry.producer = Mock()
+    registry.producer.send_messages = send_messages
+
+    schema_a = _avro_schema({"name": "a", "type": "int"})
+    schema_a_v2 = _avro_schema({"name": "a", "type": "int"}, {"name": "b", "type": "int", "default": 0})
+    schema_c = _avro_schema({"name": "c", "type": "string"})
+    schema_incompatible = _avro_schema({"name": "a", "type": "string"})
+
+    results = await asyncio.gather(
+        registry.write_new_schema_local(Subject("a"), schema_a, None),
+        registry.write_new_schema_local(Subject("b"), schema_a, None),
+        registry.write_new_schema_local(Subject("a"), schema_a_v2, None),
+        registry.write_new_schema_local(Subject("c"), schema_c, None),
+        registry.write_new_schema_local(Subject("c"), schema_incompatible, None),
+        return_exceptions=True,
+    )
+
+    # The registrations of a subject are committed in order, one per batch
+    assert batches == [[("a", 1), ("b", 1), ("c", 1)], [("a", 2)]]
+    # The same new schema in a batch gets a single id
+    assert results[:4] == [1, 1, 3, 2]
+    assert isinstance(results[4], IncompatibleSchema)
+
+
+async def test_group_commit_reports_delivery_errors(karapace_container: KarapaceContainer) -> None:
+    config = karapace_container.config().set_config_defaults(
+        new_config={"schema_registration_group_commit": True, "compatibility": "BACKWARD"}
+    )
+    registry = KarapaceSchemaRegistry(config=config, stats=Mock(spec=StatsClient))
+
+    async def send_messages(messages: list[tuple[dict, dict]]) -> list[Exception | None]:
+        raise RuntimeError("Schema reader timed out")
+
+    registry.producer = Mock()
+    registry.producer.send_messages = send_messages
+
+    with pytest.raises(RuntimeError):
+        await registry.write_new_schema_local(Subject("a"), _avro_schema({"name": "a", "type": "int"}), None)
+
+
+async def test_transitive_check_parses_only_changed_versions(karapace_container: KarapaceContainer) -> None:
+    config = karapace_container.config().set_config_defaults(new_config={"compatibility": "BACKWARD_TRANSITIVE"})
+    registry = KarapaceSchemaRegistry(config=config, stats=Mock(spec=StatsClient))
+    subject = Subject("subject")
+    for version in range(1, 4):
+        fields = [{"name": f"f{index}", "type": "int", "default": 0} for index in range(version)]
+        registry.database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(version),
+            version=Version(version),
+            deleted=False,
+            schema=_avro_schema(*fields),
+            references=None,
+        )
+    new_schema = _avro_schema({"name": "f0", "type": "int", "default": 0})
+
+    with patch.object(registry, "resolve_and_parse", wraps=registry.resolve_and_parse) as resolve_and_parse:
+        await registry.check_schema_compatibility(new_schema, subject)
+        assert resolve_and_parse.call_count == 3
+        await registry.check_schema_compatibility(new_schema, subject)
+        assert resolve_and_parse.call_count == 3
+
+        # A delete invalidates the parsed versions of the subject
+        registry.database.delete_subject_schema(subject=subject, version=Version(3))
+        await registry.check_schema_compatibility(new_schema, subject)
+        assert resolve_and_parse.call_count == 5
+
+
+@pytest.mark.parametrize("compatibility_check_workers", [0, 4])
+async def test_transitive_check_reports_all_versions_when_requested(
+    karapace_container: KarapaceContainer, compatibility_check_workers: int
+) -> None:
+    config = karapace_container.config().set_config_defaults(
+        new_config={"compatibility": "BACKWARD_TRANSITIVE", "compatibility_check_workers": compatibility_check_workers}
+    )
+    registry = KarapaceSchemaRegistry(config=config, stats=Mock(spec=StatsClient))
+    subject = Subject("subject")
+    for version, field_type in enumerate(("int", "string", "int", "string"), start=1):
+        registry.database.insert_schema_version(
+            subject=subject,
+            schema_id=SchemaId(version),
+            version=Version(version),
+            deleted=False,
+            schema=_avro_schema({"name": "f", "type": field_type}, {"name": f"f{version}", "type": "int", "default": 0}),
+            references=None,
+        )
+    new_schema = _avro_schema({"name": "f", "type": "int"})
+
+    result = await registry.check_schema_compatibility(new_schema, subject)
+    assert result.compatibility is SchemaCompatibilityType.incompatible
+    assert len(result.incompatibilities) == 1
+
+    result = await registry.check_schema_compatibility(new_schema, subject, all_versions=True)
+    assert result.compatibility is SchemaCompatibilityType.incompatible
+    assert len(result.incompatibilities) == 2
+
+    compatible_schema = _avro_schema({"name": "f", "type": ["int", "string"]})
+    result = await registry.check_schema_compatibility(compatible_schema, subject, all_versions=True)
+    assert result.compatibility is SchemaCompatibilityType.compatible
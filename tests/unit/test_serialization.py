@@ -24,11 +24,13 @@ from karapace.core.serialization import (
     InvalidPayload,
     SchemaRegistryClient,
     SchemaRegistrySerializer,
+    SerdeExecutor,
+    compile_flatten_unions,
     flatten_unions,
     get_subject_name,
     write_value,
 )
-from karapace.core.typing import NameStrategy, Subject, SubjectType
+from karapace.core.typing import NameStrategy, SerdeExecutorType, Subject, SubjectType
 from tests.utils import schema_avro_json, test_objects_avro
 
 log = logging.getLogger(__name__)
@@ -136,10 +138,63 @@ async def test_happy_flow(karapace_container: KarapaceContainer):
         assert o == await serializer.deserialize(await serializer.serialize(schema, o))
     assert len(serializer.ids_to_schemas) == 1
     assert 1 in serializer.ids_to_schemas
+    assert list(serializer.ids_to_avro_codecs) == [1]
 
     assert mock_registry_client.method_calls == [call.get_schema("top"), call.get_schema_for_id(1)]
 
 
+async def test_serialize_many_and_deserialize_many(karapace_container: KarapaceContainer) -> None:
+    mock_registry_client = Mock()
+    get_latest_schema_future = asyncio.Future()
+    get_latest_schema_future.set_result((1, ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json), Versioner.V(1)))
+    mock_registry_client.get_schema.return_value = get_latest_schema_future
+    schema_for_id_one_future = asyncio.Future()
+    schema_for_id_one_future.set_result((ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json), [Subject("stub")]))
+    mock_registry_client.get_schema_for_id.return_value = schema_for_id_one_future
+
+    serializer = await make_ser_deser(karapace_container, mock_registry_client)
+    schema = await serializer.get_schema_for_subject(Subject("top"))
+    serialized = await serializer.serialize_many(schema, test_objects_avro)
+    assert serialized == [await serializer.serialize(schema, o) for o in test_objects_avro]
+
+    assert await serializer.deserialize_many(serialized) == test_objects_avro
+
+    # The schema id shared by the whole batch is resolved only once
+    assert mock_registry_client.method_calls == [call.get_schema("top"), call.get_schema_for_id(1)]
+
+    with pytest.raises(InvalidMessageHeader):
+        await serializer.deserialize_many([serialized[0], struct.pack(">bII", 1, 1, 500)])
+
+
+@pytest.mark.parametrize("executor_type", list(SerdeExecutorType))
+async def test_serde_executor(karapace_container: KarapaceContainer, executor_type: SerdeExecutorType) -> None:
+    mock_registry_client = Mock()
+    get_latest_schema_future = asyncio.Future()
+    get_latest_schema_future.set_result((1, ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json), Versioner.V(1)))
+    mock_registry_client.get_schema.return_value = get_latest_schema_future
+    schema_for_id_one_future = asyncio.Future()
+    schema_for_id_one_future.set_result((ValidatedTypedSchema.parse(SchemaType.AVRO, schema_avro_json), [Subject("stub")]))
+    mock_registry_client.get_schema_for_id.return_value = schema_for_id_one_future
+
+    serializer = await make_ser_deser(karapace_container, mock_registry_client)
+    schema = await serializer.get_schema_for_subject(Subject("top"))
+    stats = Mock()
+    executor = SerdeExecutor(executor_type=executor_type, max_workers=1, stats=stats)
+    try:
+        serialized = await serializer.serialize_many(schema, test_objects_avro, executor=executor)
+        assert await serializer.deserialize_many(serialized, executor=executor) == test_objects_avro
+        with pytest.raises(InvalidMessageSchema):
+            await serializer.serialize_many(schema, [{"foo": "bar"}], executor=executor)
+    finally:
+        executor.close()
+
+    assert executor.pending == 0
+    if executor_type is SerdeExecutorType.inline:
+        assert stats.method_calls == []
+    else:
+        assert stats.timing.call_count == 3
+
+
 @pytest.mark.parametrize(
     ["record", "flattened_record"],
     [
@@ -152,6 +207,27 @@ async def test_happy_flow(karapace_container: KarapaceContainer):
 )
 def test_flatten_unions_record(record, flattened_record) -> None:
     assert flatten_unions(TYPED_AVRO_SCHEMA.schema, record) == flattened_record
+    assert compile_flatten_unions(TYPED_AVRO_SCHEMA.schema)(record) == flattened_record
+
+
+def test_compile_flatten_unions_recursive_schema() -> None:
+    typed_schema = ValidatedTypedSchema.parse(
+        SchemaType.AVRO,
+        json.dumps(
+            {
+                "name": "Node",
+                "type": "record",
+                "fields": [
+                    {"name": "value", "type": "int"},
+                    {"name": "next", "type": ["null", "Node"]},
+                ],
+            }
+        ),
+    )
+    record = {"value": 1, "next": {"Node": {"value": 2, "next": {"Node": {"value": 3, "next": None}}}}}
+    flattened_record = {"value": 1, "next": {"value": 2, "next": {"value": 3, "next": None}}}
+    assert flatten_unions(typed_schema.schema, record) == flattened_record
+    assert compile_flatten_unions(typed_schema.schema)(record) == flattened_record
 
 
 def test_flatten_unions_array() -> None: